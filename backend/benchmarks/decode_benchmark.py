@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Offline decode benchmark for the WESMOL Indexer.
+
+Runs the validator, BlockDecoder, decoded-block serialization and the full
+BlockProcessor over a corpus of raw EvmFilteredBlock JSON files, using local
+filesystem storage and a throwaway SQLite database. Results are written as JSON
+so runs can be compared across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+from offline import setup_offline_env, BENCHMARK_DIR, DEFAULT_CONTRACTS, DEFAULT_ABI_DIR
+
+setup_offline_env()
+
+DEFAULT_CORPUS = BENCHMARK_DIR / "fixtures" / "blocks"
+
+from indexer.indexer.contracts.registry import ContractRegistry
+from indexer.indexer.decoders.block import BlockDecoder
+from indexer.indexer.processing.validator import BlockValidator
+from indexer.indexer.processing.processor import BlockProcessor
+from indexer.indexer.database.operations.session import ConnectionManager
+from indexer.indexer.database.operations.manager import DatabaseManager
+from indexer.indexer.storage.local import LocalBlockHandler, LocalStorageHandler
+
+STAGES = ("validate", "decode", "serialize", "process")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def measure(fn, items, repeat: int, warmup: int, before_pass=None) -> dict:
+    """
+    Time fn over every item, repeat times, after warmup passes.
+
+    Args:
+        before_pass: Called untimed before every timed pass (e.g. to drop caches)
+
+    Returns:
+        Dictionary of throughput and per-item latency statistics
+    """
+    for _ in range(warmup):
+        for item in items:
+            fn(item)
+
+    timings = []
+    total = 0.0
+    for _ in range(repeat):
+        if before_pass is not None:
+            before_pass()
+        start = time.perf_counter()
+        for item in items:
+            item_start = time.perf_counter()
+            fn(item)
+            timings.append(time.perf_counter() - item_start)
+        total += time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "iterations": len(timings),
+        "total_s": total,
+        "blocks_per_s": len(timings) / total if total else 0.0,
+        "mean_ms": statistics.fmean(timings) * 1e3,
+        "p50_ms": timings[len(timings) // 2] * 1e3,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1e3,
+        "max_ms": timings[-1] * 1e3,
+    }
+
+
+def run_benchmark(corpus_dir: Path, contracts_file: Path, abi_dir: Path,
+                  stages=STAGES, repeat: int = 3, warmup: int = 1, decode_filter: str = "all",
+                  compact: bool = False) -> dict:
+    """
+    Run the benchmark stages over a corpus.
+
+    Returns:
+        Dictionary with run metadata, corpus statistics and per-stage results
+    """
+    paths = sorted(p.name for p in corpus_dir.glob("*.json"))
+    if not paths:
+        raise ValueError(f"No block files found in {corpus_dir}")
+
+    raw_blocks = [(corpus_dir / name).read_bytes() for name in paths]
+
+    registry = ContractRegistry(contracts_file, abi_dir)
+    validator = BlockValidator()
+    decoder = BlockDecoder(registry, filter_mode=decode_filter, compact=compact)
+
+    parsed = []
+    for name, data in zip(paths, raw_blocks):
+        is_valid, error, block = validator.validate_block_data(data)
+        if not is_valid:
+            raise ValueError(f"Invalid corpus block {name}: {error}")
+        parsed.append(block)
+
+    corpus = {
+        "path": str(corpus_dir),
+        "blocks": len(paths),
+        "bytes": sum(len(data) for data in raw_blocks),
+        "transactions": sum(len(block.transactions) for block in parsed),
+        "logs": sum(len(receipt.logs) for block in parsed for receipt in block.receipts),
+        "registry_contracts": len(registry.contracts),
+    }
+
+    work_dir = Path(tempfile.mkdtemp(prefix="wesmol_bench_"))
+    try:
+        storage = LocalStorageHandler(corpus_dir)
+        handler = LocalBlockHandler(
+            gcs_handler=storage,
+            local_dir=work_dir,
+            raw_prefix="",
+            decoded_prefix="decoded/"
+        )
+        decoded = [decoder.decode_block(block) for block in parsed]
+
+        results = {}
+        if "validate" in stages:
+            results["validate"] = measure(validator.validate_block_data, raw_blocks, repeat, warmup)
+        if "decode" in stages:
+            # Without memos: comparable with results from before the decode memo
+            cold_decoder = BlockDecoder(registry, filter_mode=decode_filter, compact=compact, memo_entries=0)
+            results["decode"] = measure(cold_decoder.decode_block, parsed, repeat, warmup)
+            if decoder.log_memo is not None:
+                # Memos start empty every pass, so hits are repeats within the corpus
+                def clear_memos():
+                    decoder.log_memo.clear()
+                    decoder.function_memo.clear()
+                results["decode_memo"] = measure(decoder.decode_block, parsed, repeat, warmup,
+                                                 before_pass=clear_memos)
+        if "serialize" in stages:
+            results["serialize"] = measure(handler.serialize_decoded_block, decoded, repeat, warmup)
+        if "process" in stages:
+            db_manager = DatabaseManager(ConnectionManager(f"sqlite:///{work_dir / 'benchmark.db'}"))
+            processor = BlockProcessor(
+                gcs_handler=storage,
+                status_tracker=db_manager,
+                validator=validator,
+                decoder=decoder,
+                handler=handler
+            )
+            results["process"] = measure(
+                lambda path: processor.process_block(path, force=True), paths, repeat, warmup
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for stage in results.values():
+        stage["mb_per_s"] = corpus["bytes"] / len(paths) * stage["blocks_per_s"] / 1e6
+        stage["logs_per_s"] = corpus["logs"] / len(paths) * stage["blocks_per_s"]
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "warmup": warmup,
+            "decode_filter": decode_filter,
+            "compact": compact,
+        },
+        "corpus": corpus,
+        "results": results,
+        "decode_memo": decoder.memo_stats(),
+        "contract_lookups": decoder.contract_manager.stats(),
+        "decode_filter": decoder.filter.stats(),
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Relative throughput change per stage versus a baseline result file."""
+    changes = {}
+    for stage, result in current["results"].items():
+        previous = baseline.get("results", {}).get(stage)
+        if previous and previous["blocks_per_s"]:
+            changes[stage] = result["blocks_per_s"] / previous["blocks_per_s"] - 1
+    return changes
+
+
+def print_report(report: dict, changes: dict = None):
+    corpus = report["corpus"]
+    print(f"Corpus: {corpus['blocks']} blocks, {corpus['transactions']} txs, {corpus['logs']} logs, "
+          f"{corpus['bytes'] / 1e6:.2f} MB, {corpus['registry_contracts']} registry contracts")
+    print(f"{'stage':<10} {'blocks/s':>10} {'logs/s':>12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'change':>8}")
+    for stage, result in report["results"].items():
+        change = f"{changes[stage] * 100:+.1f}%" if changes and stage in changes else ""
+        print(f"{stage:<10} {result['blocks_per_s']:>10.1f} {result['logs_per_s']:>12.0f} "
+              f"{result['mean_ms']:>9.2f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {change:>8}")
+    for kind, stats in report.get("decode_memo", {}).items():
+        if stats:
+            print(f"decode memo ({kind}): {stats['hit_rate'] * 100:.1f}% hit rate, {stats['entries']} entries")
+    lookups = report.get("contract_lookups")
+    if lookups:
+        print(f"contract lookups: {lookups['hit_rate'] * 100:.1f}% hit rate, "
+              f"{lookups['known']} known, {lookups['unknown']} unknown")
+    decode_filter = report.get("decode_filter")
+    if decode_filter and decode_filter["mode"] != "all":
+        print(f"decode filter ({decode_filter['mode']}): skipped {decode_filter['transactions_skipped']} txs, "
+              f"{decode_filter['logs_skipped']} logs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline decode benchmark for WESMOL Indexer")
+    parser.add_argument("--corpus", type=str, default=str(DEFAULT_CORPUS),
+                        help="Directory of raw block JSON files (default: checked-in fixtures)")
+    parser.add_argument("--contracts", type=str, default=str(DEFAULT_CONTRACTS),
+                        help="Registry contracts.json (default: fixture registry)")
+    parser.add_argument("--abi-dir", type=str, default=str(DEFAULT_ABI_DIR),
+                        help="ABI directory (default: indexer config/abis)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES),
+                        help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed passes over the corpus per stage (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Untimed passes before timing (default: 1)")
+    parser.add_argument("--decode-filter", choices=["all", "registry", "topics"], default="all",
+                        help="Decode filter mode (default: all)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Decode into CompactBlock (see DECODE_COMPACT_BLOCKS)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write results JSON to this file")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Baseline results JSON to compare throughput against")
+    args = parser.parse_args()
+
+    # Per-block INFO logging would dominate the measurements
+    logging.disable(logging.INFO)
+
+    report = run_benchmark(
+        Path(args.corpus),
+        Path(args.contracts),
+        Path(args.abi_dir),
+        stages=args.stages,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        decode_filter=args.decode_filter,
+        compact=args.compact
+    )
+
+    changes = None
+    if args.compare:
+        with open(args.compare) as f:
+            changes = compare(report, json.load(f))
+        report["compare"] = {"baseline": args.compare, "blocks_per_s_change": changes}
+
+    print_report(report, changes)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
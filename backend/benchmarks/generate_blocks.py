@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Synthetic Avalanche block generator for benchmarks and load tests.
+
+Produces valid EvmFilteredBlock payloads in the QuickNode file layout. Logs and
+calldata for registry contracts are ABI-encoded from the real ABIs in
+config/abis; the remainder are ERC-20 style logs from unknown contracts.
+Encoded payloads are drawn from a pool of pre-encoded variants per event and
+function, so generation cost is dominated by JSON encoding and file writes.
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from offline import setup_offline_env, DEFAULT_CONTRACTS, DEFAULT_ABI_DIR
+
+setup_offline_env()
+
+import msgspec
+from eth_abi import encode
+from eth_utils import keccak
+
+from indexer.indexer.contracts.registry import ContractRegistry
+from indexer.indexer.model.evm import EvmLog, EvmTxReceipt, EvmTransaction, EvmFilteredBlock
+from indexer.indexer.storage.handler import BlockHandler
+from indexer.indexer.storage.local import LocalStorageHandler
+
+ERC20_TRANSFER = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+ERC20_APPROVAL = "0x" + keccak(text="Approval(address,address,uint256)").hex()
+AVALANCHE_CHAIN_ID = "0xa86a"
+EMPTY_BLOOM = "0x" + "00" * 256
+
+_ARRAY_RE = re.compile(r"^(.*)\[(\d*)\]$")
+
+# (address, topics, data) and (address, input)
+LogTemplate = Tuple[str, List[str], str]
+CallTemplate = Tuple[str, str]
+
+
+def parse_range(value: str) -> Tuple[int, int]:
+    """Parse "N" or "MIN:MAX" into an inclusive range."""
+    if ":" in value:
+        low, high = value.split(":", 1)
+        return int(low), int(high)
+    return int(value), int(value)
+
+
+def abi_type(param: dict) -> str:
+    """Canonical eth_abi type string for an ABI input, expanding tuples."""
+    param_type = param["type"]
+    if param_type.startswith("tuple"):
+        inner = ",".join(abi_type(c) for c in param.get("components", []))
+        return f"({inner}){param_type[len('tuple'):]}"
+    return param_type
+
+
+class ValueFactory:
+    """Random values for ABI types, drawing addresses from a shared wallet pool."""
+
+    def __init__(self, rnd: random.Random, wallets: List[str]):
+        self.rnd = rnd
+        self.wallets = wallets
+
+    def value(self, param: dict):
+        param_type = param["type"]
+        match = _ARRAY_RE.match(param_type)
+        if match:
+            length = int(match.group(2)) if match.group(2) else self.rnd.randint(0, 3)
+            element = dict(param, type=match.group(1))
+            return [self.value(element) for _ in range(length)]
+        if param_type == "tuple":
+            return tuple(self.value(c) for c in param.get("components", []))
+        if param_type == "address":
+            return self.rnd.choice(self.wallets)
+        if param_type == "bool":
+            return self.rnd.random() < 0.5
+        if param_type == "string":
+            return "".join(self.rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(self.rnd.randint(0, 24)))
+        if param_type == "bytes":
+            return self.rnd.randbytes(self.rnd.randint(0, 64))
+        if param_type.startswith("bytes"):
+            return self.rnd.randbytes(int(param_type[5:]))
+        if param_type.startswith("uint"):
+            bits = int(param_type[4:] or 256)
+            # Bias towards realistic magnitudes (ids, amounts) rather than full-width noise
+            return self.rnd.randrange(2 ** min(bits, self.rnd.choice((16, 64, 96, bits))))
+        if param_type.startswith("int"):
+            bits = int(param_type[3:] or 256)
+            bound = 2 ** (min(bits, 64) - 1)
+            return self.rnd.randrange(-bound, bound)
+        raise ValueError(f"Unsupported ABI type {param_type}")
+
+    def topic(self, param: dict, value) -> str:
+        """Encode an indexed event argument as a topic."""
+        param_type = abi_type(param)
+        if param_type in ("string", "bytes") or param_type.endswith("]") or param_type.startswith("("):
+            # Dynamic indexed values are stored as their keccak hash
+            return "0x" + self.rnd.randbytes(32).hex()
+        return "0x" + encode([param_type], [value]).hex()
+
+
+class TemplatePool:
+    """Pre-encoded log and calldata variants for registry and unknown contracts."""
+
+    def __init__(self, registry: ContractRegistry, rnd: random.Random, variants: int = 32,
+                 wallet_count: int = 2000, token_count: int = 200):
+        self.rnd = rnd
+        self.wallets = ["0x" + rnd.randbytes(20).hex() for _ in range(wallet_count)]
+        self.tokens = ["0x" + rnd.randbytes(20).hex() for _ in range(token_count)]
+        self.values = ValueFactory(rnd, self.wallets)
+
+        self.known_logs: List[LogTemplate] = []
+        self.known_calls: List[CallTemplate] = []
+        for address, contract in registry.contracts.items():
+            for item in contract.abi:
+                try:
+                    if item.get("type") == "event" and not item.get("anonymous"):
+                        self.known_logs.extend(self._event_variants(address, item) for _ in range(variants))
+                    elif item.get("type") == "function" and item.get("stateMutability") not in ("view", "pure"):
+                        self.known_calls.extend(self._call_variants(address, item) for _ in range(variants))
+                except (ValueError, TypeError, OverflowError):
+                    # Exotic types we can't synthesize; skip the entry
+                    continue
+
+        self.unknown_logs: List[LogTemplate] = [self._erc20_log() for _ in range(variants * 8)]
+        self.unknown_calls: List[CallTemplate] = [self._erc20_call() for _ in range(variants * 8)]
+
+    def _event_variants(self, address: str, event: dict) -> LogTemplate:
+        inputs = event.get("inputs", [])
+        signature = f"{event['name']}({','.join(abi_type(i) for i in inputs)})"
+        topics = ["0x" + keccak(text=signature).hex()]
+        data_types, data_values = [], []
+        for param in inputs:
+            value = self.values.value(param)
+            if param.get("indexed"):
+                topics.append(self.values.topic(param, value))
+            else:
+                data_types.append(abi_type(param))
+                data_values.append(value)
+        return address, topics, "0x" + encode(data_types, data_values).hex()
+
+    def _call_variants(self, address: str, function: dict) -> CallTemplate:
+        inputs = function.get("inputs", [])
+        types = [abi_type(i) for i in inputs]
+        selector = keccak(text=f"{function['name']}({','.join(types)})")[:4]
+        args = encode(types, [self.values.value(i) for i in inputs])
+        return address, "0x" + (selector + args).hex()
+
+    def _erc20_log(self) -> LogTemplate:
+        topic = ERC20_TRANSFER if self.rnd.random() < 0.8 else ERC20_APPROVAL
+        topics = [topic] + ["0x" + "00" * 12 + self.rnd.choice(self.wallets)[2:] for _ in range(2)]
+        return self.rnd.choice(self.tokens), topics, "0x" + encode(["uint256"], [self.rnd.randrange(10 ** 24)]).hex()
+
+    def _erc20_call(self) -> CallTemplate:
+        args = encode(["address", "uint256"], [self.rnd.choice(self.wallets), self.rnd.randrange(10 ** 24)])
+        return self.rnd.choice(self.tokens), "0xa9059cbb" + args.hex()
+
+
+class SyntheticBlockGenerator:
+    """Builds EvmFilteredBlock payloads from a TemplatePool."""
+
+    def __init__(self, pool: TemplatePool, rnd: random.Random,
+                 txs_per_block: Tuple[int, int] = (20, 60),
+                 logs_per_receipt: Tuple[int, int] = (0, 6),
+                 known_ratio: float = 0.2,
+                 failed_ratio: float = 0.02):
+        self.pool = pool
+        self.rnd = rnd
+        self.txs_per_block = txs_per_block
+        self.logs_per_receipt = logs_per_receipt
+        self.known_ratio = known_ratio
+        self.failed_ratio = failed_ratio
+        self.encoder = msgspec.json.Encoder()
+
+    def _hash(self) -> str:
+        return "0x" + self.rnd.randbytes(32).hex()
+
+    def _pick_log(self) -> LogTemplate:
+        if self.pool.known_logs and self.rnd.random() < self.known_ratio:
+            return self.rnd.choice(self.pool.known_logs)
+        return self.rnd.choice(self.pool.unknown_logs)
+
+    def _pick_call(self) -> CallTemplate:
+        if self.pool.known_calls and self.rnd.random() < self.known_ratio:
+            return self.rnd.choice(self.pool.known_calls)
+        return self.rnd.choice(self.pool.unknown_calls)
+
+    def block(self, block_number: int, timestamp: int) -> EvmFilteredBlock:
+        rnd = self.rnd
+        block_hex = hex(block_number)
+        block_hash = self._hash()
+        transactions, receipts = [], []
+        log_index = 0
+        cumulative_gas = 0
+
+        for tx_index in range(rnd.randint(*self.txs_per_block)):
+            tx_hash = self._hash()
+            tx_index_hex = hex(tx_index)
+            sender = rnd.choice(self.pool.wallets)
+            to, tx_input = self._pick_call()
+            gas_used = rnd.randint(21000, 500000)
+            cumulative_gas += gas_used
+            success = rnd.random() >= self.failed_ratio
+
+            logs = []
+            if success:
+                for _ in range(rnd.randint(*self.logs_per_receipt)):
+                    address, topics, data = self._pick_log()
+                    logs.append(EvmLog(
+                        address=address,
+                        blockHash=block_hash,
+                        blockNumber=block_hex,
+                        data=data,
+                        logIndex=hex(log_index),
+                        removed=False,
+                        topics=topics,
+                        transactionHash=tx_hash,
+                        transactionIndex=tx_index_hex
+                    ))
+                    log_index += 1
+
+            transactions.append(EvmTransaction(
+                accessList=[],
+                blockHash=block_hash,
+                blockNumber=block_hex,
+                chainId=AVALANCHE_CHAIN_ID,
+                from_=sender,
+                gas=hex(gas_used + 20000),
+                gasPrice=hex(25 * 10 ** 9),
+                hash=tx_hash,
+                input=tx_input,
+                maxFeePerGas=hex(30 * 10 ** 9),
+                maxPriorityFeePerGas=hex(10 ** 9),
+                nonce=hex(rnd.randrange(100000)),
+                r=self._hash(),
+                s=self._hash(),
+                to=to,
+                transactionIndex=tx_index_hex,
+                type="0x2",
+                v="0x1",
+                value="0x0"
+            ))
+            receipts.append(EvmTxReceipt(
+                blockHash=block_hash,
+                blockNumber=block_hex,
+                contractAddress=None,
+                cumulativeGasUsed=hex(cumulative_gas),
+                effectiveGasPrice=hex(25 * 10 ** 9),
+                from_=sender,
+                gasUsed=hex(gas_used),
+                logs=logs,
+                logsBloom=EMPTY_BLOOM,
+                status="0x1" if success else "0x0",
+                to=to,
+                transactionHash=tx_hash,
+                transactionIndex=tx_index_hex,
+                type="0x2"
+            ))
+
+        return EvmFilteredBlock(
+            block=block_hex,
+            timestamp=hex(timestamp),
+            transactions=transactions,
+            receipts=receipts
+        )
+
+    def encode_block(self, block_number: int, timestamp: int) -> bytes:
+        return self.encoder.encode(self.block(block_number, timestamp))
+
+
+def _generate_range(options: dict, start: int, end: int, worker: int) -> Tuple[int, int]:
+    """Generate blocks [start, end) into options["out"]. Returns (blocks, bytes)."""
+    rnd = random.Random(options["seed"] * 1000003 + worker)
+    # Templates are seeded identically in every worker so the payload pool is shared
+    registry = ContractRegistry(options["contracts"], options["abi_dir"])
+    pool = TemplatePool(registry, random.Random(options["seed"]), variants=options["variants"])
+    generator = SyntheticBlockGenerator(
+        pool, rnd,
+        txs_per_block=options["txs"],
+        logs_per_receipt=options["logs"],
+        known_ratio=options["known_ratio"],
+        failed_ratio=options["failed_ratio"]
+    )
+
+    storage = LocalStorageHandler(options["out"])
+    handler = BlockHandler(storage, raw_prefix=options["prefix"], decoded_prefix="decoded/")
+    total_bytes = 0
+    for block_number in range(start, end):
+        timestamp = options["start_timestamp"] + (block_number - options["start_block"]) * 2
+        payload = generator.encode_block(block_number, timestamp)
+        storage.upload_blob_from_string(payload, f"{options['prefix']}{handler.build_path_from_block(block_number)}")
+        total_bytes += len(payload)
+    return end - start, total_bytes
+
+
+def generate(options: dict, workers: int = 1) -> Tuple[int, int]:
+    """Generate options["count"] blocks, split into contiguous ranges across workers."""
+    start_block, count = options["start_block"], options["count"]
+    workers = max(1, min(workers, count))
+    step = -(-count // workers)
+    ranges = [(start_block + i, min(start_block + count, start_block + i + step), n)
+              for n, i in enumerate(range(0, count, step))]
+
+    if workers == 1:
+        return _generate_range(options, *ranges[0])
+
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(_generate_range, [(options, *r) for r in ranges])
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Avalanche blocks")
+    parser.add_argument("--out", type=str, required=True,
+                        help="Local storage root to write blocks to")
+    parser.add_argument("--prefix", type=str, default="",
+                        help="Blob prefix under --out, e.g. the GCS_RPC_PREFIX (default: none)")
+    parser.add_argument("--count", type=int, default=1000,
+                        help="Number of blocks to generate (default: 1000)")
+    parser.add_argument("--start-block", type=int, default=50_000_000,
+                        help="First block number (default: 50000000)")
+    parser.add_argument("--start-timestamp", type=int, default=1_717_000_000,
+                        help="Unix timestamp of the first block (default: 1717000000)")
+    parser.add_argument("--txs", type=parse_range, default=(20, 60),
+                        help="Transactions per block, N or MIN:MAX (default: 20:60)")
+    parser.add_argument("--logs", type=parse_range, default=(0, 6),
+                        help="Logs per receipt, N or MIN:MAX (default: 0:6)")
+    parser.add_argument("--known-ratio", type=float, default=0.2,
+                        help="Share of logs and calls targeting registry contracts (default: 0.2)")
+    parser.add_argument("--failed-ratio", type=float, default=0.02,
+                        help="Share of reverted transactions (default: 0.02)")
+    parser.add_argument("--variants", type=int, default=32,
+                        help="Pre-encoded variants per event/function (default: 32)")
+    parser.add_argument("--contracts", type=str, default=str(DEFAULT_CONTRACTS),
+                        help="Registry contracts.json (default: fixture registry)")
+    parser.add_argument("--abi-dir", type=str, default=str(DEFAULT_ABI_DIR),
+                        help="ABI directory (default: indexer config/abis)")
+    parser.add_argument("--seed", type=int, default=28,
+                        help="Random seed (default: 28)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    options = {
+        "out": args.out,
+        "prefix": args.prefix,
+        "count": args.count,
+        "start_block": args.start_block,
+        "start_timestamp": args.start_timestamp,
+        "txs": args.txs,
+        "logs": args.logs,
+        "known_ratio": args.known_ratio,
+        "failed_ratio": args.failed_ratio,
+        "variants": args.variants,
+        "contracts": args.contracts,
+        "abi_dir": args.abi_dir,
+        "seed": args.seed,
+    }
+
+    started = time.perf_counter()
+    blocks, total_bytes = generate(options, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Generated {blocks} blocks ({total_bytes / 1e6:.1f} MB) in {elapsed:.1f}s "
+          f"({blocks / elapsed:.0f} blocks/s) under {Path(args.out) / args.prefix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Avalanche JSON-RPC endpoint.
+
+Serves a synthetic chain (blocks from generate_blocks.SyntheticBlockGenerator) with
+consistent hash/parentHash links over HTTP JSON-RPC, including batch requests.
+The tip advances every --block-time seconds, and reorgs of configurable depth
+can be injected to exercise the tip follower. Supported methods: eth_chainId,
+eth_blockNumber, eth_getBlockByNumber and eth_getBlockReceipts.
+"""
+
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple
+
+from offline import setup_offline_env, DEFAULT_CONTRACTS, DEFAULT_ABI_DIR
+
+setup_offline_env()
+
+import msgspec
+
+from indexer.indexer.contracts.registry import ContractRegistry
+from generate_blocks import TemplatePool, SyntheticBlockGenerator, AVALANCHE_CHAIN_ID
+
+
+class MockChain:
+    """Synthetic chain whose blocks are generated on first request and cached per fork."""
+
+    def __init__(self, generator: SyntheticBlockGenerator, start_block: int, tip: int,
+                 start_timestamp: int = 1_717_000_000, empty_ratio: float = 0.0, seed: int = 0):
+        self.generator = generator
+        self.start_block = start_block
+        self.start_timestamp = start_timestamp
+        self.empty_ratio = empty_ratio
+        self.seed = seed
+        self.tip = tip
+        self.forks: Dict[int, int] = {}  # block_number -> fork version (bumped by reorgs)
+        self._cache: Dict[Tuple[int, int], Tuple[Dict[str, Any], list]] = {}
+        self.lock = threading.Lock()
+        self.reorgs = 0
+
+    def block_hash(self, number: int) -> str:
+        version = self.forks.get(number, 0)
+        return "0x" + hashlib.sha256(f"{self.seed}:{number}:{version}".encode()).hexdigest()
+
+    def advance(self, blocks: int = 1):
+        with self.lock:
+            self.tip += blocks
+
+    def reorg(self, depth: int):
+        """Replace the last depth blocks with a competing fork."""
+        with self.lock:
+            for number in range(max(self.start_block, self.tip - depth + 1), self.tip + 1):
+                self.forks[number] = self.forks.get(number, 0) + 1
+            self.reorgs += 1
+
+    def get(self, number: int) -> Optional[Tuple[Dict[str, Any], list]]:
+        with self.lock:
+            if number < self.start_block or number > self.tip:
+                return None
+            key = (number, self.forks.get(number, 0))
+            cached = self._cache.get(key)
+            if cached is None:
+                cached = self._cache[key] = self._build(number, key[1])
+            return cached
+
+    def _build(self, number: int, version: int) -> Tuple[Dict[str, Any], list]:
+        rnd = random.Random(hash((self.seed, number, version)))
+        self.generator.rnd = rnd
+        timestamp = self.start_timestamp + (number - self.start_block) * 2
+        if rnd.random() < self.empty_ratio:
+            filtered = {"transactions": [], "receipts": []}
+        else:
+            filtered = msgspec.to_builtins(self.generator.block(number, timestamp))
+
+        block_hash = self.block_hash(number)
+        for item in filtered["transactions"] + filtered["receipts"]:
+            item["blockHash"] = block_hash
+        for receipt in filtered["receipts"]:
+            for log in receipt["logs"]:
+                log["blockHash"] = block_hash
+
+        block = {
+            "number": hex(number),
+            "hash": block_hash,
+            "parentHash": self.block_hash(number - 1),
+            "timestamp": hex(timestamp),
+            "transactions": filtered["transactions"]
+        }
+        return block, filtered["receipts"]
+
+
+class MockRpcServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, chain: MockChain, latency: float = 0.0, max_batch: int = 1000,
+                 max_concurrent: Optional[int] = None):
+        super().__init__(address, MockRpcHandler)
+        self.chain = chain
+        self.latency = latency
+        self.max_batch = max_batch
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.stats = {"http_requests": 0, "calls": 0, "throttled": 0, "max_in_flight": 0}
+        self.stats_lock = threading.Lock()
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = request.get("method"), request.get("params") or []
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if method == "eth_chainId":
+            response["result"] = AVALANCHE_CHAIN_ID
+        elif method == "eth_blockNumber":
+            response["result"] = hex(self.chain.tip)
+        elif method in ("eth_getBlockByNumber", "eth_getBlockReceipts"):
+            tag = params[0]
+            number = self.chain.tip if tag == "latest" else int(tag, 16)
+            found = self.chain.get(number)
+            if found is None:
+                response["result"] = None
+            elif method == "eth_getBlockReceipts":
+                response["result"] = found[1]
+            elif len(params) > 1 and params[1]:
+                response["result"] = found[0]
+            else:
+                response["result"] = {**found[0], "transactions": [tx["hash"] for tx in found[0]["transactions"]]}
+        else:
+            response["error"] = {"code": -32601, "message": f"Method {method} not found"}
+        return response
+
+
+class MockRpcHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server: MockRpcServer = self.server
+        payload = msgspec.json.decode(self.rfile.read(int(self.headers["Content-Length"])))
+
+        with server.stats_lock:
+            server.stats["http_requests"] += 1
+            server.in_flight += 1
+            server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server.in_flight)
+            throttled = server.max_concurrent is not None and server.in_flight > server.max_concurrent
+            if throttled:
+                server.stats["throttled"] += 1
+        try:
+            if throttled:
+                return self._send(429, b'{"error": "Too Many Requests"}')
+            if server.latency:
+                time.sleep(server.latency)
+
+            if isinstance(payload, list):
+                if len(payload) > server.max_batch:
+                    error = {"code": -32005, "message": f"batch limit {server.max_batch} exceeded"}
+                    return self._send(200, msgspec.json.encode({"jsonrpc": "2.0", "id": None, "error": error}))
+                result = [server.dispatch(request) for request in payload]
+            else:
+                result = server.dispatch(payload)
+            with server.stats_lock:
+                server.stats["calls"] += len(payload) if isinstance(payload, list) else 1
+            self._send(200, msgspec.json.encode(result))
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+
+def build_server(port: int = 0, start_block: int = 50_000_000, tip: Optional[int] = None,
+                 seed: int = 0, txs: Tuple[int, int] = (5, 20), empty_ratio: float = 0.0,
+                 latency: float = 0.0, max_batch: int = 1000,
+                 max_concurrent: Optional[int] = None) -> MockRpcServer:
+    """Mock server on localhost (port 0 picks a free port; see server.server_address)."""
+    registry = ContractRegistry(DEFAULT_CONTRACTS, DEFAULT_ABI_DIR)
+    pool = TemplatePool(registry, random.Random(seed))
+    generator = SyntheticBlockGenerator(pool, random.Random(seed), txs_per_block=txs, logs_per_receipt=(0, 4))
+    chain = MockChain(generator, start_block, tip if tip is not None else start_block, empty_ratio=empty_ratio, seed=seed)
+    return MockRpcServer(("127.0.0.1", port), chain, latency=latency, max_batch=max_batch,
+                         max_concurrent=max_concurrent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Avalanche JSON-RPC endpoint")
+    parser.add_argument("--port", type=int, default=8545, help="Port to listen on (default: 8545)")
+    parser.add_argument("--start-block", type=int, default=50_000_000,
+                        help="First block of the chain (default: 50000000)")
+    parser.add_argument("--tip", type=int, default=None,
+                        help="Initial tip (default: start block)")
+    parser.add_argument("--block-time", type=float, default=2.0,
+                        help="Seconds between new blocks, 0 for a static chain (default: 2)")
+    parser.add_argument("--reorg-every", type=int, default=0,
+                        help="Inject a reorg every N new blocks (default: never)")
+    parser.add_argument("--reorg-depth", type=int, default=2,
+                        help="Blocks replaced per injected reorg (default: 2)")
+    parser.add_argument("--empty-ratio", type=float, default=0.0,
+                        help="Fraction of blocks without transactions")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Added latency per HTTP request")
+    parser.add_argument("--max-batch", type=int, default=1000,
+                        help="Largest accepted JSON-RPC batch (default: 1000)")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="Answer HTTP 429 above this many concurrent requests")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    server = build_server(args.port, args.start_block, args.tip, args.seed, empty_ratio=args.empty_ratio,
+                          latency=args.latency_ms / 1000, max_batch=args.max_batch,
+                          max_concurrent=args.max_concurrent)
+    chain = server.chain
+    print(f"Mock RPC on http://127.0.0.1:{server.server_address[1]} (tip {chain.tip})", file=sys.stderr)
+
+    def produce():
+        produced = 0
+        while args.block_time > 0:
+            time.sleep(args.block_time)
+            chain.advance()
+            produced += 1
+            if args.reorg_every and produced % args.reorg_every == 0:
+                chain.reorg(args.reorg_depth)
+                print(f"Reorged last {args.reorg_depth} blocks at tip {chain.tip}", file=sys.stderr)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
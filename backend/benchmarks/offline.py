@@ -0,0 +1,39 @@
+"""
+Offline environment defaults for benchmark and load-test scripts.
+
+The indexer validates its environment on import, so these must be applied
+before anything from indexer.indexer is imported.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARK_DIR.parent
+DEFAULT_CONTRACTS = BENCHMARK_DIR / "fixtures" / "contracts.json"
+DEFAULT_ABI_DIR = BACKEND_DIR / "indexer" / "config" / "abis"
+
+OFFLINE_ENV = {
+    "ENVIRONMENT": "benchmark",
+    "LOG_LEVEL": "WARNING",
+    "DB_USE_SQLITE": "true",
+    "GCS_PROJECT_ID": "benchmark",
+    "GCS_BUCKET_NAME": "benchmark",
+    "GCS_CREDENTIALS_PATH": "none",
+    "GCS_RPC_PREFIX": "raw/",
+    "GCS_DECODED_PREFIX": "decoded/",
+    "RAW_BLOCK_FORMAT": "{}.json",
+    "DECODED_BLOCK_FORMAT": "{}.json",
+    "RPC_BLOCK_FORMAT": "{}.json",
+    "AVAX_RPC": "http://localhost:8545",
+    "PORT": "8080",
+}
+
+
+def setup_offline_env():
+    """Put backend dir on sys.path and fill in any missing indexer env vars."""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.append(str(BACKEND_DIR))
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
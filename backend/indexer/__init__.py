@@ -14,6 +14,6 @@ from indexer.indexer.processing.processor import BlockProcessor
 from indexer.indexer.database.models.status import ProcessingStatus
 from indexer.indexer.contracts.registry import ContractRegistry
 from indexer.indexer.contracts.manager import ContractManager
-from indexer.indexer.storage.local import LocalStorageHandler
+from indexer.indexer.storage.local import LocalBlockHandler, LocalStorageHandler
 
 __version__ = "0.1.0"
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""Vectorised statistics over the trades and mints of decoded blocks."""
+
+from .trades import TradeColumns, TradeLoader, collection_stats, last_sales, rolling_volume
@@ -0,0 +1,364 @@
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+try:
+    import pyarrow
+except ImportError:  # only needed for to_arrow/from_arrow
+    pyarrow = None
+
+from ..database.models.status import ProcessingStatus
+from ..utils.logging import setup_logger
+
+
+KIND_TRADE = 0
+KIND_MINT = 1
+_KINDS = {"TradeEvent": KIND_TRADE, "MintEvent": KIND_MINT}
+
+# Dictionary-encoded columns: int32 codes into a per-column array of values
+CATEGORICAL = ("nft_address", "nft_id", "buyer", "seller", "token_address")
+NUMERIC = ("kind", "block_number", "timestamp", "price")
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise RuntimeError("Arrow conversion requires the 'pyarrow' package (pip install pyarrow)")
+
+
+def _encode(values: List[Any]):
+    """Dictionary-encode a column: (values, int32 codes)."""
+    dictionary: Dict[Any, int] = {}
+    codes = np.fromiter((dictionary.setdefault(v, len(dictionary)) for v in values),
+                        dtype=np.int32, count=len(values))
+    uniques = np.empty(len(dictionary), dtype=object)
+    uniques[:] = list(dictionary)
+    return uniques, codes
+
+
+def _group_ends(sorted_keys: np.ndarray) -> np.ndarray:
+    """Index of the last row of every run of equal keys in a sorted array."""
+    if not len(sorted_keys):
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.append(sorted_keys[1:] != sorted_keys[:-1], True))
+
+
+class TradeColumns:
+    """
+    Trades and mints of a block range as NumPy columns, one row per event.
+
+    Numeric columns: kind (KIND_TRADE/KIND_MINT), block_number, timestamp (unix
+    seconds) and price (wei, float64: uint256 amounts don't fit an integer dtype and
+    the statistics are floats anyway). Addresses and token ids are dictionary-encoded:
+    codes[name] holds int32 codes into dictionaries[name], so group-bys run on small
+    integers. Rows are in chain order (block, transaction, event).
+
+    Mints have the minter as buyer and no seller (None). Prices are in the
+    units of token_address, so statistics are grouped by collection and token.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], codes: Dict[str, np.ndarray],
+                 dictionaries: Dict[str, np.ndarray]):
+        self.kind = columns["kind"]
+        self.block_number = columns["block_number"]
+        self.timestamp = columns["timestamp"]
+        self.price = columns["price"]
+        self.codes = codes
+        self.dictionaries = dictionaries
+
+    def __len__(self) -> int:
+        return len(self.block_number)
+
+    @classmethod
+    def from_events(cls, rows: Iterable[Dict[str, Any]]) -> "TradeColumns":
+        """
+        Build columns from event dicts, as stored in Transaction.events of decoded blocks.
+
+        Rows need block_number and a unix timestamp next to the event fields; events
+        other than TradeEvent and MintEvent are skipped.
+        """
+        columns = {name: [] for name in NUMERIC + CATEGORICAL}
+        for row in rows:
+            kind = _KINDS.get(row.get("type"))
+            if kind is None:
+                continue
+            columns["kind"].append(kind)
+            columns["block_number"].append(row["block_number"])
+            columns["timestamp"].append(row["timestamp"])
+            columns["price"].append(row["price"])
+            columns["nft_address"].append(row["nft_address"])
+            columns["nft_id"].append(row["nft_id"])
+            columns["token_address"].append(row["token_address"])
+            if kind == KIND_TRADE:
+                columns["buyer"].append(row["buyer"])
+                columns["seller"].append(row["seller"])
+            else:
+                columns["buyer"].append(row["minter"])
+                columns["seller"].append(None)
+
+        numeric = {
+            "kind": np.array(columns["kind"], dtype=np.int8),
+            "block_number": np.array(columns["block_number"], dtype=np.int64),
+            "timestamp": np.array(columns["timestamp"], dtype=np.int64),
+            "price": np.array(columns["price"], dtype=np.float64),
+        }
+        codes, dictionaries = {}, {}
+        for name in CATEGORICAL:
+            dictionaries[name], codes[name] = _encode(columns[name])
+        return cls(numeric, codes, dictionaries)
+
+    @classmethod
+    def from_arrow(cls, table) -> "TradeColumns":
+        """
+        Wrap an Arrow table with the columns of to_arrow().
+
+        Numeric columns and dictionary indices without nulls are taken zero-copy.
+        """
+        _require_pyarrow()
+        table = table.combine_chunks()
+
+        def array(name):
+            column = table.column(name)
+            return column.chunk(0) if column.num_chunks else pyarrow.array([], type=column.type)
+
+        numeric = {name: array(name).to_numpy(zero_copy_only=False) for name in NUMERIC}
+        codes, dictionaries = {}, {}
+        for name in CATEGORICAL:
+            column = array(name)
+            if not pyarrow.types.is_dictionary(column.type):
+                column = column.dictionary_encode()
+            codes[name] = column.indices.cast(pyarrow.int32()).to_numpy(zero_copy_only=False)
+            values = np.empty(len(column.dictionary), dtype=object)
+            values[:] = column.dictionary.to_pylist()
+            dictionaries[name] = values
+        return cls(numeric, codes, dictionaries)
+
+    def to_arrow(self):
+        """Arrow table of the columns; addresses and ids become dictionary arrays over the same codes."""
+        _require_pyarrow()
+        arrays = {name: pyarrow.array(getattr(self, name)) for name in NUMERIC}
+        for name in CATEGORICAL:
+            values = self.dictionaries[name]
+            if name == "nft_id":
+                values = [str(v) for v in values]  # uint256
+            arrays[name] = pyarrow.DictionaryArray.from_arrays(pyarrow.array(self.codes[name]),
+                                                               pyarrow.array(list(values)))
+        return pyarrow.table(arrays)
+
+    def select(self, mask: np.ndarray) -> "TradeColumns":
+        """Rows where mask is true (or at the given indices); dictionaries are shared."""
+        return TradeColumns(
+            {name: getattr(self, name)[mask] for name in NUMERIC},
+            {name: codes[mask] for name, codes in self.codes.items()},
+            self.dictionaries
+        )
+
+    def trades(self) -> "TradeColumns":
+        return self.select(self.kind == KIND_TRADE)
+
+    def for_collection(self, nft_address: str) -> "TradeColumns":
+        matches = np.flatnonzero(self.dictionaries["nft_address"] == nft_address.lower())
+        return self.select(np.isin(self.codes["nft_address"], matches))
+
+    def values(self, name: str, codes: np.ndarray) -> np.ndarray:
+        """Decode codes of a categorical column."""
+        return self.dictionaries[name][codes]
+
+
+def _collection_keys(columns: TradeColumns) -> np.ndarray:
+    """One int64 key per (collection, payment token) pair."""
+    tokens = len(columns.dictionaries["token_address"])
+    return columns.codes["nft_address"].astype(np.int64) * max(tokens, 1) + columns.codes["token_address"]
+
+
+def _distinct_per_group(groups: np.ndarray, values: np.ndarray, group_count: int) -> np.ndarray:
+    """Number of distinct values in every group (groups are 0..group_count-1)."""
+    stride = int(values.max(initial=0)) + 1
+    pairs = np.unique(groups.astype(np.int64) * stride + values)
+    return np.bincount(pairs // stride, minlength=group_count)
+
+
+def collection_stats(columns: TradeColumns) -> List[Dict[str, Any]]:
+    """
+    Per collection and payment token: trades, volume, VWAP, floor (lowest trade
+    price), last price, unique buyers and sellers, and mints.
+
+    Every ERC-721 sale moves one token, so the VWAP of a collection is its volume over
+    its trade count. Sorted by volume, largest first.
+    """
+    if not len(columns):
+        return []
+    keys, groups = np.unique(_collection_keys(columns), return_inverse=True)
+    count = len(keys)
+    is_trade = columns.kind == KIND_TRADE
+
+    trades = np.bincount(groups, weights=is_trade, minlength=count).astype(np.int64)
+    mints = np.bincount(groups, weights=~is_trade, minlength=count).astype(np.int64)
+    volume = np.bincount(groups, weights=np.where(is_trade, columns.price, 0.0), minlength=count)
+    mint_volume = np.bincount(groups, weights=np.where(is_trade, 0.0, columns.price), minlength=count)
+
+    floor = np.full(count, np.inf)
+    np.minimum.at(floor, groups[is_trade], columns.price[is_trade])
+    trade_rows = np.flatnonzero(is_trade)
+    order = trade_rows[np.argsort(groups[trade_rows], kind="stable")]  # chain order within a group
+    last_price = np.full(count, np.nan)
+    last_rows = order[_group_ends(groups[order])]
+    last_price[groups[last_rows]] = columns.price[last_rows]
+
+    buyers = _distinct_per_group(groups[is_trade], columns.codes["buyer"][is_trade], count)
+    sellers = _distinct_per_group(groups[is_trade], columns.codes["seller"][is_trade], count)
+    minters = _distinct_per_group(groups[~is_trade], columns.codes["buyer"][~is_trade], count)
+
+    tokens = max(len(columns.dictionaries["token_address"]), 1)
+    nft_addresses = columns.dictionaries["nft_address"][keys // tokens]
+    token_addresses = columns.dictionaries["token_address"][keys % tokens]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = volume / trades
+
+    stats = []
+    for i in np.argsort(-volume, kind="stable"):
+        stats.append({
+            "nft_address": nft_addresses[i],
+            "token_address": token_addresses[i],
+            "trades": int(trades[i]),
+            "volume": float(volume[i]),
+            "vwap": float(vwap[i]) if trades[i] else None,
+            "floor": float(floor[i]) if trades[i] else None,
+            "last_price": float(last_price[i]) if trades[i] else None,
+            "unique_buyers": int(buyers[i]),
+            "unique_sellers": int(sellers[i]),
+            "mints": int(mints[i]),
+            "unique_minters": int(minters[i]),
+            "mint_volume": float(mint_volume[i])
+        })
+    return stats
+
+
+def rolling_volume(columns: TradeColumns, bucket_seconds: int = 3600,
+                   window_seconds: int = 86400) -> Dict[str, Any]:
+    """
+    Trade volume, count and VWAP per time bucket, plus the same over a trailing window.
+
+    Buckets are aligned to multiples of bucket_seconds and cover the range densely
+    (empty buckets are zeros); the window is rounded up to whole buckets. Mix
+    collections or payment tokens only if that's what you want summed.
+    """
+    trades = columns.trades()
+    if not len(trades):
+        return {"bucket_seconds": bucket_seconds, "window_seconds": window_seconds, "buckets": []}
+    bucket = trades.timestamp // bucket_seconds
+    first = int(bucket.min())
+    index = bucket - first
+    size = int(index.max()) + 1
+
+    volume = np.bincount(index, weights=trades.price, minlength=size)
+    count = np.bincount(index, minlength=size)
+
+    width = max(1, -(-window_seconds // bucket_seconds))
+    cumulative_volume = np.concatenate(([0.0], np.cumsum(volume)))
+    cumulative_count = np.concatenate(([0], np.cumsum(count)))
+    start = np.maximum(np.arange(size) + 1 - width, 0)
+    window_volume = cumulative_volume[1:] - cumulative_volume[start]
+    window_count = cumulative_count[1:] - cumulative_count[start]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = volume / count
+        window_vwap = window_volume / window_count
+
+    starts = (np.arange(size) + first) * bucket_seconds
+    return {
+        "bucket_seconds": bucket_seconds,
+        "window_seconds": width * bucket_seconds,
+        "buckets": [
+            {
+                "start": int(starts[i]),
+                "trades": int(count[i]),
+                "volume": float(volume[i]),
+                "vwap": float(vwap[i]) if count[i] else None,
+                "window_trades": int(window_count[i]),
+                "window_volume": float(window_volume[i]),
+                "window_vwap": float(window_vwap[i]) if window_count[i] else None
+            }
+            for i in range(size)
+        ]
+    }
+
+
+def last_sales(columns: TradeColumns) -> List[Dict[str, Any]]:
+    """Latest trade of every NFT (collection and token id)."""
+    trades = columns.trades()
+    if not len(trades):
+        return []
+    ids = len(trades.dictionaries["nft_id"])
+    nft = trades.codes["nft_address"].astype(np.int64) * max(ids, 1) + trades.codes["nft_id"]
+    order = np.lexsort((np.arange(len(trades)), nft))  # by NFT, then chain order
+    last = order[_group_ends(nft[order])]
+
+    return [
+        {
+            "nft_address": trades.dictionaries["nft_address"][trades.codes["nft_address"][row]],
+            "nft_id": int(trades.dictionaries["nft_id"][trades.codes["nft_id"][row]]),
+            "price": float(trades.price[row]),
+            "token_address": trades.dictionaries["token_address"][trades.codes["token_address"][row]],
+            "buyer": trades.dictionaries["buyer"][trades.codes["buyer"][row]],
+            "block_number": int(trades.block_number[row]),
+            "timestamp": int(trades.timestamp[row])
+        }
+        for row in last
+    ]
+
+
+class TradeLoader:
+    """Loads the trades and mints of stored decoded blocks into TradeColumns."""
+
+    def __init__(self, handler, workers: int = 8):
+        """
+        Initialize trade loader.
+
+        Args:
+            handler: BlockHandler or LocalBlockHandler the decoded blocks are read from
+            workers: Concurrent decoded block downloads
+        """
+        self.handler = handler
+        self.workers = workers
+        self.logger = setup_logger(__name__)
+        self.missing = 0
+
+    def _block_rows(self, block_number: int) -> List[Dict[str, Any]]:
+        block = self.handler.get_decoded_block(block_number)
+        if block is None:
+            self.missing += 1
+            return []
+        timestamp = block.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = int(datetime.fromisoformat(timestamp).timestamp())
+        rows = []
+        transactions = sorted((block.get("transactions") or {}).values(), key=lambda tx: tx["index"])
+        for tx in transactions:
+            for event in tx.get("events") or ():
+                if event.get("type") in _KINDS:
+                    event["block_number"] = block_number
+                    event["timestamp"] = timestamp
+                    rows.append(event)
+        return rows
+
+    def load(self, block_numbers: Iterable[int]) -> TradeColumns:
+        """
+        Trades and mints of the given blocks, in block order.
+
+        Blocks without a stored decoded file are counted in self.missing.
+        """
+        block_numbers = sorted(block_numbers)
+        self.missing = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            blocks = executor.map(self._block_rows, block_numbers)
+            columns = TradeColumns.from_events(row for rows in blocks for row in rows)
+        if self.missing:
+            self.logger.warning(f"{self.missing} of {len(block_numbers)} blocks have no decoded file")
+        return columns
+
+    def load_range(self, db_manager, min_block: int, max_block: int) -> TradeColumns:
+        """Trades and mints of the blocks of a range marked valid in block_processing."""
+        paths = db_manager.get_block_paths_by_status(ProcessingStatus.VALID, min_block, max_block)
+        return self.load(self.handler.extract_block_number(path) for path in paths)
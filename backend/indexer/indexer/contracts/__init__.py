@@ -1,2 +1,3 @@
 from .manager import ContractManager
-from .registry import ABIConfig, ContractMetadata, ContractConfig, ContractRegistry
\ No newline at end of file
+from .registry import ABIConfig, ContractMetadata, ContractConfig, ContractRegistry, ImplementationChange, RegistryReport, abi_version, merge_abis, validate_abi
+from .watcher import RegistryWatcher
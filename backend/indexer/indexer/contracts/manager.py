@@ -1,34 +1,152 @@
 from web3 import Web3
 from web3.contract import Contract
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Tuple, Union
 
 from .registry import ContractRegistry
 
+
+_MISS = object()
+
+
+class _Proxy:
+    """Resolved entry of a proxy: its instance depends on the block being decoded."""
+    __slots__ = ("address",)
+
+    def __init__(self, address: str):
+        self.address = address
+
+
 class ContractManager:
     """
     Caches Web3 contract instances (subset of the registry)
+
+    Proxies get one instance per implementation, built from the proxy ABI merged
+    with that implementation's ABI.
+
+    Every address looked up is resolved once, including the (far more common)
+    addresses that aren't in the registry. Lookups use the address as given: decoded
+    EvmLog/EvmTransaction addresses are already lowercase, other spellings are
+    lowercased on their first lookup only.
     """
-    def __init__(self, registry: ContractRegistry):
+    def __init__(self, registry: ContractRegistry, max_unknown: int = 1_000_000):
+        """
+        Initialize contract manager.
+
+        Args:
+            registry: Contract registry providing ABIs
+            max_unknown: Unknown addresses remembered before the negative cache is reset
+        """
         self.registry = registry
         self.w3 = Web3()  # No provider needed for ABI decoding
-        self.contracts: Dict[str, Contract] = {}  # address -> Contract instance
-    
-    def get_contract(self, address: str) -> Optional[Contract]:
+        self.contracts: Dict[Tuple[str, Optional[str]], Contract] = {}  # (address, implementation) -> Contract instance
+        self.max_unknown = max_unknown
+
+        self._by_abi: Dict[int, Tuple[list, Contract]] = {}  # id(ABI) -> (ABI kept alive, Contract instance)
+        self._resolved: Dict[str, Any] = {}  # address as looked up -> Contract | _Proxy | None
+        self._unknown = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _instance(self, address: str, implementation: Optional[str], block_number) -> Optional[Contract]:
+        key = (address, implementation)
+        contract = self.contracts.get(key)
+        if contract is None:
+            abi = self.registry.get_abi(address, block_number)
+            if not abi:
+                return None
+            # The registry hands out one list per distinct ABI: contracts sharing it share
+            # the instance (decoding never uses its address) and its decode memo entries
+            shared = self._by_abi.get(id(abi))
+            if shared is None:
+                shared = self._by_abi[id(abi)] = (abi, self.w3.eth.contract(
+                    address=Web3.to_checksum_address(address),
+                    abi=abi
+                ))
+            contract = self.contracts[key] = shared[1]
+        return contract
+
+    def _resolve(self, address: str) -> Any:
+        """Resolve and cache an address seen for the first time."""
+        normalized = address.lower()
+        if self.registry.get_contract(normalized) is None:
+            entry = None
+            if self._unknown >= self.max_unknown:
+                # Keep known contracts, forget the unknown addresses
+                self._resolved = {k: v for k, v in self._resolved.items() if v is not None}
+                self._unknown = 0
+            self._unknown += 1
+        elif normalized in self.registry.implementations:
+            entry = _Proxy(normalized)
+        else:
+            entry = self._instance(normalized, None, None)
+        self._resolved[address] = entry
+        return entry
+
+    def _entry(self, address: str) -> Any:
+        entry = self._resolved.get(address, _MISS)
+        if entry is _MISS:
+            self.misses += 1
+            return self._resolve(address)
+        self.hits += 1
+        return entry
+
+    def get_contract(self, address: str, block_number: Optional[Union[int, str]] = None) -> Optional[Contract]:
         """
         Get or create Web3 contract instance for address in registry.
+
+        Args:
+            address: Contract address
+            block_number: Block being decoded (int or hex), selects a proxy's implementation
         """
-        address = address.lower()
-        if address not in self.contracts:
-            contract_info = self.registry.get_contract(address)
-            if contract_info:
-                self.contracts[address] = self.w3.eth.contract(
-                    address=Web3.to_checksum_address(address),
-                    abi=contract_info.abi
-                )
-        return self.contracts.get(address)
-    
+        entry = self._entry(address)
+        if type(entry) is not _Proxy:
+            return entry
+        implementation = self.registry.get_implementation(entry.address, block_number)
+        return self._instance(entry.address, implementation, block_number)
+
     def has_contract(self, address: str) -> bool:
         """
         Check if address is a known contract in the registry.
         """
-        return self.registry.get_contract(address.lower()) is not None
\ No newline at end of file
+        return self._entry(address) is not None
+
+    def carry_over(self, previous: "ContractManager") -> None:
+        """
+        Reuse what a manager built from an older registry already resolved.
+
+        Instances of contracts whose ABI version didn't change are kept, so decode memo
+        entries keyed by them stay valid, and addresses that are still unregistered stay
+        in the negative cache.
+        """
+        old_registry = previous.registry
+        for (address, implementation), contract in list(previous.contracts.items()):
+            version = self.registry.get_abi_version(address)
+            if version is not None and version == old_registry.get_abi_version(address):
+                self.contracts[(address, implementation)] = contract
+                if implementation is None:
+                    abi = self.registry.get_abi(address)
+                    self._by_abi.setdefault(id(abi), (abi, contract))
+        for address, entry in list(previous._resolved.items()):
+            if entry is None and self._unknown < self.max_unknown and self.registry.get_contract(address) is None:
+                self._resolved[address] = None
+                self._unknown += 1
+        self.hits, self.misses = previous.hits, previous.misses
+
+    def clear(self) -> None:
+        """Forget resolved addresses and instances (after the registry changed)."""
+        self._resolved = {}
+        self.contracts = {}
+        self._by_abi = {}
+        self._unknown = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counts of the address cache (approximate when shared between threads)."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "known": len(self._resolved) - self._unknown,
+            "unknown": self._unknown,
+            "instances": len(self._by_abi)
+        }
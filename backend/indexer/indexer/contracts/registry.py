@@ -1,6 +1,11 @@
-from typing import Optional
+from typing import Optional, Union
 from pathlib import Path
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import re
+import time
 import msgspec
 from msgspec import Struct
 
@@ -11,6 +16,15 @@ class ABIConfig(Struct):
     address: EvmAddress
     abi: list
 
+class _RawABIConfig(Struct):
+    """ABI file with the ABI left unparsed, so duplicates are found before parsing them."""
+    address: EvmAddress
+    abi: msgspec.Raw
+
+class ImplementationChange(Struct):
+    address: EvmAddress
+    from_block: int = 0
+
 class ContractMetadata(Struct):
     name: str
     protocol: str
@@ -18,11 +32,82 @@ class ContractMetadata(Struct):
     description: Optional[str] = None
     version: Optional[str] = None
     implementation: Optional[EvmAddress] = None
+    implementation_address: Optional[EvmAddress] = None  # older entries use this key
+    implementations: Optional[list[ImplementationChange]] = None  # upgrades with activation heights
+
+    def implementation_schedule(self) -> list[tuple[int, str]]:
+        """(from_block, implementation) pairs in activation order."""
+        if self.implementations:
+            return sorted((change.from_block, change.address.lower()) for change in self.implementations)
+        implementation = self.implementation or self.implementation_address
+        return [(0, implementation.lower())] if implementation else []
 
 class ContractConfig(Struct):
     metadata: ContractMetadata
     abi: list
 
+def _abi_entry_key(entry: dict) -> tuple:
+    inputs = tuple(param.get("type") for param in entry.get("inputs", []))
+    return entry.get("type", "function"), entry.get("name"), inputs
+
+def merge_abis(proxy_abi: list, implementation_abi: list) -> list:
+    """
+    Proxy ABI extended with its implementation's entries.
+
+    Implementation entries come first and win on signature clashes, since the
+    implementation's code is what emits events and handles calls behind the proxy.
+    """
+    merged = list(implementation_abi)
+    seen = {_abi_entry_key(entry) for entry in implementation_abi}
+    merged.extend(entry for entry in proxy_abi if _abi_entry_key(entry) not in seen)
+    return merged
+
+def abi_version(abi: list) -> str:
+    """Short content hash of an ABI, independent of key order and formatting."""
+    canonical = json.dumps(abi, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-f]{40}$")
+ABI_ENTRY_TYPES = {"function", "event", "constructor", "fallback", "receive", "error"}
+
+def validate_abi(abi: list) -> list[str]:
+    """Problems in an ABI that would make entries undecodable or ambiguous."""
+    problems = []
+    signatures = set()
+    for entry in abi:
+        if not isinstance(entry, dict):
+            problems.append("ABI entry is not an object")
+            continue
+        entry_type = entry.get("type", "function")
+        if entry_type not in ABI_ENTRY_TYPES:
+            problems.append(f"unknown ABI entry type '{entry_type}'")
+        elif entry_type in ("function", "event", "error"):
+            if not entry.get("name"):
+                problems.append(f"{entry_type} without a name")
+            elif any("type" not in param for param in entry.get("inputs", [])):
+                problems.append(f"{entry_type} {entry['name']} has inputs without a type")
+            key = _abi_entry_key(entry)
+            if key in signatures:
+                problems.append(f"duplicate {entry_type} {entry['name']}{key[2]}")
+            signatures.add(key)
+    if not any(entry.get("type", "function") in ("function", "event") for entry in abi if isinstance(entry, dict)):
+        problems.append("ABI has no functions or events")
+    return problems
+
+class RegistryReport(Struct):
+    """Outcome of loading and validating a registry."""
+    contracts: int = 0  # entries in contracts.json
+    loaded: int = 0
+    abi_files: int = 0  # ABI files read, including implementations
+    unique_abis: int = 0  # distinct ABIs after deduplication
+    seconds: float = 0.0
+    errors: list[str] = msgspec.field(default_factory=list)  # entries that were skipped or degraded
+    warnings: list[str] = msgspec.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
 class ContractRegistry:
     _instance = None
 
@@ -36,16 +121,44 @@ class ContractRegistry:
             cls._instance = cls(contracts_file, abi_directory)
         return cls._instance
 
-    def __init__(self, contracts_file: str, abi_directory: str):
+    def __init__(self, contracts_file: str, abi_directory: str, max_workers: int = 8):
+        """
+        Load the registry.
+
+        Args:
+            contracts_file: contracts.json, {subdir: {address: metadata}}
+            abi_directory: Directory with {subdir}/{address}.json ABI files
+            max_workers: Threads reading ABI files
+        """
         self.contracts: dict[str, ContractConfig] = {}  # Contracts keyed by address
+        self.abi_versions: dict[str, str] = {}  # ABI hash keyed by address
+        self.implementations: dict[str, list[tuple[int, str]]] = {}  # proxy -> [(from_block, implementation)]
+        self.implementation_abis: dict[str, list] = {}  # implementation address -> ABI
+        self._merged_abis: dict[tuple[int, int], list] = {}  # (id(proxy ABI), id(implementation ABI)) -> merged ABI
+        self._abi_pool: dict[str, list] = {}  # ABI hash -> the one shared list for identical ABIs
+        self.report: Optional[RegistryReport] = None
         self.logger = setup_logger(__name__)
-        self._load_contracts(contracts_file, abi_directory)
-        self.abi_decoder = msgspec.json.Decoder(type=ABIConfig)
+        self._raw_abi_decoder = msgspec.json.Decoder(type=_RawABIConfig)
+        self._abi_list_decoder = msgspec.json.Decoder(type=list)
+        self._load_contracts(contracts_file, abi_directory, max_workers)
 
+    def _read_abi(self, path: Path) -> tuple[Optional[_RawABIConfig], Optional[bytes], Optional[str]]:
+        """Read one ABI file (runs on the loader threads). Returns (config, digest of the ABI bytes, error)."""
+        try:
+            with open(path, "rb") as f:
+                config = self._raw_abi_decoder.decode(f.read())
+            return config, hashlib.sha256(config.abi).digest(), None
+        except FileNotFoundError:
+            return None, None, f"No ABI file found at {path}"
+        except msgspec.ValidationError as e:
+            return None, None, f"Invalid ABI format in {path}: {e}"
+        except Exception as e:
+            return None, None, f"Error loading ABI {path}: {e}"
 
-    def _load_contracts(self, contracts_file: str, abi_directory: str):
-        """Load contract registry and ABIs."""
+    def _load_contracts(self, contracts_file: str, abi_directory: str, max_workers: int = 8):
+        """Load contract registry and ABIs, then validate them together."""
         self.logger.info(f"Loading contracts from {contracts_file}")
+        started = time.perf_counter()
 
         try:
             with open(contracts_file) as f:
@@ -56,64 +169,163 @@ class ContractRegistry:
         except json.JSONDecodeError as e:
             self.logger.error(f"Invalid JSON in contract registry: {e}")
             raise
-            
-        contract_count = 0
-        error_count = 0
 
+        report = RegistryReport(contracts=sum(len(contracts) for contracts in registry.values()))
+        abi_directory = Path(abi_directory)
+
+        # Metadata first, so implementation ABIs are read in the same pass as the others
+        entries = []  # (address, metadata, abi path, subdir)
+        seen = {}
         for subdir, contracts in registry.items():
             for address, metadata in contracts.items():
                 address = address.lower()
-                abi_path = Path(abi_directory) / subdir / f"{address}.json"
-
+                if not ADDRESS_PATTERN.match(address):
+                    report.errors.append(f"{subdir}/{address}: not a 20-byte hex address")
+                    continue
+                if address in seen:
+                    report.warnings.append(f"{address} is listed in both {seen[address]} and {subdir}, using {subdir}")
+                seen[address] = subdir
                 try:
                     contract_metadata = msgspec.convert(metadata, type=ContractMetadata)
-                    self.logger.debug(f"Loading ABI for {address} ({contract_metadata.name})")
-
-                    with open(abi_path) as f:
-                        try:
-                            contract_abi = self.abi_decoder.decode(f.read())
-                            self.contracts[address] = ContractConfig(
-                                metadata=contract_metadata,
-                                abi=contract_abi.abi
-                            )
-                            contract_count += 1
-                        except msgspec.ValidationError as e:
-                            self.logger.warning(f"Invalid ABI format for {address}: {e}")
-                            error_count += 1
-                        except Exception as e:
-                            self.logger.warning(f"Error loading ABI for {address}: {e}")
-                            error_count += 1
-                            
-                except FileNotFoundError:
-                    self.logger.warning(f"No ABI file found at {abi_path}")
-                    error_count += 1
                 except msgspec.ValidationError as e:
-                    self.logger.warning(f"Invalid Contract metadata for {address}: {e}")
-                    error_count += 1
-        
-        self.logger.info(f"Loaded {contract_count} contracts successfully. Errors: {error_count}")
-    
-    '''
-    TODO: ADD CROSS VALIDATION TO INIT
-
-    def _validate_configs(self, contracts: Dict[str,ContractConfig], abis: Dict[str, LogTemplate]) -> None:
-        """Cross validate contracts and ABIs"""
-        template_refs = set()
-        for contract in contracts.values():
-            for event in contract.events.values():
-                template_refs.add(event.template)
-        # Verify all referenced templates exist
-        missing = template_refs - set(abis.keys())
-        if missing:
-            raise ConfigError(f"Missing ABI templates: {missing}")
-
-    '''
+                    report.errors.append(f"Invalid Contract metadata for {address}: {e}")
+                    continue
+                entries.append((address, contract_metadata, abi_directory / subdir / f"{address}.json", subdir))
+
+        paths = {path for _, _, path, _ in entries}
+        paths.update(abi_directory / subdir / f"{implementation}.json"
+                     for _, metadata, _, subdir in entries
+                     for _, implementation in metadata.implementation_schedule())
+        paths = sorted(paths)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            loaded = dict(zip(paths, executor.map(self._read_abi, paths)))
+        report.abi_files = sum(1 for config, _, _ in loaded.values() if config is not None)
+
+        # Identical ABIs (e.g. NFT collections) are parsed, hashed and validated once and
+        # shared as one list; files that differ only in formatting meet in _abi_pool
+        by_digest: dict[bytes, list] = {}
+        problems: dict[int, list[str]] = {}
+        versions: dict[int, str] = {}
+
+        def intern(config: _RawABIConfig, digest: bytes) -> list:
+            shared = by_digest.get(digest)
+            if shared is None:
+                abi = self._abi_list_decoder.decode(config.abi)
+                shared = by_digest[digest] = self._abi_pool.setdefault(abi_version(abi), abi)
+            return shared
+
+        for address, metadata, abi_path, subdir in entries:
+            config, digest, error = loaded[abi_path]
+            if config is None:
+                report.errors.append(error)
+                continue
+            if config.address.lower() != address:
+                report.warnings.append(f"{abi_path} declares address {config.address}")
+            try:
+                abi = intern(config, digest)
+            except msgspec.ValidationError as e:
+                report.errors.append(f"Invalid ABI format in {abi_path}: {e}")
+                continue
+            if id(abi) not in problems:
+                problems[id(abi)] = validate_abi(abi)
+            report.warnings.extend(f"{address}: {problem}" for problem in problems[id(abi)])
+
+            self.logger.debug(f"Loading ABI for {address} ({metadata.name})")
+            self.contracts[address] = ContractConfig(metadata=metadata, abi=abi)
+            schedule = metadata.implementation_schedule()
+            if not schedule:
+                if id(abi) not in versions:
+                    versions[id(abi)] = abi_version(abi)
+                self.abi_versions[address] = versions[id(abi)]
+                continue
+
+            self.implementations[address] = schedule
+            for _, implementation in schedule:
+                implementation_config, digest, error = loaded[abi_directory / subdir / f"{implementation}.json"]
+                if implementation_config is not None and implementation not in self.implementation_abis:
+                    try:
+                        self.implementation_abis[implementation] = intern(implementation_config, digest)
+                    except msgspec.ValidationError as e:
+                        error = f"Invalid ABI format: {e}"
+                if implementation not in self.implementation_abis:
+                    report.errors.append(f"Proxy {address} uses its own ABI for {implementation}: {error}")
+            self.abi_versions[address] = abi_version(
+                [abi] + [[b, i, self.implementation_abis.get(i)] for b, i in schedule]
+            )
+
+        referenced = set(paths)
+        report.warnings.extend(
+            f"Unreferenced ABI file {path.relative_to(abi_directory)}"
+            for path in sorted(abi_directory.glob("*/*.json")) if path not in referenced
+        )
+        report.loaded = len(self.contracts)
+        report.unique_abis = len(self._abi_pool)
+        report.seconds = time.perf_counter() - started
+        self.report = report
+
+        for error in report.errors:
+            self.logger.warning(error)
+        for warning in report.warnings:
+            self.logger.debug(warning)
+        self.logger.info(
+            f"Loaded {report.loaded} contracts successfully. Errors: {len(report.errors)}, "
+            f"warnings: {len(report.warnings)}, {report.unique_abis} distinct ABIs in {report.seconds:.2f}s"
+        )
 
     def get_contract(self, address: str) -> Optional[ContractConfig]:
         """Get full contract info by address."""
         return self.contracts.get(address.lower())
     
-    def get_abi(self, address: str) -> Optional[list]:
-        """Get contract ABI by address."""
-        contract = self.contracts.get(address.lower())
-        return contract.abi if contract else None
\ No newline at end of file
+    def get_implementation(self, address: str, block_number: Optional[Union[int, str]] = None) -> Optional[str]:
+        """
+        Get the implementation behind a proxy at a block.
+
+        Args:
+            address: Contract address
+            block_number: Block number (int or hex); None for the latest implementation
+
+        Returns:
+            Implementation address, or None if the contract isn't a proxy (or predates it)
+        """
+        schedule = self.implementations.get(address.lower())
+        if not schedule:
+            return None
+        if block_number is None:
+            return schedule[-1][1]
+        if len(schedule) == 1 and schedule[0][0] == 0:
+            return schedule[0][1]  # common case: one implementation from genesis, no parsing
+
+        number = self._to_int(block_number)
+        position = bisect_right([start for start, _ in schedule], number) - 1
+        return schedule[position][1] if position >= 0 else None
+
+    @staticmethod
+    def _to_int(block_number: Union[int, str]) -> int:
+        return int(block_number, 16) if isinstance(block_number, str) else block_number
+
+    def get_abi(self, address: str, block_number: Optional[Union[int, str]] = None) -> Optional[list]:
+        """
+        Get contract ABI by address, merged with the implementation ABI for proxies.
+
+        Args:
+            address: Contract address
+            block_number: Block the ABI is used for (default: the latest implementation)
+        """
+        address = address.lower()
+        contract = self.contracts.get(address)
+        if not contract:
+            return None
+        implementation = self.get_implementation(address, block_number)
+        implementation_abi = self.implementation_abis.get(implementation) if implementation else None
+        if implementation_abi is None:
+            return contract.abi
+
+        key = (id(contract.abi), id(implementation_abi))  # both held by the registry, ids stay unique
+        merged = self._merged_abis.get(key)
+        if merged is None:
+            merged = self._merged_abis[key] = merge_abis(contract.abi, implementation_abi)
+        return merged
+
+    def get_abi_version(self, address: str) -> Optional[str]:
+        """Get the hash of the ABI used to decode an address (None if unregistered)."""
+        return self.abi_versions.get(address.lower())
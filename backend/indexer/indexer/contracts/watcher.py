@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from .registry import ContractRegistry
+from ..utils.logging import setup_logger
+
+
+class RegistryWatcher:
+    """
+    Reloads the contract registry when contracts.json or the ABI directory change.
+
+    The source is either the local config directory or a copy of it in GCS under a
+    prefix ({prefix}contracts.json and {prefix}abis/...). A change is detected from
+    file mtimes/sizes or blob generations, the new registry is built on the watcher
+    thread and then handed to the listeners (e.g. BlockDecoder.swap_registry), which
+    swap it in with a single reference assignment. Decodes already running keep the
+    registry they started with.
+    """
+
+    def __init__(self, contracts_file: Optional[Path] = None, abi_directory: Optional[Path] = None,
+                 storage=None, prefix: Optional[str] = None, interval: float = 60.0,
+                 registry: Optional[ContractRegistry] = None):
+        """
+        Initialize registry watcher.
+
+        Args:
+            contracts_file: Local contracts.json (ignored when storage is given)
+            abi_directory: Local ABI directory (ignored when storage is given)
+            storage: GCSBaseHandler or LocalStorageHandler holding the registry copy
+            prefix: Blob prefix of the registry copy in storage
+            interval: Seconds between checks of the background thread
+            registry: Registry currently in use (its source state is taken as loaded)
+        """
+        if storage is None and (contracts_file is None or abi_directory is None):
+            raise ValueError("RegistryWatcher needs a local contracts file and ABI directory, or a storage handler")
+        self.contracts_file = Path(contracts_file) if contracts_file else None
+        self.abi_directory = Path(abi_directory) if abi_directory else None
+        self.storage = storage
+        self.prefix = prefix or ""
+        self.interval = interval
+        self.registry = registry
+        self.logger = setup_logger(__name__)
+
+        self._listeners: List[Callable[[ContractRegistry], None]] = []
+        self._fingerprint = self.fingerprint() if registry is not None else None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+        self.failures = 0
+
+    def subscribe(self, listener: Callable[[ContractRegistry], None]) -> None:
+        """Call listener with every newly loaded registry."""
+        self._listeners.append(listener)
+
+    def fingerprint(self) -> Tuple:
+        """Cheap summary of the source files; changes whenever one is added, removed or rewritten."""
+        if self.storage is not None:
+            return tuple(sorted(
+                (blob.name, blob.generation, blob.size) for blob in self.storage.list_blobs(prefix=self.prefix)
+            ))
+
+        files = [self.contracts_file] + sorted(p for p in self.abi_directory.rglob("*.json") if p.is_file())
+        entries = []
+        for path in files:
+            try:
+                stat = path.stat()
+                entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                entries.append((str(path), None, None))
+        return tuple(entries)
+
+    def load(self) -> ContractRegistry:
+        """Build a registry from the current source."""
+        if self.storage is None:
+            return ContractRegistry(self.contracts_file, self.abi_directory)
+
+        with tempfile.TemporaryDirectory(prefix="registry-") as directory:
+            for blob in self.storage.list_blobs(prefix=self.prefix):
+                relative = blob.name[len(self.prefix):]
+                if relative == "contracts.json" or relative.startswith("abis/"):
+                    destination = os.path.join(directory, relative)
+                    if not self.storage.download_blob_to_file(blob.name, destination):
+                        raise IOError(f"Failed to download {blob.name}")
+            return ContractRegistry(Path(directory) / "contracts.json", Path(directory) / "abis")
+
+    def check(self) -> bool:
+        """
+        Reload the registry if its source changed.
+
+        Returns:
+            True if a new registry was loaded and handed to the listeners
+        """
+        with self._lock:
+            fingerprint = self.fingerprint()
+            if fingerprint == self._fingerprint:
+                return False
+            # Remember failed states too: a half-written file is retried once it changes again
+            self._fingerprint = fingerprint
+
+            try:
+                registry = self.load()
+            except Exception as e:
+                self.failures += 1
+                self.logger.error(f"Registry reload failed, keeping the current registry: {type(e).__name__}: {e}")
+                return False
+            if not registry.contracts and self.registry is not None and self.registry.contracts:
+                self.failures += 1
+                self.logger.error("Reloaded registry has no contracts, keeping the current registry")
+                return False
+
+            previous, self.registry = self.registry, registry
+            for listener in self._listeners:
+                try:
+                    listener(registry)
+                except Exception as e:
+                    self.logger.error(f"Registry listener {listener} failed: {type(e).__name__}: {e}")
+            self.reloads += 1
+
+            changed = [a for a, v in registry.abi_versions.items()
+                       if previous is None or previous.abi_versions.get(a) != v]
+            self.logger.info(f"Reloaded registry: {len(registry.contracts)} contracts, {len(changed)} new or changed")
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Registry check failed: {type(e).__name__}: {e}")
+
+    def start(self) -> None:
+        """Check the source every interval seconds on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="registry-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
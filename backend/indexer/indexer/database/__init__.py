@@ -1,4 +1,4 @@
 """Database models and operations for the indexer."""
 
-from .operations import ConnectionManager, DatabaseManager
-from .models import ProcessingStatus, BlockProcess
\ No newline at end of file
+from .operations import ConnectionManager, DatabaseManager, ShardLeaseManager, BlockPartitionManager, RollupManager, BlockFailureManager
+from .models import ProcessingStatus, BlockProcess, ShardStatus, BackfillShard, ChainHeader, ContractUsage, CollectionRollup, RollupWallet, RollupBlock, BlockFailure
\ No newline at end of file
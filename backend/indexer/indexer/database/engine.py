@@ -0,0 +1,88 @@
+import threading
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from ..env import env
+
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+# Execution option marking connections of write transactions (see ConnectionManager)
+WRITE_OPTION = "write_transaction"
+
+
+def _configure_sqlite(engine: Engine, in_memory: bool):
+    """Pragmas for concurrent use of a file database, plus working SAVEPOINTs."""
+    wal = env.get_sqlite_wal() and not in_memory
+    busy_timeout_ms = env.get_sqlite_busy_timeout_ms()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")    # readers don't block the writer
+            cursor.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, far fewer fsyncs
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        cursor.close()
+        # Let SQLAlchemy emit BEGIN itself so nested transactions (SAVEPOINT) behave
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def on_begin(connection):
+        # Write transactions take the write lock up front with IMMEDIATE: a deferred one
+        # that reads and then writes can fail with "database is locked" without
+        # honouring busy_timeout. Reads stay deferred and run alongside the writer.
+        if connection.get_execution_options().get(WRITE_OPTION):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            connection.exec_driver_sql("BEGIN")
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """
+    Create an engine with the pool settings configured for this deployment.
+
+    PostgreSQL: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and
+    DB_STATEMENT_TIMEOUT_MS. SQLite: SQLITE_WAL and SQLITE_BUSY_TIMEOUT_MS.
+    """
+    if database_url.startswith("sqlite"):
+        in_memory = database_url in ("sqlite://", "sqlite:///:memory:")
+        engine = create_engine(
+            database_url,
+            connect_args={
+                "check_same_thread": False,  # pooled connections move between worker threads
+                "timeout": env.get_sqlite_busy_timeout_ms() / 1000
+            }
+        )
+        _configure_sqlite(engine, in_memory)
+        return engine
+
+    connect_args = {}
+    statement_timeout_ms = env.get_db_statement_timeout_ms()
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+
+    return create_engine(
+        database_url,
+        pool_pre_ping=True,                        # Verify connection before using
+        pool_recycle=env.get_db_pool_recycle(),    # Recycle connections older than this
+        pool_size=env.get_db_pool_size(),          # Connections kept open
+        max_overflow=env.get_db_max_overflow(),    # Extra connections under load
+        pool_timeout=env.get_db_pool_timeout(),    # Seconds to wait for a free connection
+        connect_args=connect_args
+    )
+
+
+def get_engine(database_url: str) -> Engine:
+    """Shared engine for a URL, so every manager on it draws from one pool."""
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            if env.db_engine is not None and database_url == env.get_db_url():
+                engine = env.db_engine
+            else:
+                engine = create_db_engine(database_url)
+            _engines[database_url] = engine
+        return engine
@@ -1 +1,6 @@
-from .status import ProcessingStatus, BlockProcess
\ No newline at end of file
+from .status import ProcessingStatus, BlockProcess
+from .shard import ShardStatus, BackfillShard
+from .chain import ChainHeader
+from .usage import ContractUsage
+from .rollup import CollectionRollup, RollupWallet, RollupBlock
+from .failure import BlockFailure
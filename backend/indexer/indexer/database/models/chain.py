@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, BigInteger
+
+from .base import Base
+
+
+class ChainHeader(Base):
+    """Hash and parent hash of a block ingested from the RPC, for reorg detection."""
+    __tablename__ = "chain_headers"
+
+    block_number = Column(BigInteger, primary_key=True)
+    block_hash = Column(String(66), nullable=False)
+    parent_hash = Column(String(66), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<ChainHeader(block_number={self.block_number}, block_hash={self.block_hash})>"
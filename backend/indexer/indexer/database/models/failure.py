@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, BigInteger, Integer, Boolean, Index
+
+from .base import Base
+
+
+class BlockFailure(Base):
+    """
+    Dead-letter entry of a block whose last processing attempt failed.
+
+    One row per block, removed once the block is processed successfully. Failed blocks
+    are retried after an exponential backoff (next_retry_at); a block that keeps
+    failing is quarantined (ProcessingStatus.QUARANTINED) and only retried once
+    released (see BlockFailureManager).
+    """
+    __tablename__ = "block_failures"
+    __table_args__ = (
+        # Retry scans: blocks that aren't quarantined, by due time
+        Index("ix_block_failures_quarantined_next_retry_at", "quarantined", "next_retry_at"),
+    )
+
+    block_number = Column(BigInteger, primary_key=True)
+    stage = Column(String(20), nullable=False)          # download, validation, decoding, storage, status, processing
+    error_class = Column(String(100), nullable=False)   # exception class, or e.g. ValidationError
+    error_message = Column(Text)
+    contract = Column(String(42))                       # contract being decoded when it failed, if known
+    attempts = Column(Integer, nullable=False, default=0)
+    quarantined = Column(Boolean, nullable=False, default=False)
+    next_retry_at = Column(DateTime)
+    first_failed_at = Column(DateTime, nullable=False, default=datetime.now)
+    last_failed_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return (f"<BlockFailure(block_number={self.block_number}, stage={self.stage}, "
+                f"error_class={self.error_class}, attempts={self.attempts}, quarantined={self.quarantined})>")
@@ -1,13 +1,17 @@
 # In models/gcs.py (new file)
 from datetime import datetime
-from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy import Column, String, BigInteger, DateTime, Index
 from ..models.base import Base
 
 class GcsObject(Base):
     __tablename__ = "gcs_objects"
+    __table_args__ = (
+        # Every block lookup and range listing filters on file_type as well
+        Index("ix_gcs_objects_file_type_block_number", "file_type", "block_number"),
+    )
     
     path = Column(String, primary_key=True)
-    block_number = Column(BigInteger, nullable=True, index=True)
+    block_number = Column(BigInteger, nullable=True)
     file_type = Column(String(20), nullable=False)  # 'raw', 'decoded'
     size = Column(BigInteger)
     updated_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -0,0 +1,79 @@
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, Numeric, Text, DateTime, Index
+
+from .base import Base
+
+
+# uint256 sums; exact in PostgreSQL
+Amount = Numeric(78, 0)
+
+
+class CollectionRollup(Base):
+    """
+    Activity of an NFT collection per hour or day, for one payment token.
+
+    Maintained with additive upserts as blocks are decoded (see RollupManager), so
+    dashboards read these rows instead of scanning decoded events.
+    """
+    __tablename__ = "collection_rollups"
+    __table_args__ = (
+        # Dashboards list every collection of a period and time range
+        Index("ix_collection_rollups_period_bucket_start", "period", "bucket_start"),
+    )
+
+    nft_address = Column(String(42), primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    period = Column(String(8), primary_key=True)           # "hour" or "day"
+    bucket_start = Column(BigInteger, primary_key=True)    # unix seconds, UTC-aligned
+    trades = Column(BigInteger, nullable=False, default=0)
+    volume = Column(Amount, nullable=False, default=0)
+    mints = Column(BigInteger, nullable=False, default=0)
+    mint_volume = Column(Amount, nullable=False, default=0)
+    royalties = Column(BigInteger, nullable=False, default=0)
+    royalty_volume = Column(Amount, nullable=False, default=0)
+    unique_wallets = Column(BigInteger, nullable=False, default=0)  # buyers, sellers and minters
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return (f"<CollectionRollup(nft_address={self.nft_address}, period={self.period}, "
+                f"bucket_start={self.bucket_start}, trades={self.trades})>")
+
+
+class RollupWallet(Base):
+    """Events per wallet in a rollup bucket; unique_wallets counts the rows of a bucket."""
+    __tablename__ = "collection_rollup_wallets"
+
+    nft_address = Column(String(42), primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    bucket_start = Column(BigInteger, primary_key=True)
+    wallet = Column(String(42), primary_key=True)
+    events = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RollupWallet(nft_address={self.nft_address}, wallet={self.wallet}, events={self.events})>"
+
+
+class RollupBlock(Base):
+    """
+    What one decoded block added to the rollups of a collection.
+
+    A block decoded again has its previous contribution subtracted before the new one
+    is added, so redecodes and rebuilds don't count its events twice.
+    """
+    __tablename__ = "collection_rollup_blocks"
+
+    block_number = Column(BigInteger, primary_key=True)
+    nft_address = Column(String(42), primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    timestamp = Column(BigInteger, nullable=False)  # unix seconds of the block
+    trades = Column(BigInteger, nullable=False, default=0)
+    volume = Column(Amount, nullable=False, default=0)
+    mints = Column(BigInteger, nullable=False, default=0)
+    mint_volume = Column(Amount, nullable=False, default=0)
+    royalties = Column(BigInteger, nullable=False, default=0)
+    royalty_volume = Column(Amount, nullable=False, default=0)
+    wallets = Column(Text, nullable=False, default="{}")  # JSON: wallet -> events
+
+    def __repr__(self):
+        return f"<RollupBlock(block_number={self.block_number}, nft_address={self.nft_address})>"
@@ -0,0 +1,37 @@
+from datetime import datetime
+import enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, Enum, UniqueConstraint
+
+from .base import Base
+
+
+class ShardStatus(enum.Enum):
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+class BackfillShard(Base):
+    """A contiguous block range of a backfill run, claimed by one worker at a time."""
+    __tablename__ = "backfill_shards"
+    __table_args__ = (UniqueConstraint("run_name", "start_block"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_name = Column(String(100), nullable=False, index=True)
+    start_block = Column(BigInteger, nullable=False)
+    end_block = Column(BigInteger, nullable=False)  # inclusive
+    next_block = Column(BigInteger, nullable=False)  # resume cursor
+    # VARCHAR(20) holding the member names, as created by migration 003
+    status = Column(Enum(ShardStatus, native_enum=False, length=20), nullable=False, default=ShardStatus.PENDING)
+    owner = Column(String(200))
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0)
+    failed_blocks = Column(Integer, nullable=False, default=0)
+    errors = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return (f"<BackfillShard(run={self.run_name}, blocks={self.start_block}-{self.end_block}, "
+                f"status={self.status.value}, owner={self.owner})>")
@@ -1,6 +1,6 @@
 from datetime import datetime
 import enum
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, BigInteger, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, BigInteger, Enum, Index, text
 
 from .base import Base
 
@@ -10,9 +10,18 @@ class ProcessingStatus(enum.Enum):
     VALID = "valid"
     INVALID = "invalid"
     PROCESSING = "processing"
+    QUARANTINED = "quarantined"  # failed too often; skipped by retries until released
+
+# Almost every block ends up VALID; operational queries look for the rest
+_UNFINISHED = text("status <> 'VALID'")
 
 class BlockProcess(Base):
     __tablename__ = "block_processing"
+    __table_args__ = (
+        # Partial index: stays small as the chain grows, serves status and status+range queries
+        Index("ix_block_processing_unfinished", "status", "block_number",
+              postgresql_where=_UNFINISHED, sqlite_where=_UNFINISHED),
+    )
 
     block_number = Column(BigInteger, primary_key=True)
     gcs_path = Column(Text, nullable=False)
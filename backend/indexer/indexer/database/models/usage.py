@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, BigInteger, Index
+
+from .base import Base
+
+
+class ContractUsage(Base):
+    """
+    Registered contract called or emitting logs in a decoded block, with the ABI
+    version it was decoded with. Rows with a NULL version were written for
+    unregistered addresses before those stopped being recorded.
+    """
+    __tablename__ = "contract_usage"
+    __table_args__ = (
+        # Finds addresses recorded with an outdated version without reading their blocks
+        Index("ix_contract_usage_address_abi_version", "address", "abi_version"),
+        # Blocks are re-recorded after every decode
+        Index("ix_contract_usage_block_number", "block_number"),
+    )
+
+    address = Column(String(42), primary_key=True)
+    block_number = Column(BigInteger, primary_key=True)
+    abi_version = Column(String(16), nullable=True)
+
+    def __repr__(self):
+        return f"<ContractUsage(address={self.address}, block_number={self.block_number}, abi_version={self.abi_version})>"
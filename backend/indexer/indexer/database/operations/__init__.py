@@ -1,2 +1,6 @@
 from .manager import DatabaseManager
-from .session import ConnectionManager
\ No newline at end of file
+from .session import ConnectionManager
+from .leases import ShardLeaseManager
+from .partitions import BlockPartitionManager
+from .rollups import RollupManager
+from .failures import BlockFailureManager
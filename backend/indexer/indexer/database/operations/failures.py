@@ -0,0 +1,177 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+
+from ...env import env
+from ..models.failure import BlockFailure
+from .session import ConnectionManager
+from ...utils.logging import setup_logger
+
+
+STAGES = ("download", "validation", "decoding", "storage", "status", "processing")
+
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Seconds before the next retry after attempts failures: exponential, capped, half jittered."""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _failure(row: BlockFailure) -> Dict[str, Any]:
+    """Plain snapshot of a failure, safe to use after its session is closed."""
+    return {
+        "block_number": row.block_number,
+        "stage": row.stage,
+        "error_class": row.error_class,
+        "error_message": row.error_message,
+        "contract": row.contract,
+        "attempts": row.attempts,
+        "quarantined": row.quarantined,
+        "next_retry_at": row.next_retry_at.isoformat() if row.next_retry_at else None,
+        "first_failed_at": row.first_failed_at.isoformat() if row.first_failed_at else None,
+        "last_failed_at": row.last_failed_at.isoformat() if row.last_failed_at else None
+    }
+
+
+class BlockFailureManager:
+    """
+    Dead-letter queue of failed blocks.
+
+    Every failed attempt updates the block's row: stage, error class, message and
+    contract of the last failure, the attempt count and when to retry next. Retries
+    back off exponentially from FAILURE_RETRY_BASE_SECONDS up to
+    FAILURE_RETRY_MAX_SECONDS. After FAILURE_QUARANTINE_ATTEMPTS failures the block is
+    quarantined, so retry runs stop spending workers on it until it's released. Rows
+    are removed when their block is processed successfully.
+
+    Shares the ConnectionManager of the status tracker, so failures and the block's
+    status are written in the same unit of work.
+    """
+
+    def __init__(self, db_conn: ConnectionManager, quarantine_attempts: Optional[int] = None,
+                 retry_base_seconds: Optional[float] = None, retry_max_seconds: Optional[float] = None):
+        self.db = db_conn
+        self.quarantine_attempts = quarantine_attempts or env.get_failure_quarantine_attempts()
+        self.retry_base_seconds = retry_base_seconds or env.get_failure_retry_base_seconds()
+        self.retry_max_seconds = retry_max_seconds or env.get_failure_retry_max_seconds()
+        self.logger = setup_logger(__name__)
+
+    def record(self, block_number: int, stage: str, error_class: str, error_message: Optional[str],
+               contract: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a failed attempt and schedule the next retry, or quarantine the block.
+
+        Returns:
+            Snapshot of the failure after this attempt
+        """
+        now = datetime.now()
+        with self.db.get_session(write=True) as session:
+            row = session.get(BlockFailure, block_number, with_for_update=True)
+            if row is None:
+                row = BlockFailure(block_number=block_number, attempts=0, quarantined=False, first_failed_at=now)
+                session.add(row)
+            row.stage = stage
+            row.error_class = error_class[:100]
+            row.error_message = error_message
+            row.contract = contract.lower() if contract else None
+            row.attempts += 1
+            row.last_failed_at = now
+            if row.attempts >= self.quarantine_attempts:
+                if not row.quarantined:
+                    self.logger.warning(f"Block {block_number} quarantined after {row.attempts} failed attempts "
+                                        f"({stage}: {error_class})")
+                row.quarantined = True
+                row.next_retry_at = None
+            else:
+                delay = retry_delay(row.attempts, self.retry_base_seconds, self.retry_max_seconds)
+                row.next_retry_at = now + timedelta(seconds=delay)
+            session.flush()
+            return _failure(row)
+
+    def clear(self, block_numbers: Iterable[int]) -> int:
+        """Remove the failures of blocks that were processed successfully."""
+        block_numbers = list(block_numbers)
+        if not block_numbers:
+            return 0
+        with self.db.get_session(write=True) as session:
+            return session.query(BlockFailure).filter(
+                BlockFailure.block_number.in_(block_numbers)
+            ).delete(synchronize_session=False)
+
+    def due(self, limit: int = 100, now: Optional[datetime] = None) -> List[int]:
+        """Blocks whose next retry is due, longest waiting first (quarantined ones excluded)."""
+        with self.db.get_session() as session:
+            rows = session.query(BlockFailure.block_number).filter(
+                BlockFailure.quarantined.is_(False),
+                BlockFailure.next_retry_at <= (now or datetime.now())
+            ).order_by(BlockFailure.next_retry_at).limit(limit).all()
+            return [row[0] for row in rows]
+
+    def release(self, block_numbers: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Take blocks out of quarantine with a fresh attempt budget, due for retry now.
+
+        Args:
+            block_numbers: Blocks to release (None: every quarantined block)
+
+        Returns:
+            Block numbers released (their status still has to be reset)
+        """
+        with self.db.get_session(write=True) as session:
+            query = session.query(BlockFailure).filter(BlockFailure.quarantined.is_(True))
+            if block_numbers is not None:
+                query = query.filter(BlockFailure.block_number.in_(list(block_numbers)))
+            released = [row[0] for row in query.with_entities(BlockFailure.block_number).all()]
+            if released:
+                session.query(BlockFailure).filter(BlockFailure.block_number.in_(released)).update({
+                    BlockFailure.quarantined: False,
+                    BlockFailure.attempts: 0,
+                    BlockFailure.next_retry_at: datetime.now()
+                }, synchronize_session=False)
+            return released
+
+    def get_failures(self, quarantined: Optional[bool] = None, stage: Optional[str] = None,
+                     contract: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Failures, most recent first."""
+        with self.db.get_session() as session:
+            query = session.query(BlockFailure)
+            if quarantined is not None:
+                query = query.filter(BlockFailure.quarantined.is_(quarantined))
+            if stage:
+                query = query.filter(BlockFailure.stage == stage)
+            if contract:
+                query = query.filter(BlockFailure.contract == contract.lower())
+            rows = query.order_by(BlockFailure.last_failed_at.desc()).limit(limit).all()
+            return [_failure(row) for row in rows]
+
+    def get_failure(self, block_number: int) -> Optional[Dict[str, Any]]:
+        with self.db.get_session() as session:
+            row = session.get(BlockFailure, block_number)
+            return _failure(row) if row is not None else None
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Failure counts, and the most common stages, error classes and contracts."""
+        with self.db.get_session() as session:
+            def grouped(column):
+                count = func.count(BlockFailure.block_number)
+                rows = session.query(column, count).filter(column.isnot(None))\
+                    .group_by(column).order_by(count.desc()).limit(top).all()
+                return {key: count for key, count in rows}
+
+            total = session.query(func.count(BlockFailure.block_number)).scalar()
+            quarantined = session.query(func.count(BlockFailure.block_number))\
+                .filter(BlockFailure.quarantined.is_(True)).scalar()
+            due = session.query(func.count(BlockFailure.block_number)).filter(
+                BlockFailure.quarantined.is_(False),
+                BlockFailure.next_retry_at <= datetime.now()
+            ).scalar()
+            return {
+                "failed": total,
+                "quarantined": quarantined,
+                "due": due,
+                "by_stage": grouped(BlockFailure.stage),
+                "by_error_class": grouped(BlockFailure.error_class),
+                "by_contract": grouped(BlockFailure.contract)
+            }
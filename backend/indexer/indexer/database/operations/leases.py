@@ -0,0 +1,276 @@
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, func
+
+from ..models.shard import ShardStatus, BackfillShard
+from .session import ConnectionManager
+from ...utils.logging import setup_logger
+
+
+def _lease(shard: BackfillShard) -> Dict[str, Any]:
+    """Plain snapshot of a shard, safe to use after its session is closed."""
+    return {
+        "id": shard.id,
+        "run_name": shard.run_name,
+        "start_block": shard.start_block,
+        "end_block": shard.end_block,
+        "next_block": shard.next_block,
+        "attempts": shard.attempts,
+        "failed_blocks": shard.failed_blocks,
+        "owner": shard.owner,
+        "lease_expires_at": shard.lease_expires_at
+    }
+
+
+class ShardLeaseManager:
+    """
+    Lease table for sharded backfills.
+
+    A run's block range is split into shards up front. Workers on any host claim one
+    shard at a time with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent claims never
+    block on or hand out the same row, and keep the lease alive with heartbeats that
+    also persist the shard's resume cursor. Leases that stop heartbeating expire and
+    become claimable again, continuing from the last persisted cursor.
+    """
+
+    def __init__(self, db_conn: ConnectionManager, max_attempts: int = 5):
+        self.db = db_conn
+        self.max_attempts = max_attempts
+        self.logger = setup_logger(__name__)
+
+    def plan_run(self, run_name: str, start_block: int, end_block: int, shard_size: int) -> int:
+        """
+        Split [start_block, end_block] into shards. Safe to re-run; existing shards are kept.
+
+        Returns:
+            Number of shards created
+        """
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+        if end_block < start_block:
+            raise ValueError(f"Invalid range {start_block}-{end_block}")
+
+        created = 0
+        with self.db.get_session(write=True) as session:
+            existing = {
+                row[0] for row in session.query(BackfillShard.start_block)
+                .filter(BackfillShard.run_name == run_name)
+                .all()
+            }
+            for shard_start in range(start_block, end_block + 1, shard_size):
+                if shard_start in existing:
+                    continue
+                session.add(BackfillShard(
+                    run_name=run_name,
+                    start_block=shard_start,
+                    end_block=min(shard_start + shard_size - 1, end_block),
+                    next_block=shard_start,
+                    status=ShardStatus.PENDING
+                ))
+                created += 1
+
+        self.logger.info(f"Planned run {run_name}: {created} new shards for blocks {start_block}-{end_block}")
+        return created
+
+    def claim_shard(self, run_name: str, owner: str, lease_seconds: int = 300) -> Optional[Dict[str, Any]]:
+        """
+        Lease the lowest pending (or expired) shard of a run.
+
+        Returns:
+            Lease snapshot, or None if no shard is claimable
+        """
+        now = datetime.now()
+        with self.db.get_session(write=True) as session:
+            while True:
+                shard = session.query(BackfillShard).filter(
+                    BackfillShard.run_name == run_name,
+                    or_(
+                        BackfillShard.status == ShardStatus.PENDING,
+                        and_(
+                            BackfillShard.status == ShardStatus.LEASED,
+                            BackfillShard.lease_expires_at < now
+                        )
+                    )
+                ).order_by(BackfillShard.start_block).with_for_update(skip_locked=True)\
+                    .populate_existing().first()
+
+                if shard is None:
+                    return None
+
+                # attempts doubles as a row version: the update only applies if nobody
+                # claimed the shard since we read it (SQLite has no SKIP LOCKED)
+                claimed = session.query(BackfillShard).filter(
+                    BackfillShard.id == shard.id,
+                    BackfillShard.attempts == shard.attempts
+                )
+
+                if shard.attempts >= self.max_attempts:
+                    if claimed.update({
+                        BackfillShard.status: ShardStatus.FAILED,
+                        BackfillShard.owner: None
+                    }, synchronize_session=False):
+                        self.logger.warning(
+                            f"Shard {shard.start_block}-{shard.end_block} of {run_name} "
+                            f"failed after {shard.attempts} attempts"
+                        )
+                    continue
+
+                previous_owner = shard.owner if shard.status == ShardStatus.LEASED else None
+                if not claimed.update({
+                    BackfillShard.status: ShardStatus.LEASED,
+                    BackfillShard.owner: owner,
+                    BackfillShard.attempts: shard.attempts + 1,
+                    BackfillShard.heartbeat_at: now,
+                    BackfillShard.lease_expires_at: now + timedelta(seconds=lease_seconds)
+                }, synchronize_session=False):
+                    continue
+
+                if previous_owner:
+                    self.logger.info(
+                        f"Reclaimed expired lease on shard {shard.start_block}-{shard.end_block} "
+                        f"from {previous_owner}, resuming at block {shard.next_block}"
+                    )
+
+                session.refresh(shard)
+                return _lease(shard)
+
+    def heartbeat(self, shard_id: int, owner: str, lease_seconds: int = 300,
+                  next_block: Optional[int] = None, failed_blocks: Optional[int] = None) -> bool:
+        """
+        Extend a lease and persist progress.
+
+        Returns:
+            False if the lease is no longer held by owner (expired and reclaimed)
+        """
+        now = datetime.now()
+        values = {
+            BackfillShard.heartbeat_at: now,
+            BackfillShard.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            BackfillShard.updated_at: now
+        }
+        if next_block is not None:
+            values[BackfillShard.next_block] = next_block
+        if failed_blocks is not None:
+            values[BackfillShard.failed_blocks] = failed_blocks
+
+        with self.db.get_session(write=True) as session:
+            updated = session.query(BackfillShard).filter(
+                BackfillShard.id == shard_id,
+                BackfillShard.owner == owner,
+                BackfillShard.status == ShardStatus.LEASED
+            ).update(values, synchronize_session=False)
+        return updated > 0
+
+    def complete_shard(self, shard_id: int, owner: str, failed_blocks: int = 0) -> bool:
+        """Mark a leased shard as done."""
+        with self.db.get_session(write=True) as session:
+            updated = session.query(BackfillShard).filter(
+                BackfillShard.id == shard_id,
+                BackfillShard.owner == owner,
+                BackfillShard.status == ShardStatus.LEASED
+            ).update({
+                BackfillShard.status: ShardStatus.DONE,
+                BackfillShard.next_block: BackfillShard.end_block + 1,
+                BackfillShard.failed_blocks: failed_blocks,
+                BackfillShard.lease_expires_at: None,
+                BackfillShard.updated_at: datetime.now()
+            }, synchronize_session=False)
+        return updated > 0
+
+    def release_shard(self, shard_id: int, owner: str, next_block: int,
+                      failed_blocks: int = 0, error: Optional[str] = None) -> bool:
+        """Give a lease back (shutdown or error) so another worker can resume it immediately."""
+        values = {
+            BackfillShard.status: ShardStatus.PENDING,
+            BackfillShard.owner: None,
+            BackfillShard.next_block: next_block,
+            BackfillShard.failed_blocks: failed_blocks,
+            BackfillShard.lease_expires_at: None,
+            BackfillShard.updated_at: datetime.now()
+        }
+        if error:
+            values[BackfillShard.errors] = error
+
+        with self.db.get_session(write=True) as session:
+            updated = session.query(BackfillShard).filter(
+                BackfillShard.id == shard_id,
+                BackfillShard.owner == owner,
+                BackfillShard.status == ShardStatus.LEASED
+            ).update(values, synchronize_session=False)
+        return updated > 0
+
+    def requeue_expired(self, run_name: Optional[str] = None) -> int:
+        """
+        Return shards with expired leases to PENDING.
+
+        Returns:
+            Number of shards requeued
+        """
+        with self.db.get_session(write=True) as session:
+            query = session.query(BackfillShard).filter(
+                BackfillShard.status == ShardStatus.LEASED,
+                BackfillShard.lease_expires_at < datetime.now()
+            )
+            if run_name:
+                query = query.filter(BackfillShard.run_name == run_name)
+            count = query.update({
+                BackfillShard.status: ShardStatus.PENDING,
+                BackfillShard.owner: None,
+                BackfillShard.lease_expires_at: None
+            }, synchronize_session=False)
+
+        if count:
+            self.logger.info(f"Requeued {count} expired shards")
+        return count
+
+    def reset_failed(self, run_name: str) -> int:
+        """Make FAILED shards claimable again with a fresh attempt budget."""
+        with self.db.get_session(write=True) as session:
+            return session.query(BackfillShard).filter(
+                BackfillShard.run_name == run_name,
+                BackfillShard.status == ShardStatus.FAILED
+            ).update({
+                BackfillShard.status: ShardStatus.PENDING,
+                BackfillShard.attempts: 0
+            }, synchronize_session=False)
+
+    def get_progress(self, run_name: str) -> Dict[str, Any]:
+        """
+        Summarize a run.
+
+        Returns:
+            Dictionary with shard counts per status and block progress
+        """
+        with self.db.get_session() as session:
+            rows = session.query(
+                BackfillShard.status,
+                func.count(BackfillShard.id),
+                func.sum(BackfillShard.end_block - BackfillShard.start_block + 1),
+                func.sum(BackfillShard.next_block - BackfillShard.start_block),
+                func.sum(BackfillShard.failed_blocks)
+            ).filter(BackfillShard.run_name == run_name).group_by(BackfillShard.status).all()
+
+            leases = [
+                _lease(shard) for shard in session.query(BackfillShard).filter(
+                    BackfillShard.run_name == run_name,
+                    BackfillShard.status == ShardStatus.LEASED
+                ).order_by(BackfillShard.start_block).all()
+            ]
+
+        shards = {status.value: 0 for status in ShardStatus}
+        total_blocks = blocks_done = failed_blocks = 0
+        for status, count, blocks, done, failed in rows:
+            shards[status.value] = count
+            total_blocks += blocks or 0
+            blocks_done += done or 0
+            failed_blocks += failed or 0
+
+        return {
+            "run_name": run_name,
+            "shards": shards,
+            "total_blocks": total_blocks,
+            "blocks_done": blocks_done,
+            "failed_blocks": failed_blocks,
+            "percent_done": blocks_done / total_blocks * 100 if total_blocks else 0.0,
+            "active_leases": leases
+        }
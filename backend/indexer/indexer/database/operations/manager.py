@@ -1,22 +1,42 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Dict
 from datetime import datetime
-from sqlalchemy import desc
+from sqlalchemy import desc, insert, or_
 
 from ...env import env
 from ..models.status import ProcessingStatus, BlockProcess
 from ..models.gcs import GcsObject
+from ..models.chain import ChainHeader
+from ..models.usage import ContractUsage
 from .session import ConnectionManager
-from ...processing.factory import ComponentFactory
+from ...utils.logging import setup_logger
+
+
+def _status_filter(status: ProcessingStatus) -> list:
+    """
+    Conditions selecting blocks with a status.
+    
+    Non-VALID statuses repeat the partial index predicate verbatim, so planners that
+    can't infer it from the equality (SQLite) still use ix_block_processing_unfinished.
+    """
+    conditions = [BlockProcess.status == status]
+    if status != ProcessingStatus.VALID:
+        conditions.append(BlockProcess.status != ProcessingStatus.VALID)
+    return conditions
 
 
 class DatabaseManager:
     def __init__(self, db_conn: ConnectionManager):
         self.db = db_conn
+        self.logger = setup_logger(__name__)
+
+    def unit_of_work(self, write: bool = False):
+        """Run several operations on one session and transaction (see ConnectionManager.unit_of_work)."""
+        return self.db.unit_of_work(write)
 
     def record_block(self, block_number: int, gcs_path: str, 
                     status: ProcessingStatus = ProcessingStatus.PENDING) -> BlockProcess:
         """Record or update a block's validation status."""
-        with self.db.get_session() as session:
+        with self.db.get_session(write=True) as session:
             block = session.query(BlockProcess).get(block_number)
             if block:
                 block.status = status
@@ -29,21 +49,38 @@ class DatabaseManager:
                     status=status
                 )
                 session.add(block)
-            session.commit()
             return block
 
+    def start_block(self, block_number: int, gcs_path: str) -> Optional[ProcessingStatus]:
+        """
+        Mark a block PROCESSING.
+
+        Returns:
+            Its previous status, None if the block was not recorded yet
+        """
+        with self.db.get_session(write=True) as session:
+            block = session.query(BlockProcess).get(block_number)
+            if block is None:
+                session.add(BlockProcess(block_number=block_number, gcs_path=gcs_path,
+                                         status=ProcessingStatus.PROCESSING))
+                return None
+            previous = block.status
+            block.status = ProcessingStatus.PROCESSING
+            block.gcs_path = gcs_path
+            block.updated_at = datetime.now()
+            return previous
+
     def update_status(self, block_number: int, status: ProcessingStatus, 
                      error_message: Optional[str] = None) -> BlockProcess:
         """Update validation status for a block."""
-        with self.db.get_session() as session:
+        with self.db.get_session(write=True) as session:
             block = session.query(BlockProcess).get(block_number)
             if not block:
                 raise ValueError(f"Block {block_number} not found")
             
             block.status = status
-            block.error_message = error_message
+            block.errors = error_message
             block.updated_at = datetime.now()
-            session.commit()
             return block
 
     def get_blocks_by_status(self, status: ProcessingStatus, 
@@ -51,16 +88,232 @@ class DatabaseManager:
         """Get blocks with a specific status."""
         with self.db.get_session() as session:
             return session.query(BlockProcess)\
-                .filter(BlockProcess.status == status)\
+                .filter(*_status_filter(status))\
                 .order_by(desc(BlockProcess.block_number))\
                 .limit(limit)\
                 .all()
 
+    def get_block_paths_by_status(self, status: ProcessingStatus, min_block: int,
+                                  max_block: int) -> List[str]:
+        """
+        Get GCS paths of blocks in a range with a specific status, in block order.
+        
+        For any status other than VALID this is served by the partial index
+        ix_block_processing_unfinished; VALID ranges use the primary key.
+        """
+        with self.db.get_session() as session:
+            rows = session.query(BlockProcess.gcs_path).filter(
+                *_status_filter(status),
+                BlockProcess.block_number >= min_block,
+                BlockProcess.block_number <= max_block
+            ).order_by(BlockProcess.block_number).all()
+            return [row[0] for row in rows if row[0]]
+
     def get_block(self, block_number: int) -> Optional[BlockProcess]:
         """Get a specific block's validation status."""
         with self.db.get_session() as session:
             return session.query(BlockProcess).get(block_number)
         
+    def mark_for_redecode(self, block_numbers: List[int], reason: str) -> int:
+        """
+        Reset blocks to PENDING so they are decoded again (e.g. after a reorg).
+        
+        Returns:
+            Number of blocks marked
+        """
+        if not block_numbers:
+            return 0
+        with self.db.get_session(write=True) as session:
+            return session.query(BlockProcess).filter(
+                BlockProcess.block_number.in_(block_numbers)
+            ).update({
+                BlockProcess.status: ProcessingStatus.PENDING,
+                BlockProcess.errors: reason,
+                BlockProcess.updated_at: datetime.now()
+            }, synchronize_session=False)
+
+    def record_header(self, block_number: int, block_hash: str, parent_hash: str):
+        """Record the hash of an ingested block, replacing any previous (orphaned) one."""
+        with self.db.get_session(write=True) as session:
+            session.merge(ChainHeader(
+                block_number=block_number,
+                block_hash=block_hash,
+                parent_hash=parent_hash,
+                created_at=datetime.now()
+            ))
+
+    def get_recent_headers(self, limit: int) -> List[Tuple[int, str, str]]:
+        """
+        Get the most recently ingested block headers.
+        
+        Returns:
+            (block_number, block_hash, parent_hash) tuples in ascending block order
+        """
+        with self.db.get_session() as session:
+            rows = session.query(ChainHeader.block_number, ChainHeader.block_hash, ChainHeader.parent_hash)\
+                .order_by(desc(ChainHeader.block_number))\
+                .limit(limit)\
+                .all()
+        return [tuple(row) for row in reversed(rows)]
+
+    def delete_headers_from(self, block_number: int) -> int:
+        """Forget headers at and above block_number (their blocks were orphaned)."""
+        with self.db.get_session(write=True) as session:
+            return session.query(ChainHeader).filter(
+                ChainHeader.block_number >= block_number
+            ).delete(synchronize_session=False)
+
+    def prune_headers(self, below_block: int) -> int:
+        """Forget headers below below_block (too deep to be reorged)."""
+        with self.db.get_session(write=True) as session:
+            return session.query(ChainHeader).filter(
+                ChainHeader.block_number < below_block
+            ).delete(synchronize_session=False)
+
+    def get_block_paths(self, block_numbers: List[int], chunk_size: int = 1000) -> List[str]:
+        """Get raw GCS paths of recorded blocks, in block order."""
+        paths = []
+        for start in range(0, len(block_numbers), chunk_size):
+            with self.db.get_session() as session:
+                rows = session.query(BlockProcess.block_number, BlockProcess.gcs_path).filter(
+                    BlockProcess.block_number.in_(block_numbers[start:start + chunk_size])
+                ).all()
+            paths.extend(rows)
+        return [path for _, path in sorted(paths) if path]
+
+    def record_contract_usage(self, block_number: int, versions: Dict[str, Optional[str]]):
+        """
+        Replace the contracts recorded for a block with those of its latest decode.
+        
+        Args:
+            block_number: Decoded block
+            versions: ABI version per registered address seen in the block
+        """
+        with self.db.get_session(write=True) as session:
+            session.query(ContractUsage).filter(
+                ContractUsage.block_number == block_number
+            ).delete(synchronize_session=False)
+            if versions:
+                session.execute(insert(ContractUsage), [
+                    {"address": address, "block_number": block_number, "abi_version": version}
+                    for address, version in versions.items()
+                ])
+
+    def delete_contract_usage(self, block_numbers: List[int]) -> int:
+        """Forget the contracts recorded for blocks that no longer have a decode (e.g. orphaned)."""
+        if not block_numbers:
+            return 0
+        with self.db.get_session(write=True) as session:
+            return session.query(ContractUsage).filter(
+                ContractUsage.block_number.in_(block_numbers)
+            ).delete(synchronize_session=False)
+
+    def find_stale_contracts(self, current_versions: Dict[str, str],
+                             addresses: Optional[List[str]] = None) -> Dict[str, List[Optional[str]]]:
+        """
+        Find contracts whose blocks were decoded with an ABI other than the current one.
+        
+        Covers changed ABIs and contracts removed from the registry (current version
+        missing). Contracts added since aren't recorded for older blocks (apart from
+        NULL rows written before unregistered addresses were left out); find those
+        with get_unrecorded_blocks and the block index. Without addresses this reads
+        every distinct (address, abi_version) pair, i.e. the whole
+        ix_contract_usage_address_abi_version index.
+        
+        Args:
+            current_versions: ABI version per registry address
+            addresses: Optional addresses to check instead of every recorded one
+            
+        Returns:
+            Outdated versions recorded per address
+        """
+        with self.db.get_session() as session:
+            query = session.query(ContractUsage.address, ContractUsage.abi_version).distinct()
+            if addresses is not None:
+                query = query.filter(ContractUsage.address.in_([a.lower() for a in addresses]))
+            pairs = query.all()
+
+        stale: Dict[str, List[Optional[str]]] = {}
+        for address, version in pairs:
+            if current_versions.get(address) != version:
+                stale.setdefault(address, []).append(version)
+        return stale
+
+    def get_unrecorded_blocks(self, address: str, block_numbers: List[int],
+                              chunk_size: int = 1000) -> List[int]:
+        """
+        Blocks among block_numbers with no contract_usage row for an address, i.e.
+        decoded while it wasn't registered (or before contract_usage existed).
+        """
+        address = address.lower()
+        recorded = set()
+        for start in range(0, len(block_numbers), chunk_size):
+            with self.db.get_session() as session:
+                recorded.update(row[0] for row in session.query(ContractUsage.block_number).filter(
+                    ContractUsage.address == address,
+                    ContractUsage.block_number.in_(block_numbers[start:start + chunk_size])
+                ).all())
+        return sorted(set(block_numbers) - recorded)
+
+    def get_blocks_with_stale_contract(self, address: str, current_version: Optional[str],
+                                       min_block: Optional[int] = None,
+                                       max_block: Optional[int] = None) -> List[int]:
+        """Blocks where an address was decoded with a version other than current_version."""
+        with self.db.get_session() as session:
+            query = session.query(ContractUsage.block_number).filter(ContractUsage.address == address.lower())
+            if current_version is None:
+                query = query.filter(ContractUsage.abi_version.isnot(None))
+            else:
+                query = query.filter(or_(
+                    ContractUsage.abi_version.is_(None),
+                    ContractUsage.abi_version != current_version
+                ))
+            if min_block is not None:
+                query = query.filter(ContractUsage.block_number >= min_block)
+            if max_block is not None:
+                query = query.filter(ContractUsage.block_number <= max_block)
+            return [row[0] for row in query.order_by(ContractUsage.block_number).all()]
+
+    def find_missing_blocks(self, min_block: int, max_block: int, file_type: str = 'raw',
+                            window: int = 100_000) -> List[int]:
+        """
+        Find blocks in a range that have no GCS object of a type.
+        
+        Args:
+            min_block: First block of the range
+            max_block: Last block of the range (inclusive)
+            file_type: Type of files to check ('raw' or 'decoded')
+            window: Blocks read per query
+            
+        Returns:
+            Missing block numbers in ascending order
+        """
+        missing = []
+        for start in range(min_block, max_block + 1, window):
+            end = min(start + window - 1, max_block)
+            with self.db.get_session() as session:
+                present = {
+                    row[0] for row in session.query(GcsObject.block_number).filter(
+                        GcsObject.file_type == file_type,
+                        GcsObject.block_number >= start,
+                        GcsObject.block_number <= end
+                    ).all()
+                }
+            missing.extend(number for number in range(start, end + 1) if number not in present)
+        return missing
+
+    def record_gcs_object(self, path: str, block_number: Optional[int], file_type: str,
+                          size: Optional[int] = None):
+        """Record an object this process wrote, without waiting for the next GCS sync."""
+        with self.db.get_session(write=True) as session:
+            session.merge(GcsObject(
+                path=path,
+                block_number=block_number,
+                file_type=file_type,
+                size=size,
+                updated_at=datetime.now()
+            ))
+
     def sync_gcs_objects(self, prefix=None, limit=None, batch_size=1000):
         """
         Sync GCS objects to database in memory-efficient batches.
@@ -73,7 +326,8 @@ class DatabaseManager:
         Returns:
             Count of objects synced
         """
-        
+        from ...processing.factory import ComponentFactory
+
         gcs_handler = ComponentFactory.get_gcs_handler()
         
         # Process in batches to avoid memory issues
@@ -112,7 +366,7 @@ class DatabaseManager:
     def _process_gcs_batch(self, blobs):
         """Process a batch of GCS blobs to update the database."""
         
-        with self.db.get_session() as session:
+        with self.db.get_session(write=True) as session:
             for blob in blobs:
                 try:
                     # Try to extract block number
@@ -146,9 +400,7 @@ class DatabaseManager:
                         session.add(obj)
                 except Exception as e:
                     self.logger.warning(f"Error processing blob {blob.name}: {e}")
-                    
-            # Commit the batch
-            session.commit()
+
 
     def get_available_block_paths(self, file_type='raw', min_block=None, max_block=None, limit=None):
         """
@@ -173,6 +425,9 @@ class DatabaseManager:
             if max_block is not None:
                 query = query.filter(GcsObject.block_number <= max_block)
             
+            # Walks ix_gcs_objects_file_type_block_number in order, so limits are stable
+            query = query.order_by(GcsObject.block_number)
+            
             if limit:
                 query = query.limit(limit)
             
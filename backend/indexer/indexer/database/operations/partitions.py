@@ -0,0 +1,128 @@
+from typing import List, Dict, Any, Optional
+from sqlalchemy import text
+
+from .session import ConnectionManager
+from ...utils.logging import setup_logger
+
+
+class BlockPartitionManager:
+    """
+    Range partitions of block_processing on PostgreSQL.
+
+    Partitioning is opt-in (migration 005). Partitions are aligned to multiples of
+    partition_size and named block_processing_p<start>; blocks beyond the last one
+    land in block_processing_default until ensure_partitions creates their range
+    and moves them out.
+    """
+
+    TABLE = "block_processing"
+    DEFAULT_PARTITION = "block_processing_default"
+
+    def __init__(self, db_conn: ConnectionManager, partition_size: int = 1_000_000):
+        if partition_size <= 0:
+            raise ValueError("partition_size must be positive")
+        self.db = db_conn
+        self.partition_size = partition_size
+        self.logger = setup_logger(__name__)
+
+    def is_partitioned(self) -> bool:
+        """True if block_processing is a partitioned PostgreSQL table."""
+        if self.db.engine.dialect.name != "postgresql":
+            return False
+        with self.db.get_session() as session:
+            return session.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table"
+            ), {"table": self.TABLE}).first() is not None
+
+    def list_partitions(self) -> List[Dict[str, Any]]:
+        """
+        List partitions with their bounds and approximate row counts.
+
+        Returns:
+            List of dictionaries with name, bounds and rows, in name order
+        """
+        if not self.is_partitioned():
+            return []
+        with self.db.get_session() as session:
+            rows = session.execute(text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table ORDER BY c.relname"
+            ), {"table": self.TABLE}).all()
+        return [{"name": name, "bounds": bounds, "rows": max(tuples, 0)} for name, bounds, tuples in rows]
+
+    def _range_starts(self, names: List[str]) -> List[int]:
+        prefix = f"{self.TABLE}_p"
+        return sorted(
+            int(name[len(prefix):]) for name in names
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+
+    def ensure_partitions(self, up_to_block: int, from_block: Optional[int] = None) -> int:
+        """
+        Create missing partitions so every block up to up_to_block has its own range.
+
+        Args:
+            up_to_block: Highest block that must be covered (e.g. tip plus headroom)
+            from_block: Lowest block to cover (default: end of the last partition)
+
+        Returns:
+            Number of partitions created
+        """
+        if not self.is_partitioned():
+            self.logger.warning(f"{self.TABLE} is not partitioned, nothing to do")
+            return 0
+
+        names = [partition["name"] for partition in self.list_partitions()]
+        has_default = self.DEFAULT_PARTITION in names
+        starts = set(self._range_starts(names))
+        if from_block is None:
+            from_block = max(starts) + self.partition_size if starts else up_to_block
+        first = from_block // self.partition_size * self.partition_size
+
+        created = 0
+        for start in range(first, up_to_block + 1, self.partition_size):
+            if start in starts:
+                continue
+            # One transaction per partition: the default partition is locked only briefly
+            with self.db.get_session(write=True) as session:
+                self._create_partition(session, start, start + self.partition_size, has_default)
+            created += 1
+
+        if created:
+            self.logger.info(f"Created {created} {self.TABLE} partitions up to block {up_to_block}")
+        return created
+
+    def _create_partition(self, session, start: int, end: int, has_default: bool):
+        name = f"{self.TABLE}_p{start}"
+        bounds = {"start": start, "end": end}
+
+        # A new range can't be attached while the default partition holds rows in it
+        stranded = 0
+        if has_default:
+            stranded = session.execute(text(
+                f"SELECT count(*) FROM {self.DEFAULT_PARTITION} "
+                f"WHERE block_number >= :start AND block_number < :end"
+            ), bounds).scalar()
+
+        if stranded:
+            session.execute(text(f"ALTER TABLE {self.TABLE} DETACH PARTITION {self.DEFAULT_PARTITION}"))
+
+        session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {self.TABLE} FOR VALUES FROM ({start}) TO ({end})"
+        ))
+
+        if stranded:
+            session.execute(text(
+                f"INSERT INTO {name} SELECT * FROM {self.DEFAULT_PARTITION} "
+                f"WHERE block_number >= :start AND block_number < :end"
+            ), bounds)
+            session.execute(text(
+                f"DELETE FROM {self.DEFAULT_PARTITION} "
+                f"WHERE block_number >= :start AND block_number < :end"
+            ), bounds)
+            session.execute(text(f"ALTER TABLE {self.TABLE} ATTACH PARTITION {self.DEFAULT_PARTITION} DEFAULT"))
+            self.logger.info(f"Moved {stranded} rows from {self.DEFAULT_PARTITION} into {name}")
@@ -0,0 +1,310 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, func, select, update
+
+from ..models.rollup import CollectionRollup, RollupWallet, RollupBlock
+from .session import ConnectionManager
+from ...decoders.events import block_events
+from ...utils.logging import setup_logger
+
+
+PERIODS = {"hour": 3600, "day": 86400}
+COUNTERS = ("trades", "volume", "mints", "mint_volume", "royalties", "royalty_volume")
+
+_rollups = CollectionRollup.__table__
+_wallets = RollupWallet.__table__
+_blocks = RollupBlock.__table__
+
+
+def _unix(timestamp: Any) -> int:
+    """Unix seconds of a block timestamp (datetime, ISO string as stored, or int)."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    return int(timestamp)
+
+
+def block_contributions(block: Any) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Rollup counters a block adds per (collection, payment token).
+
+    Trades count their buyer and seller as active wallets, mints their minter.
+    Royalties are counted but their wallets aren't.
+    """
+    contributions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def entry(event, get):
+        key = (get(event, "nft_address"), get(event, "token_address"))
+        if key not in contributions:
+            contributions[key] = dict.fromkeys(COUNTERS, 0)
+            contributions[key]["wallets"] = {}
+        return contributions[key]
+
+    def add_wallet(counters, wallet):
+        if wallet:
+            counters["wallets"][wallet] = counters["wallets"].get(wallet, 0) + 1
+
+    for kind, event in block_events(block):
+        get = dict.get if isinstance(event, dict) else getattr
+        if kind == "TradeEvent":
+            counters = entry(event, get)
+            counters["trades"] += 1
+            counters["volume"] += int(get(event, "price"))
+            add_wallet(counters, get(event, "buyer"))
+            add_wallet(counters, get(event, "seller"))
+        elif kind == "MintEvent":
+            counters = entry(event, get)
+            counters["mints"] += 1
+            counters["mint_volume"] += int(get(event, "price"))
+            add_wallet(counters, get(event, "minter"))
+        elif kind == "RoyaltyEvent":
+            counters = entry(event, get)
+            counters["royalties"] += 1
+            counters["royalty_volume"] += int(get(event, "price"))
+    return contributions
+
+
+def _counter_values(counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Counter columns for a statement; amounts as Decimal, since uint256 sums overflow int64 binds."""
+    return {name: Decimal(counters[name]) if name.endswith("volume") else counters[name] for name in COUNTERS}
+
+
+def _insert(session, table):
+    """INSERT with ON CONFLICT support for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+class RollupManager:
+    """
+    Per-collection hourly and daily rollups, maintained incrementally.
+
+    Every decoded block's trades, mints and royalties are applied as additive upserts
+    (counter = counter + delta), so concurrent workers never read-modify-write a
+    rollup row. The block's contribution is stored next to the rollups and subtracted
+    when the block is applied again, which makes redecodes and rebuilds idempotent.
+    Unique wallets can't be summed; they are kept exact by counting the rows of
+    collection_rollup_wallets for the buckets a block touched.
+
+    Pass the DatabaseManager's ConnectionManager to apply blocks inside its
+    unit_of_work, i.e. in the same transaction as the block's VALID status.
+    """
+
+    def __init__(self, db_conn: ConnectionManager, periods: Optional[Dict[str, int]] = None):
+        self.db = db_conn
+        self.periods = periods or PERIODS
+        self.logger = setup_logger(__name__)
+
+    def apply_block(self, block_number: int, block: Any) -> int:
+        """
+        Replace a block's contribution to the rollups with that of its latest decode.
+
+        Args:
+            block_number: Decoded block
+            block: Block, CompactBlock or stored JSON block with Transaction.events
+
+        Returns:
+            Number of (collection, token) pairs the block contributes to
+        """
+        contributions = block_contributions(block)
+        timestamp = _unix(block.timestamp if not isinstance(block, dict) else block["timestamp"])
+        with self.db.get_session(write=True) as session:
+            previous = session.execute(select(_blocks).where(_blocks.c.block_number == block_number)).mappings().all()
+            if not previous and not contributions:
+                return 0
+            deltas, wallet_deltas = {}, {}
+            for row in previous:
+                self._add(deltas, wallet_deltas, row["nft_address"], row["token_address"], row["timestamp"],
+                          row, json.loads(row["wallets"]), -1)
+            for (nft_address, token_address), counters in contributions.items():
+                self._add(deltas, wallet_deltas, nft_address, token_address, timestamp,
+                          counters, counters["wallets"], 1)
+            self._apply(session, deltas, wallet_deltas)
+
+            if previous:
+                session.execute(delete(_blocks).where(_blocks.c.block_number == block_number))
+            if contributions:
+                session.execute(_blocks.insert(), [
+                    {"block_number": block_number, "nft_address": nft_address, "token_address": token_address,
+                     "timestamp": timestamp, "wallets": json.dumps(counters["wallets"], sort_keys=True),
+                     **_counter_values(counters)}
+                    for (nft_address, token_address), counters in contributions.items()
+                ])
+        return len(contributions)
+
+    def remove_blocks(self, block_numbers: Iterable[int]) -> int:
+        """Subtract the contributions of blocks (e.g. no longer valid) from the rollups."""
+        block_numbers = list(block_numbers)
+        removed = 0
+        for start in range(0, len(block_numbers), 1000):
+            chunk = block_numbers[start:start + 1000]
+            with self.db.get_session(write=True) as session:
+                rows = session.execute(select(_blocks).where(_blocks.c.block_number.in_(chunk))).mappings().all()
+                deltas, wallet_deltas = {}, {}
+                for row in rows:
+                    self._add(deltas, wallet_deltas, row["nft_address"], row["token_address"], row["timestamp"],
+                              row, json.loads(row["wallets"]), -1)
+                self._apply(session, deltas, wallet_deltas)
+                session.execute(delete(_blocks).where(_blocks.c.block_number.in_(chunk)))
+                removed += len({row["block_number"] for row in rows})
+        return removed
+
+    def get_block_numbers(self, min_block: int, max_block: int) -> List[int]:
+        """Blocks of a range with a recorded contribution."""
+        with self.db.get_session() as session:
+            rows = session.execute(
+                select(_blocks.c.block_number).distinct()
+                .where(_blocks.c.block_number >= min_block, _blocks.c.block_number <= max_block)
+                .order_by(_blocks.c.block_number)
+            ).all()
+            return [row[0] for row in rows]
+
+    def _add(self, deltas, wallet_deltas, nft_address, token_address, timestamp, counters, wallets, sign):
+        for period, seconds in self.periods.items():
+            key = (nft_address, token_address, period, timestamp - timestamp % seconds)
+            delta = deltas.setdefault(key, dict.fromkeys(COUNTERS, 0))
+            for name in COUNTERS:
+                delta[name] += sign * int(counters[name])
+            for wallet, events in wallets.items():
+                wallet_key = key + (wallet,)
+                wallet_deltas[wallet_key] = wallet_deltas.get(wallet_key, 0) + sign * events
+
+    def _apply(self, session, deltas, wallet_deltas):
+        """Additive upserts of counter and wallet deltas, then unique wallet recounts."""
+        # Keys in a fixed order: workers applying blocks of the same buckets lock rows in
+        # the same order, and the rollup rows are locked before the wallets are counted
+        deltas = {k: v for k, v in sorted(deltas.items()) if any(v.values())}
+        wallet_deltas = {k: v for k, v in sorted(wallet_deltas.items()) if v}
+        buckets = sorted({key[:4] for key in wallet_deltas})
+        for key in buckets:
+            deltas.setdefault(key, dict.fromkeys(COUNTERS, 0))
+        if not deltas:
+            return
+
+        now = datetime.now()
+        statement = _insert(session, _rollups)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=["nft_address", "token_address", "period", "bucket_start"],
+            set_={**{name: _rollups.c[name] + statement.excluded[name] for name in COUNTERS},
+                  "updated_at": statement.excluded.updated_at}
+        ), [
+            {"nft_address": key[0], "token_address": key[1], "period": key[2], "bucket_start": key[3],
+             "unique_wallets": 0, "updated_at": now,
+             **_counter_values(delta)}
+            for key, delta in sorted(deltas.items())
+        ])
+
+        if wallet_deltas:
+            statement = _insert(session, _wallets)
+            session.execute(statement.on_conflict_do_update(
+                index_elements=["nft_address", "token_address", "period", "bucket_start", "wallet"],
+                set_={"events": _wallets.c.events + statement.excluded.events}
+            ), [
+                {"nft_address": key[0], "token_address": key[1], "period": key[2], "bucket_start": key[3],
+                 "wallet": key[4], "events": events}
+                for key, events in wallet_deltas.items()
+            ])
+
+            bucket_match = and_(
+                _wallets.c.nft_address == bindparam("b_nft_address"),
+                _wallets.c.token_address == bindparam("b_token_address"),
+                _wallets.c.period == bindparam("b_period"),
+                _wallets.c.bucket_start == bindparam("b_bucket_start"),
+            )
+            parameters = [
+                {"b_nft_address": key[0], "b_token_address": key[1], "b_period": key[2], "b_bucket_start": key[3]}
+                for key in buckets
+            ]
+            session.execute(delete(_wallets).where(bucket_match, _wallets.c.events <= 0), parameters)
+            wallet_count = select(func.count()).select_from(_wallets).where(bucket_match).scalar_subquery()
+            session.execute(update(_rollups).where(
+                _rollups.c.nft_address == bindparam("b_nft_address"),
+                _rollups.c.token_address == bindparam("b_token_address"),
+                _rollups.c.period == bindparam("b_period"),
+                _rollups.c.bucket_start == bindparam("b_bucket_start"),
+            ).values(unique_wallets=wallet_count), parameters)
+
+        # Buckets left without any activity
+        session.execute(delete(_rollups).where(
+            _rollups.c.nft_address == bindparam("b_nft_address"),
+            _rollups.c.token_address == bindparam("b_token_address"),
+            _rollups.c.period == bindparam("b_period"),
+            _rollups.c.bucket_start == bindparam("b_bucket_start"),
+            _rollups.c.trades == 0, _rollups.c.mints == 0, _rollups.c.royalties == 0
+        ), [
+            {"b_nft_address": key[0], "b_token_address": key[1], "b_period": key[2], "b_bucket_start": key[3]}
+            for key in deltas
+        ])
+
+    def get_rollups(self, period: str, start: Optional[int] = None, end: Optional[int] = None,
+                    nft_address: Optional[str] = None, token_address: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rollup rows of a period, newest bucket first.
+
+        Args:
+            period: "hour" or "day"
+            start: First bucket start (unix seconds, inclusive)
+            end: Last bucket start (unix seconds, inclusive)
+            nft_address: Only this collection
+            token_address: Only this payment token
+            limit: Maximum number of rows
+        """
+        query = select(_rollups).where(_rollups.c.period == period)
+        if start is not None:
+            query = query.where(_rollups.c.bucket_start >= start)
+        if end is not None:
+            query = query.where(_rollups.c.bucket_start <= end)
+        if nft_address:
+            query = query.where(_rollups.c.nft_address == nft_address.lower())
+        if token_address:
+            query = query.where(_rollups.c.token_address == token_address.lower())
+        query = query.order_by(_rollups.c.bucket_start.desc(), _rollups.c.volume.desc())
+        if limit:
+            query = query.limit(limit)
+        with self.db.get_session() as session:
+            return [self._row(row) for row in session.execute(query).mappings().all()]
+
+    def top_collections(self, period: str, start: int, end: int, limit: int = 50,
+                        token_address: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Collections by volume over a time range, summed from the rollups of a period.
+
+        unique_wallets is the largest bucket count (distinct wallets don't add up
+        across buckets); use the day period for a lower bound over several days.
+        """
+        # "* 1.0" keeps sums exact NUMERIC in PostgreSQL and makes SQLite sum REALs
+        # instead of failing on integer overflow
+        query = select(
+            _rollups.c.nft_address, _rollups.c.token_address,
+            func.sum(_rollups.c.trades).label("trades"), func.sum(_rollups.c.volume * 1.0).label("volume"),
+            func.sum(_rollups.c.mints).label("mints"), func.sum(_rollups.c.mint_volume * 1.0).label("mint_volume"),
+            func.sum(_rollups.c.royalties).label("royalties"),
+            func.sum(_rollups.c.royalty_volume * 1.0).label("royalty_volume"),
+            func.max(_rollups.c.unique_wallets).label("unique_wallets"),
+        ).where(
+            _rollups.c.period == period, _rollups.c.bucket_start >= start, _rollups.c.bucket_start <= end
+        )
+        if token_address:
+            query = query.where(_rollups.c.token_address == token_address.lower())
+        query = query.group_by(_rollups.c.nft_address, _rollups.c.token_address)\
+            .order_by(func.sum(_rollups.c.volume * 1.0).desc()).limit(limit)
+        with self.db.get_session() as session:
+            return [self._row(row) for row in session.execute(query).mappings().all()]
+
+    @staticmethod
+    def _row(row) -> Dict[str, Any]:
+        result = dict(row)
+        for name in ("volume", "mint_volume", "royalty_volume"):
+            if result.get(name) is not None:
+                result[name] = int(result[name])
+        if isinstance(result.get("updated_at"), datetime):
+            result["updated_at"] = result["updated_at"].isoformat()
+        return result
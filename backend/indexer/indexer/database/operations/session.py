@@ -1,9 +1,14 @@
+import threading
 from contextlib import contextmanager
 from sqlalchemy.orm import Session
 
 from ...env import env
+from ..engine import get_engine, WRITE_OPTION
 from ..models.base import Base
 
+_initialized_engines = set()
+_init_lock = threading.Lock()
+
 class ConnectionManager:
     def __init__(self, database_url=None):
         """
@@ -13,22 +18,69 @@ class ConnectionManager:
             database_url: Optional database URL (defaults to env.get_db_url())
         """
         if database_url:
-            # Create a new engine if URL is provided
-            from sqlalchemy import create_engine
-            self.engine = create_engine(database_url)
+            # Engines are shared per URL, so managers on the same database share one pool
+            self.engine = get_engine(database_url)
             self._initialize_tables()
         else:
             # Use the engine from environment
             self.engine = env.get_db_engine()
+        # Same pool; on SQLite its transactions begin IMMEDIATE (see engine.py)
+        self.write_engine = self.engine.execution_options(**{WRITE_OPTION: True})
+        self._local = threading.local()
     
     def _initialize_tables(self):
-        """Initialize database tables."""
-        Base.metadata.create_all(self.engine)
+        """Initialize database tables (once per engine)."""
+        with _init_lock:
+            if id(self.engine) in _initialized_engines:
+                return
+            Base.metadata.create_all(self.engine)
+            _initialized_engines.add(id(self.engine))
     
     @contextmanager
-    def get_session(self):
-        """Get a database session."""
-        session = Session(self.engine)
+    def get_session(self, write: bool = False):
+        """
+        Get a database session.
+        
+        Inside a unit_of_work() on the same thread this reuses the unit's session and
+        wraps the operation in a SAVEPOINT, so a failed operation is rolled back on its
+        own and the unit commits everything else at the end.
+        
+        Args:
+            write: The session writes; on SQLite it takes the write lock when it begins
+                (reads are deferred and don't block each other or the writer)
+        """
+        unit = getattr(self._local, "session", None)
+        if unit is not None:
+            with unit.begin_nested():
+                yield unit
+            return
+
+        session = Session(self.write_engine if write else self.engine, expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        except:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @contextmanager
+    def unit_of_work(self, write: bool = False):
+        """
+        Share one session and transaction across several operations on this thread.
+        
+        Every get_session() call made inside the block (including those made by
+        DatabaseManager methods) reuses the same connection instead of checking one
+        out, pinging it and committing per operation. Nested units join the outer one,
+        so write must be set on the outermost unit that writes.
+        """
+        if getattr(self._local, "session", None) is not None:
+            yield self._local.session
+            return
+
+        session = Session(self.write_engine if write else self.engine, expire_on_commit=False)
+        self._local.session = session
         try:
             yield session
             session.commit()
@@ -36,4 +88,5 @@ class ConnectionManager:
             session.rollback()
             raise
         finally:
-            session.close()
\ No newline at end of file
+            self._local.session = None
+            session.close()
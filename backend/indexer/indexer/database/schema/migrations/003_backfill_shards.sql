@@ -0,0 +1,22 @@
+CREATE TABLE backfill_shards (
+    id SERIAL PRIMARY KEY,
+    run_name VARCHAR(100) NOT NULL,
+    start_block BIGINT NOT NULL,
+    end_block BIGINT NOT NULL,  -- inclusive
+    next_block BIGINT NOT NULL,  -- resume cursor
+    status VARCHAR(20) NOT NULL DEFAULT 'PENDING',  -- PENDING, LEASED, DONE, FAILED
+    owner VARCHAR(200),
+    lease_expires_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failed_blocks INTEGER NOT NULL DEFAULT 0,
+    errors TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_backfill_shards_run_name UNIQUE (run_name, start_block)
+);
+
+CREATE INDEX ix_backfill_shards_run_name ON backfill_shards (run_name);
+-- Claim scans only look at shards that can still be leased
+CREATE INDEX ix_backfill_shards_claimable ON backfill_shards (run_name, start_block)
+    WHERE status IN ('PENDING', 'LEASED');
@@ -0,0 +1,14 @@
+-- Operational queries (invalid/pending blocks, status-filtered ranges) only look for the
+-- small set of blocks that are not VALID. A partial index keeps them fast without
+-- indexing the tens of millions of VALID rows.
+-- CONCURRENTLY avoids locking writers; run outside a transaction block.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_block_processing_unfinished
+    ON block_processing (status, block_number)
+    WHERE status <> 'VALID';
+
+-- Block lookups and range listings always filter on file_type too
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gcs_objects_file_type_block_number
+    ON gcs_objects (file_type, block_number);
+
+-- Superseded by the composite index above
+DROP INDEX CONCURRENTLY IF EXISTS ix_gcs_objects_block_number;
@@ -0,0 +1,58 @@
+-- OPTIONAL (PostgreSQL 12+): range-partition block_processing by block_number.
+-- Each partition keeps its own (small) indexes, so vacuum, index maintenance and
+-- range scans stay bounded as the chain grows. Run in a maintenance window: rows
+-- are copied into the new table. Partition size must match DB_PARTITION_SIZE;
+-- partitions ahead of the tip are then added with `scripts/partitions.py ensure`.
+--
+-- processing_errors.block_number loses its foreign key (002). A kept FK would follow
+-- the renamed block_processing_old and block its DROP; one pointing at the partitioned
+-- table would make ensure_partitions fail to detach the default partition while an
+-- error row references a block in it. block_number stays as a plain indexed column.
+BEGIN;
+
+ALTER TABLE processing_errors DROP CONSTRAINT IF EXISTS processing_errors_block_number_fkey;
+CREATE INDEX IF NOT EXISTS ix_processing_errors_block_number ON processing_errors (block_number);
+
+ALTER TABLE block_processing RENAME TO block_processing_old;
+ALTER TABLE block_processing_old RENAME CONSTRAINT pk_block_processing TO pk_block_processing_old;
+ALTER INDEX IF EXISTS ix_block_processing_unfinished RENAME TO ix_block_processing_unfinished_old;
+
+CREATE TABLE block_processing (LIKE block_processing_old INCLUDING DEFAULTS)
+    PARTITION BY RANGE (block_number);
+ALTER TABLE block_processing ADD CONSTRAINT pk_block_processing PRIMARY KEY (block_number);
+CREATE INDEX ix_block_processing_unfinished
+    ON block_processing (status, block_number)
+    WHERE status <> 'VALID';
+
+-- Catches blocks beyond the last partition; ensure_partitions moves them out later
+CREATE TABLE block_processing_default PARTITION OF block_processing DEFAULT;
+
+DO $$
+DECLARE
+    partition_size BIGINT := 1000000;
+    first_block BIGINT;
+    last_block BIGINT;
+    partition_start BIGINT;
+BEGIN
+    SELECT COALESCE(MIN(block_number), 0), COALESCE(MAX(block_number), 0)
+        INTO first_block, last_block
+        FROM block_processing_old;
+
+    partition_start := (first_block / partition_size) * partition_size;
+    WHILE partition_start <= last_block LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF block_processing FOR VALUES FROM (%s) TO (%s)',
+            'block_processing_p' || partition_start,
+            partition_start,
+            partition_start + partition_size
+        );
+        partition_start := partition_start + partition_size;
+    END LOOP;
+END $$;
+
+INSERT INTO block_processing SELECT * FROM block_processing_old;
+
+COMMIT;
+
+-- After verifying row counts:
+-- DROP TABLE block_processing_old;
@@ -0,0 +1,6 @@
+CREATE TABLE chain_headers (
+    block_number BIGINT PRIMARY KEY,
+    block_hash VARCHAR(66) NOT NULL,
+    parent_hash VARCHAR(66) NOT NULL,  -- checked against the previous block's hash to detect reorgs
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,12 @@
+-- Which contracts each decoded block touched, and the ABI version (registry hash)
+-- used to decode them. Lets scripts/redecode_affected.py redecode only the blocks
+-- of contracts whose ABI was added, changed or removed.
+CREATE TABLE contract_usage (
+    address VARCHAR(42) NOT NULL,
+    block_number BIGINT NOT NULL,
+    abi_version VARCHAR(16),  -- NULL: not in the registry when the block was decoded
+    PRIMARY KEY (address, block_number)
+);
+
+CREATE INDEX ix_contract_usage_address_abi_version ON contract_usage (address, abi_version);
+CREATE INDEX ix_contract_usage_block_number ON contract_usage (block_number);
@@ -0,0 +1,46 @@
+-- Per-collection activity per hour and day, kept up to date with additive upserts
+-- in the same transaction as each block's VALID status (see RollupManager).
+CREATE TABLE collection_rollups (
+    nft_address VARCHAR(42) NOT NULL,
+    token_address VARCHAR(42) NOT NULL,  -- payment token; volumes are in its units
+    period VARCHAR(8) NOT NULL,  -- hour, day
+    bucket_start BIGINT NOT NULL,  -- unix seconds
+    trades BIGINT NOT NULL DEFAULT 0,
+    volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    mints BIGINT NOT NULL DEFAULT 0,
+    mint_volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    royalties BIGINT NOT NULL DEFAULT 0,
+    royalty_volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    unique_wallets BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (nft_address, token_address, period, bucket_start)
+);
+
+CREATE INDEX ix_collection_rollups_period_bucket_start ON collection_rollups (period, bucket_start);
+
+-- Wallets active in a bucket, so unique_wallets stays exact under additive updates
+CREATE TABLE collection_rollup_wallets (
+    nft_address VARCHAR(42) NOT NULL,
+    token_address VARCHAR(42) NOT NULL,
+    period VARCHAR(8) NOT NULL,
+    bucket_start BIGINT NOT NULL,
+    wallet VARCHAR(42) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (nft_address, token_address, period, bucket_start, wallet)
+);
+
+-- Each block's contribution, subtracted again when the block is redecoded
+CREATE TABLE collection_rollup_blocks (
+    block_number BIGINT NOT NULL,
+    nft_address VARCHAR(42) NOT NULL,
+    token_address VARCHAR(42) NOT NULL,
+    timestamp BIGINT NOT NULL,
+    trades BIGINT NOT NULL DEFAULT 0,
+    volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    mints BIGINT NOT NULL DEFAULT 0,
+    mint_volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    royalties BIGINT NOT NULL DEFAULT 0,
+    royalty_volume NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    wallets TEXT NOT NULL DEFAULT '{}',  -- JSON: wallet -> events
+    PRIMARY KEY (block_number, nft_address, token_address)
+);
@@ -0,0 +1,20 @@
+-- Dead-letter queue of failed blocks: structured failure of the last attempt, attempt
+-- count and backoff schedule. Blocks that keep failing are quarantined: their status
+-- becomes QUARANTINED so INVALID retry scans skip them until they are released.
+-- ADD VALUE can't run inside a transaction block before PostgreSQL 12.
+ALTER TYPE processingstatus ADD VALUE IF NOT EXISTS 'QUARANTINED';
+
+CREATE TABLE block_failures (
+    block_number BIGINT PRIMARY KEY,
+    stage VARCHAR(20) NOT NULL,  -- download, validation, decoding, storage, status, processing
+    error_class VARCHAR(100) NOT NULL,
+    error_message TEXT,
+    contract VARCHAR(42),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    quarantined BOOLEAN NOT NULL DEFAULT FALSE,
+    next_retry_at TIMESTAMP,
+    first_failed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_failed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_block_failures_quarantined_next_retry_at ON block_failures (quarantined, next_retry_at);
@@ -1,3 +1,6 @@
-from .block import BlockDecoder
+from .block import BlockDecoder, TransactionDecodeError
 from .transaction import TransactionDecoder
-from .log import LogDecoder
\ No newline at end of file
+from .log import LogDecoder
+from .memo import DecodeMemo
+from .filter import DecodeFilter
+from .events import EventExtractor
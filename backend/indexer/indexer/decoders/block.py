@@ -4,11 +4,26 @@ from typing import Optional
 
 from ..contracts.registry import ContractRegistry
 from ..contracts.manager import ContractManager
+from ..env import env
 from .transaction import TransactionDecoder
+from .memo import DecodeMemo
+from .filter import DecodeFilter
+from .events import EventExtractor
 from ..model.block import Block
+from ..model.compact import CompactBlock
 from ..model.evm import EvmFilteredBlock,EvmHash,EvmTransaction,EvmTxReceipt
 from ..utils.logging import setup_logger
 
+
+class TransactionDecodeError(Exception):
+    """A transaction of a block failed to decode; names the contract it called."""
+
+    def __init__(self, tx_hash: str, contract: Optional[str], cause: Exception):
+        super().__init__(f"Transaction {tx_hash} to {contract}: {type(cause).__name__}: {cause}")
+        self.tx_hash = tx_hash
+        self.contract = contract
+        self.cause = cause
+
 def hex_timestamp_to_datetime(w3: Web3,hex_timestamp):
     try:
         unix_timestamp = w3.to_int(hexstr=hex_timestamp)
@@ -18,12 +33,136 @@ def hex_timestamp_to_datetime(w3: Web3,hex_timestamp):
 
 
 class BlockDecoder:
-    def __init__(self, registry: ContractRegistry):
-        self.contract_manager = ContractManager(registry)
-        self.tx_decoder = TransactionDecoder(self.contract_manager)
+    def __init__(self, registry: ContractRegistry,
+                 memo_entries: Optional[int] = None,
+                 memo_bytes: Optional[int] = None,
+                 filter_mode: Optional[str] = None,
+                 topic_allowlist: Optional[list[str]] = None,
+                 compact: Optional[bool] = None,
+                 extract_events: Optional[bool] = None):
+        """
+        Initialize block decoder.
+
+        Args:
+            registry: Contract registry used for ABI decoding
+            memo_entries: Max entries per decode memo (default: env DECODE_MEMO_ENTRIES, 0 disables)
+            memo_bytes: Optional byte cap per decode memo (default: env DECODE_MEMO_BYTES)
+            filter_mode: all, registry or topics (default: env DECODE_FILTER_MODE)
+            topic_allowlist: topic0s kept from any contract in topics mode (default: env DECODE_TOPIC_ALLOWLIST)
+            compact: Return CompactBlock instead of Block from decode_block (default: env DECODE_COMPACT_BLOCKS)
+            extract_events: Fill Transaction.events with trades, mints, royalties and transfers
+                (default: env DECODE_EXTRACT_EVENTS)
+        """
+        memo_entries = env.get_decode_memo_entries() if memo_entries is None else memo_entries
+        memo_bytes = env.get_decode_memo_bytes() if memo_bytes is None else memo_bytes
+        self.log_memo = DecodeMemo(memo_entries, memo_bytes) if memo_entries else None
+        self.function_memo = DecodeMemo(memo_entries, memo_bytes) if memo_entries else None
+
+        self.filter_mode = env.get_decode_filter_mode() if filter_mode is None else filter_mode
+        self.topic_allowlist = env.get_decode_topic_allowlist() if topic_allowlist is None else topic_allowlist
+        self.profiler = None
+        # Everything derived from the registry, swapped as one reference by swap_registry
+        self._tables = self._build_tables(registry)
+
+        self.compact = env.get_decode_compact_blocks() if compact is None else compact
+        extract_events = env.get_decode_extract_events() if extract_events is None else extract_events
+        self.extractor = EventExtractor() if extract_events else None
         self.w3 = Web3()
         self.logger = setup_logger(__name__)
 
+    def _build_tables(self, registry: ContractRegistry,
+                      previous: Optional[tuple] = None) -> tuple[ContractManager, DecodeFilter, TransactionDecoder]:
+        contract_manager = ContractManager(registry)
+        decode_filter = DecodeFilter(self.filter_mode, addresses=registry.contracts.keys(), topics=self.topic_allowlist)
+        if previous is not None:
+            old_manager, old_filter, _ = previous
+            contract_manager.carry_over(old_manager)
+            decode_filter.logs_skipped = old_filter.logs_skipped
+            decode_filter.transactions_skipped = old_filter.transactions_skipped
+
+        tx_decoder = TransactionDecoder(
+            contract_manager,
+            function_memo=self.function_memo,
+            log_memo=self.log_memo,
+            log_filter=decode_filter if decode_filter.active else None
+        )
+        tx_decoder.profiler = self.profiler
+        return contract_manager, decode_filter, tx_decoder
+
+    def swap_registry(self, registry: ContractRegistry) -> None:
+        """
+        Decode with a new registry from now on (e.g. from a RegistryWatcher).
+
+        The new tables are built before the swap; blocks already being decoded finish
+        with the registry they started with. Decode memos are shared: entries are keyed
+        by contract instance, and instances of unchanged contracts carry over.
+        """
+        self._tables = self._build_tables(registry, self._tables)
+        self.logger.info(f"Decoder switched to a registry of {len(registry.contracts)} contracts")
+
+    @property
+    def registry(self) -> ContractRegistry:
+        return self._tables[0].registry
+
+    @property
+    def contract_manager(self) -> ContractManager:
+        return self._tables[0]
+
+    @property
+    def filter(self) -> DecodeFilter:
+        return self._tables[1]
+
+    @property
+    def tx_decoder(self) -> TransactionDecoder:
+        return self._tables[2]
+
+    def memo_stats(self) -> dict:
+        """Hit-rate metrics for the log and calldata decode memos."""
+        return {
+            "logs": self.log_memo.stats() if self.log_memo else None,
+            "functions": self.function_memo.stats() if self.function_memo else None
+        }
+
+    @staticmethod
+    def contract_addresses(raw_block: EvmFilteredBlock) -> set[str]:
+        """
+        Contracts called or emitting logs in a block.
+
+        Taken from the raw block rather than the decoded one, so addresses the filter
+        skips are included too.
+        """
+        addresses = {tx.to for tx in raw_block.transactions if tx.to}
+        for receipt in raw_block.receipts:
+            addresses.update(log.address for log in receipt.logs)
+        return addresses
+
+    @staticmethod
+    def event_topics(raw_block: EvmFilteredBlock) -> set[str]:
+        """topic0 of every log in a block."""
+        return {log.topics[0].lower() for receipt in raw_block.receipts for log in receipt.logs if log.topics}
+
+    def contract_versions(self, addresses: set[str],
+                          registry: Optional[ContractRegistry] = None) -> dict[str, Optional[str]]:
+        """
+        ABI version per registered address; unregistered ones are left out (blocks of
+        contracts added later are found through the block index).
+
+        Pass the registry taken before decoding when it may be swapped meanwhile, so a
+        block is never recorded with a newer version than it was decoded with.
+        """
+        registry = registry or self.registry
+        versions = {}
+        for address in addresses:
+            version = registry.get_abi_version(address)
+            if version is not None:
+                versions[address] = version
+        return versions
+
+    def set_profiler(self, profiler) -> None:
+        """Attach a BlockProfiler so per-contract decode costs are recorded."""
+        self.profiler = profiler
+        self.tx_decoder.profiler = profiler
+
     def merge_tx_with_receipts(self, raw_block: EvmFilteredBlock) -> tuple[dict[EvmHash,tuple[EvmTransaction,EvmTxReceipt]],Optional[dict]]:
         tx_dict = {tx.hash: tx for tx in raw_block.transactions}
         receipts_dict = {receipt.transactionHash: receipt for receipt in raw_block.receipts}
@@ -57,20 +196,29 @@ class BlockDecoder:
            
         if diffs["tx_only"]:
             self.logger.warning(f"Transactions without receipts: {len(diffs['tx_only'])}")
-            for tx_hash in diffs["tx_only"][:5]:  # Log first 5 for brevity
+            for tx_hash in list(diffs["tx_only"])[:5]:  # Log first 5 for brevity
                 self.logger.debug(f"TX without receipt: {tx_hash}")
                 
         if diffs["receipt_only"]:
             self.logger.warning(f"Receipts without transactions: {len(diffs['receipt_only'])}")
-            for receipt_hash in diffs["receipt_only"][:5]:  # Log first 5 for brevity
+            for receipt_hash in list(diffs["receipt_only"])[:5]:  # Log first 5 for brevity
                 self.logger.debug(f"Receipt without TX: {receipt_hash}")
                 
         return merged_dict,diffs
 
-    def decode_block(self, raw_block: EvmFilteredBlock) -> Block:
+    def decode_block(self, raw_block: EvmFilteredBlock) -> Block | CompactBlock:
         """
         Decode a full block, including transactions and logs.
+
+        Returns:
+            Block, or CompactBlock if the decoder was created with compact=True. Compact
+            blocks are filled one transaction at a time, so per-log structs never
+            accumulate for the whole block.
         """
+        _, decode_filter, tx_decoder = self._tables  # one registry for the whole block
+        block_number = self.w3.to_int(hexstr=raw_block.block)
+        timestamp = hex_timestamp_to_datetime(self.w3,raw_block.timestamp)
+        compact_block = CompactBlock(block_number, timestamp) if self.compact else None
         decoded_tx = {}
         tx_dict, diffs = self.merge_tx_with_receipts(raw_block)
 
@@ -79,12 +227,27 @@ class BlockDecoder:
             pass
 
         for tx_hash,tx_tuple in tx_dict.items():
+            # Drop transactions that touch no registry contract before building anything
+            if decode_filter.active and not decode_filter.keep_transaction(tx_tuple[0],tx_tuple[1]):
+                decode_filter.transactions_skipped += 1
+                continue
             # pass tx_tuple to the transaction processor, return decoded tx object
-            processed_tx = self.tx_decoder.process_tx(tx_tuple[0],tx_tuple[1])
-            decoded_tx[tx_hash] = processed_tx
+            try:
+                processed_tx = tx_decoder.process_tx(tx_tuple[0],tx_tuple[1])
+                if self.extractor is not None and processed_tx is not None:
+                    processed_tx.events = self.extractor.extract(tx_tuple[0], processed_tx, timestamp)
+            except Exception as e:
+                raise TransactionDecodeError(tx_hash, tx_tuple[0].to, e) from e
+            if compact_block is not None:
+                compact_block.add_transaction(tx_hash, processed_tx)
+            else:
+                decoded_tx[tx_hash] = processed_tx
+
+        if compact_block is not None:
+            return compact_block
 
         return Block(
-            block_number=self.w3.to_int(raw_block.block),
-            timestamp=hex_timestamp_to_datetime(self.w3,raw_block.timestamp),
+            block_number=block_number,
+            timestamp=timestamp,
             transactions=decoded_tx
         )
\ No newline at end of file
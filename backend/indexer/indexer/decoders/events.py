@@ -0,0 +1,213 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..model.block import Block, DecodedLog, Transaction
+from ..model.compact import CompactBlock
+from ..model.evm import EvmTransaction
+from ..model.events import BaseEvent, MintEvent, RoyaltyEvent, TradeEvent, TransferEvent
+
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+NATIVE_TOKEN = ZERO_ADDRESS  # token_address of trades and mints paid in AVAX
+_NATIVE_ALIASES = {ZERO_ADDRESS, "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee"}
+
+# Seaport item types
+_SEAPORT_CURRENCY = (0, 1)      # native, ERC20
+_SEAPORT_NFT = (2, 3, 4, 5)     # ERC721, ERC1155 and their criteria variants
+
+
+def _address(value: Any) -> str:
+    address = str(value).lower()
+    return NATIVE_TOKEN if address in _NATIVE_ALIASES else address
+
+
+def _field(item: Any, name: str, position: int) -> Any:
+    """A tuple component, decoded either as a dict (named components) or as a list."""
+    return item[name] if isinstance(item, dict) else item[position]
+
+
+def block_events(block: Any) -> Iterator[Tuple[str, Any]]:
+    """(event type, event) of a decoded Block, CompactBlock or stored JSON block, in chain order."""
+    if isinstance(block, CompactBlock):
+        groups = (block.events[row] for row in sorted(block.events))
+    elif isinstance(block, Block):
+        transactions = sorted((block.transactions or {}).values(), key=lambda tx: tx.index)
+        groups = (tx.events for tx in transactions if tx.events)
+    else:
+        transactions = sorted((block.get("transactions") or {}).values(), key=lambda tx: tx["index"])
+        groups = (tx.get("events") for tx in transactions if tx.get("events"))
+
+    for events in groups:
+        for event in events:
+            if isinstance(event, dict):
+                yield event.get("type"), event
+            else:
+                yield type(event).__name__, event
+
+
+class EventExtractor:
+    """
+    Derives TradeEvent, MintEvent, RoyaltyEvent and TransferEvent from the decoded logs
+    of a transaction.
+
+    Rules match on the decoded event name and argument names, so they apply to every
+    registry contract with that event: ERC-721 Transfer, LooksRare-style TakerBid/TakerAsk
+    (Joepegs), Joepegs auction settlements, 0x ERC721OrderFilled (Hyperspace), Seaport
+    OrderFulfilled and Salvor Buy. Logs that didn't decode produce nothing.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[EvmTransaction, DecodedLog, Dict], List[BaseEvent]]] = {
+            "Transfer": self._transfer,
+            "TakerBid": self._taker_bid,
+            "TakerAsk": self._taker_ask,
+            "DutchAuctionSettle": self._auction_settle,
+            "EnglishAuctionSettle": self._auction_settle,
+            "ERC721OrderFilled": self._erc721_order_filled,
+            "OrderFulfilled": self._order_fulfilled,
+            "Buy": self._pool_buy,
+        }
+
+    def extract(self, tx: EvmTransaction, transaction: Transaction,
+                timestamp: datetime) -> Optional[List[BaseEvent]]:
+        """
+        Events of a decoded transaction, in log order.
+
+        Returns:
+            List of events, or None if the transaction has none
+        """
+        if not transaction.tx_success:
+            return None
+
+        logs = sorted((log for log in transaction.logs.values() if isinstance(log, DecodedLog)),
+                      key=lambda log: log.index)
+        context = {"timestamp": timestamp, "tx_hash": transaction.tx_hash}
+        events: List[BaseEvent] = []
+        royalties = []
+        for log in logs:
+            if log.name == "RoyaltyPayment":
+                royalties.append(log)
+                continue
+            handler = self.handlers.get(log.name)
+            if handler is None:
+                continue
+            try:
+                events.extend(handler(tx, log, context))
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue  # same event name, different arguments
+
+        self._price_mints(tx, events)
+        events.extend(self._royalties(tx, royalties, events, context))
+        return events or None
+
+    def _transfer(self, tx, log, context) -> List[BaseEvent]:
+        attributes = log.attributes
+        if "tokenId" not in attributes:
+            return []  # ERC-20 Transfer(from, to, value)
+        nft_address = _address(log.contract)
+        from_address = _address(attributes["from"])
+        to_address = _address(attributes["to"])
+        nft_id = int(attributes["tokenId"])
+        events: List[BaseEvent] = [TransferEvent(
+            nft_address=nft_address, nft_id=nft_id, from_address=from_address, to_address=to_address, **context
+        )]
+        if from_address == ZERO_ADDRESS:
+            events.append(MintEvent(
+                contract=_address(tx.to) if tx.to else None, sender=_address(tx.from_), minter=to_address,
+                nft_address=nft_address, nft_id=nft_id, token_address=NATIVE_TOKEN, price=0, **context
+            ))
+        return events
+
+    def _price_mints(self, tx: EvmTransaction, events: List[BaseEvent]) -> None:
+        """Split the AVAX paid by a minting transaction over the tokens it minted."""
+        mints = [event for event in events if isinstance(event, MintEvent)]
+        value = int(tx.value, 16) if tx.value else 0
+        if mints and value:
+            for mint in mints:
+                mint.price = value // len(mints)
+
+    def _trade(self, tx, log, context, direction, buyer, seller, collection, token_id, currency, price) -> List[BaseEvent]:
+        return [TradeEvent(
+            contract=_address(log.contract), sender=_address(tx.from_), direction=direction,
+            buyer=_address(buyer), seller=_address(seller), nft_address=_address(collection),
+            nft_id=int(token_id), token_address=_address(currency), price=int(price), **context
+        )]
+
+    def _taker_bid(self, tx, log, context) -> List[BaseEvent]:
+        # Taker accepts a listing: taker buys from the maker
+        a = log.attributes
+        return self._trade(tx, log, context, "buy", a["taker"], a["maker"],
+                           a["collection"], a["tokenId"], a["currency"], a["price"])
+
+    def _taker_ask(self, tx, log, context) -> List[BaseEvent]:
+        # Taker accepts a bid: taker sells to the maker
+        a = log.attributes
+        return self._trade(tx, log, context, "sell", a["maker"], a["taker"],
+                           a["collection"], a["tokenId"], a["currency"], a["price"])
+
+    def _auction_settle(self, tx, log, context) -> List[BaseEvent]:
+        a = log.attributes
+        return self._trade(tx, log, context, "buy", a["buyer"], a["creator"],
+                           a["collection"], a["tokenId"], a["currency"], a["price"])
+
+    def _erc721_order_filled(self, tx, log, context) -> List[BaseEvent]:
+        # direction 0: the maker sold (taker bought); 1: the maker bought
+        a = log.attributes
+        if int(a["direction"]) == 0:
+            direction, buyer, seller = "buy", a["taker"], a["maker"]
+        else:
+            direction, buyer, seller = "sell", a["maker"], a["taker"]
+        return self._trade(tx, log, context, direction, buyer, seller,
+                           a["erc721Token"], a["erc721TokenId"], a["erc20Token"], a["erc20TokenAmount"])
+
+    def _order_fulfilled(self, tx, log, context) -> List[BaseEvent]:
+        a = log.attributes
+        offer = [(int(_field(i, "itemType", 0)), _field(i, "token", 1), _field(i, "identifier", 2), int(_field(i, "amount", 3)))
+                 for i in a["offer"]]
+        consideration = [(int(_field(i, "itemType", 0)), _field(i, "token", 1), _field(i, "identifier", 2), int(_field(i, "amount", 3)))
+                         for i in a["consideration"]]
+
+        offered_nfts = [item for item in offer if item[0] in _SEAPORT_NFT]
+        if offered_nfts:
+            # Listing filled: the offerer sold to the recipient for the currency considered
+            direction, buyer, seller, nfts, payment = "buy", a["recipient"], a["offerer"], offered_nfts, consideration
+        else:
+            # Offer accepted: the offerer bought the NFT considered with the currency it offered
+            direction, buyer, seller = "sell", a["offerer"], a["recipient"]
+            nfts, payment = [item for item in consideration if item[0] in _SEAPORT_NFT], offer
+        currency = [item for item in payment if item[0] in _SEAPORT_CURRENCY]
+        if not nfts or not currency:
+            return []
+
+        price = sum(item[3] for item in currency) // len(nfts)
+        events = []
+        for _, token, identifier, _ in nfts:
+            events.extend(self._trade(tx, log, context, direction, buyer, seller, token, identifier, currency[0][1], price))
+        return events
+
+    def _pool_buy(self, tx, log, context) -> List[BaseEvent]:
+        a = log.attributes
+        if "lpAddress" not in a:
+            return []
+        return self._trade(tx, log, context, "buy", a["user"], a["seller"],
+                           a["lpAddress"], a["tokenId"], NATIVE_TOKEN, a["price"])
+
+    def _royalties(self, tx, royalties: List[DecodedLog], events: List[BaseEvent], context) -> List[BaseEvent]:
+        """RoyaltyPayment logs, attributed to the trade of the same NFT in the transaction."""
+        if not royalties:
+            return []
+        trades = {(event.nft_address, event.nft_id): event for event in events if isinstance(event, TradeEvent)}
+        result = []
+        for log in royalties:
+            a = log.attributes
+            try:
+                trade = trades.get((_address(a["collection"]), int(a["tokenId"])))
+                if trade is not None:
+                    result.append(RoyaltyEvent(
+                        contract=_address(log.contract), sender=_address(tx.from_), direction=trade.direction,
+                        buyer=trade.buyer, seller=trade.seller, nft_address=trade.nft_address, nft_id=trade.nft_id,
+                        token_address=_address(a["currency"]), price=int(a["amount"]), **context
+                    ))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return result
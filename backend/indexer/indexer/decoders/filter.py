@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable, Optional
+from web3 import Web3
+
+from ..model.evm import EvmLog, EvmTransaction, EvmTxReceipt
+
+
+FILTER_MODES = ("all", "registry", "topics")
+
+
+def normalize_topic(topic: str) -> str:
+    """Accept a topic0 hash or an event signature like 'Transfer(address,address,uint256)'."""
+    topic = topic.strip()
+    if topic.startswith("0x"):
+        return topic.lower()
+    return "0x" + Web3.keccak(text=topic).hex().removeprefix("0x")
+
+
+class DecodeFilter:
+    """
+    Decides which logs and transactions are worth decoding.
+
+    Modes:
+        all: keep everything (no filtering)
+        registry: keep logs emitted by, and transactions sent to, registry contracts
+        topics: as registry, plus logs from any contract whose topic0 is allowlisted
+    """
+
+    def __init__(self, mode: str = "all", addresses: Iterable[str] = (), topics: Iterable[str] = ()):
+        if mode not in FILTER_MODES:
+            raise ValueError(f"Unknown filter mode '{mode}', expected one of {FILTER_MODES}")
+        self.mode = mode
+        self.addresses = frozenset(address.lower() for address in addresses)
+        self.topics = frozenset(normalize_topic(topic) for topic in topics) if mode == "topics" else frozenset()
+        self.logs_skipped = 0
+        self.transactions_skipped = 0
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "all"
+
+    def keep_log(self, log: EvmLog) -> bool:
+        if self.mode == "all":
+            return True
+        if log.address and log.address in self.addresses:
+            return True
+        return bool(self.topics) and bool(log.topics) and log.topics[0].lower() in self.topics
+
+    def keep_transaction(self, tx: EvmTransaction, receipt: Optional[EvmTxReceipt]) -> bool:
+        """Keep calls to registry contracts and any transaction with a kept log."""
+        if self.mode == "all":
+            return True
+        if tx.to and tx.to in self.addresses:
+            return True
+        return receipt is not None and any(self.keep_log(log) for log in receipt.logs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "addresses": len(self.addresses),
+            "topics": len(self.topics),
+            "logs_skipped": self.logs_skipped,
+            "transactions_skipped": self.transactions_skipped
+        }
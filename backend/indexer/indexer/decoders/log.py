@@ -1,14 +1,17 @@
 from typing import Optional
+import msgspec
 from web3 import Web3
 
 from ..contracts.manager import ContractManager
 from ..model.evm import EvmLog
 from ..model.block import DecodedLog, EncodedLog
+from .memo import DecodeMemo, MISS
 
 
 class LogDecoder:
-    def __init__(self, contract_manager: ContractManager):
+    def __init__(self, contract_manager: ContractManager, memo: Optional[DecodeMemo] = None):
         self.contract_manager = contract_manager
+        self.memo = memo  # (contract instance, topics, data) -> (event name, attributes) | None
         self.w3 = Web3()
 
     def build_encoded_log(self, log: EvmLog) -> EncodedLog:
@@ -24,36 +27,66 @@ class LogDecoder:
             return encoded_log
         
         except Exception as e:
-            print(f"Error decoding log in tx {log['transactionHash']}: {e}")
+            print(f"Error decoding log in tx {log.transactionHash}: {e}")
             return None
         
         return None
 
+    def decode_event(self, contract, log: EvmLog) -> Optional[tuple[str, dict]]:
+        """
+        ABI-decode a log against a contract.
+
+        Returns:
+            (event name, attributes), or None if no event in the ABI matches
+        """
+        try:
+            event = contract.get_event_by_topic(log.topics[0])
+        except Exception:
+            # Topic not in the contract ABI
+            return None
+
+        try:
+            decoded_log = event.process_log(msgspec.structs.asdict(log))
+        except Exception:
+            # Topic matches but the payload doesn't fit the event (e.g. a same-signature event of another contract)
+            return None
+        if not decoded_log:
+            return None
+        return decoded_log["event"], dict(decoded_log["args"])
+
     def decode(self, log: EvmLog) -> Optional[DecodedLog|EncodedLog]:
         if not log.address:
             return self.build_encoded_log(log)
             
-        contract = self.contract_manager.get_contract(log.address)
-        if not contract:
+        contract = self.contract_manager.get_contract(log.address, log.blockNumber)
+        if not contract or not log.topics:
             return self.build_encoded_log(log)
-        
+
         try:
-            decoded_log = contract.events.process_receipt(log)
+            if self.memo is None:
+                decoded = self.decode_event(contract, log)
+            else:
+                # Keyed by instance: a proxy's implementations decode the same log differently
+                key = (contract, tuple(log.topics), log.data)
+                decoded = self.memo.get(key)
+                if decoded is MISS:
+                    decoded = self.decode_event(contract, log)
+                    self.memo.put(key, decoded)
 
-            if not decoded_log:
+            if decoded is None:
                 return self.build_encoded_log(log)
 
+            name, attributes = decoded
             return DecodedLog(
                 index=self.w3.to_int(hexstr=log.logIndex),
                 removed=log.removed,
                 contract=log.address,
                 signature=log.topics[0],
-                name=decoded_log["event"],
-                attributes=dict(decoded_log["args"])
+                name=name,
+                attributes=attributes
             )
 
         except Exception as e:
             print(f"Error decoding log in tx {log.transactionHash}: {e}")
             return None
-        
 
@@ -1,10 +1,13 @@
 from typing import Optional
+import time
 from web3 import Web3
 
 from ..contracts.manager import ContractManager
 from ..model.evm import EvmTransaction, EvmTxReceipt
 from ..model.block import DecodedLog, EncodedLog, EncodedMethod, DecodedMethod, Transaction
 from .log import LogDecoder
+from .memo import DecodeMemo, MISS
+from .filter import DecodeFilter
 
 
 def hex_to_bool(hex_string):
@@ -18,43 +21,95 @@ def hex_to_bool(hex_string):
 
 
 class TransactionDecoder:
-    def __init__(self, contract_manager: ContractManager):
+    def __init__(self, contract_manager: ContractManager,
+                 function_memo: Optional[DecodeMemo] = None,
+                 log_memo: Optional[DecodeMemo] = None,
+                 log_filter: Optional[DecodeFilter] = None):
         self.contract_manager = contract_manager
-        self.log_decoder = LogDecoder(contract_manager)
+        self.log_filter = log_filter
+        self.memo = function_memo  # (contract instance, input) -> (function name, args) | None
+        self.log_decoder = LogDecoder(contract_manager, memo=log_memo)
         self.w3 = Web3()
+        self.profiler = None  # optional BlockProfiler, see BlockDecoder.set_profiler
+
+    def decode_input(self, contract, tx_input: str) -> Optional[tuple[str, dict]]:
+        """
+        ABI-decode calldata against a contract.
+
+        Returns:
+            (function name, args), or None if the input can't be decoded
+        """
+        try:
+            func_obj, func_params = contract.decode_function_input(tx_input)
+            return func_obj.fn_name, dict(func_params)
+        except:
+            return None
 
     def decode_function(self, tx: EvmTransaction) -> EncodedMethod|DecodedMethod:
         if not tx.to:
             return EncodedMethod(tx.input)
 
-        contract = self.contract_manager.get_contract(tx.to)
+        contract = self.contract_manager.get_contract(tx.to, tx.blockNumber)
         if not contract or not tx.input or tx.input == '0x':
             return EncodedMethod(tx.input)
 
-        try:
-            func_obj, func_params = contract.decode_function_input(tx.input)
-            
-            return DecodedMethod(
-                selector = func_obj.selector.hex(),
-                name= func_obj.fn_name,
-                args = dict(func_params),
-            )
-        except:
+        if self.memo is None:
+            decoded = self.decode_input(contract, tx.input)
+        else:
+            key = (contract, tx.input)
+            decoded = self.memo.get(key)
+            if decoded is MISS:
+                decoded = self.decode_input(contract, tx.input)
+                self.memo.put(key, decoded)
+
+        if decoded is None:
             return EncodedMethod(tx.input)
 
+        name, args = decoded
+        return DecodedMethod(
+            selector = tx.input[:10],
+            name= name,
+            args = args,
+        )
+
     def decode_receipt(self, receipt: EvmTxReceipt) -> dict[str,EncodedLog|DecodedLog]:
         logs = {}
         for log in receipt.logs:
+            if self.log_filter is not None and not self.log_filter.keep_log(log):
+                self.log_filter.logs_skipped += 1
+                continue
             hash = log.transactionHash
             index = self.w3.to_int(hexstr=log.logIndex)
             log_id = str(hash) + str(index)
-            processed_log = self.log_decoder.decode(log)
+            if self.profiler is None:
+                processed_log = self.log_decoder.decode(log)
+            else:
+                start = time.perf_counter()
+                processed_log = self.log_decoder.decode(log)
+                self.profiler.record_decode(
+                    "log",
+                    log.address,
+                    log.topics[0] if log.topics else None,
+                    time.perf_counter() - start,
+                    name=getattr(processed_log, "name", None)
+                )
             logs[log_id] = processed_log
         return logs
     
     def process_tx(self, tx: EvmTransaction, receipt: EvmTxReceipt) -> Optional[Transaction]:
         try:
-            tx_function = self.decode_function(tx)
+            if self.profiler is None:
+                tx_function = self.decode_function(tx)
+            else:
+                start = time.perf_counter()
+                tx_function = self.decode_function(tx)
+                self.profiler.record_decode(
+                    "function",
+                    tx.to,
+                    tx.input[:10] if tx.input else None,
+                    time.perf_counter() - start,
+                    name=getattr(tx_function, "name", None)
+                )
             tx_logs = self.decode_receipt(receipt)
 
             return Transaction(
@@ -3,7 +3,7 @@ import re
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 class IndexerEnvironment:
@@ -32,15 +32,13 @@ class IndexerEnvironment:
         
         self._validate_env()
 
-        # Check for SQLite override before attempting database connection
+        # The engine is created on first use (get_db_engine / verify_database): building it
+        # here would import the database package while this module is still initializing
+        self.db_engine = None
         if os.getenv("DB_USE_SQLITE", "").lower() in ("true", "1", "yes"):
             self.logger.info("SQLite database explicitly configured, skipping PostgreSQL connection attempt")
-            self.db_engine = self._init_sqlite_connection()
         else:
-            # Initialize database connection if validation passes
-            self.db_engine = None
-            if self._validate_db_config():
-                self._init_db_connection()
+            self._validate_db_config()
 
     
     def _validate_env(self):
@@ -100,6 +98,10 @@ class IndexerEnvironment:
     def _init_db_connection(self):
         """Initialize database connection and verify it works."""
         db_url = self.get_db_url()
+        if db_url.startswith("sqlite"):
+            self.db_engine = self._init_sqlite_connection()
+            return self.db_engine is not None
+
         # Mask password in logs
         masked_url = db_url
         if ":" in db_url and "@" in db_url:
@@ -110,14 +112,9 @@ class IndexerEnvironment:
         self.logger.info(f"Initializing database connection to {masked_url}")
         
         try:
-            # Create engine with reasonable defaults
-            self.db_engine = create_engine(
-                db_url,
-                pool_pre_ping=True,  # Verify connection before using
-                pool_recycle=300,    # Recycle connections after 5 minutes
-                pool_size=5,         # Maintain a pool of 5 connections
-                max_overflow=10      # Allow up to 10 additional connections
-            )
+            # Create engine with the deployment's pool settings
+            from indexer.indexer.database.engine import create_db_engine
+            self.db_engine = create_db_engine(db_url)
             
             # Test connection
             with self.db_engine.connect() as conn:
@@ -136,13 +133,13 @@ class IndexerEnvironment:
 
     def _init_sqlite_connection(self):
         """Initialize SQLite database connection."""
-        from sqlalchemy import create_engine
+        from indexer.indexer.database.engine import create_db_engine
         data_dir = self.paths['data_dir']
         db_url = f"sqlite:///{data_dir}/wesmol.db"
         self.logger.info(f"Initializing SQLite database at {db_url}")
         
         try:
-            engine = create_engine(db_url)
+            engine = create_db_engine(db_url)
             # Create tables
             from indexer.indexer.database.models.base import Base
             Base.metadata.create_all(engine)
@@ -238,12 +235,211 @@ class IndexerEnvironment:
     def get_rpc_url(self):
         return os.getenv("AVAX_RPC")
 
+    def get_rpc_timeout(self):
+        """Seconds per JSON-RPC HTTP request."""
+        return float(os.getenv("RPC_TIMEOUT", "30"))
+
+    def get_rpc_batch_size(self):
+        """JSON-RPC requests sent per HTTP POST."""
+        return int(os.getenv("RPC_BATCH_SIZE", "50"))
+
+    def get_rpc_max_concurrency(self):
+        """Concurrent JSON-RPC HTTP requests when fetching blocks in bulk."""
+        return int(os.getenv("RPC_MAX_CONCURRENCY", "4"))
+
+    def get_follower_poll_seconds(self):
+        """Sleep between tip polls once caught up."""
+        return float(os.getenv("FOLLOWER_POLL_SECONDS", "1"))
+
+    def get_follower_batch_blocks(self):
+        """Max blocks fetched per tip poll while catching up."""
+        return int(os.getenv("FOLLOWER_BATCH_BLOCKS", "10"))
+
+    def get_follower_reorg_depth(self):
+        """Recent block hashes kept to detect and unwind reorgs."""
+        return int(os.getenv("FOLLOWER_REORG_DEPTH", "64"))
+
+    def get_follower_confirmations(self):
+        """Blocks the follower stays behind the tip."""
+        return int(os.getenv("FOLLOWER_CONFIRMATIONS", "0"))
+
     def get_rpc_prefix(self):
         return os.getenv("GCS_RPC_PREFIX")
     
     def get_decoded_prefix(self):
         return os.getenv("GCS_DECODED_PREFIX")
 
+    def get_decode_memo_entries(self):
+        """Max entries per decode memo (0 disables memoization)."""
+        return int(os.getenv("DECODE_MEMO_ENTRIES", "100000"))
+
+    def get_decode_memo_bytes(self):
+        """Optional estimated byte cap per decode memo."""
+        value = os.getenv("DECODE_MEMO_BYTES")
+        return int(value) if value else None
+
+    def get_decode_filter_mode(self):
+        """Which logs/transactions to decode: all, registry or topics."""
+        return os.getenv("DECODE_FILTER_MODE", "all")
+
+    def get_decode_topic_allowlist(self):
+        """topic0 hashes or event signatures kept from non-registry contracts (mode=topics)."""
+        value = os.getenv("DECODE_TOPIC_ALLOWLIST", "")
+        return [topic for topic in value.split(";") if topic.strip()]
+
+    def get_decode_compact_blocks(self):
+        """Keep decoded blocks in the column-oriented CompactBlock form until stored."""
+        return os.getenv("DECODE_COMPACT_BLOCKS", "False").lower() in ("true", "1", "yes")
+
+    def get_decode_extract_events(self):
+        """Extract trade, mint, royalty and transfer events into Transaction.events."""
+        return os.getenv("DECODE_EXTRACT_EVENTS", "True").lower() in ("true", "1", "yes")
+
+    def get_decoded_compression(self):
+        """Codec for stored decoded blocks: none, gzip or zstd."""
+        return os.getenv("DECODED_COMPRESSION", "none").lower()
+
+    def get_decoded_compression_level(self):
+        """Optional compression level (default depends on the codec)."""
+        value = os.getenv("DECODED_COMPRESSION_LEVEL")
+        return int(value) if value else None
+
+    def get_decoded_read_all_codecs(self):
+        """Look for decoded blocks stored with any codec, not just DECODED_COMPRESSION."""
+        return os.getenv("DECODED_READ_ALL_CODECS", "False").lower() in ("true", "1", "yes")
+
+    def get_zstd_dictionary_path(self):
+        """Optional trained zstd dictionary for decoded blocks."""
+        return os.getenv("ZSTD_DICTIONARY_PATH") or None
+
+    def get_block_index_enabled(self):
+        """Write the address/topic0 block index while decoding."""
+        return os.getenv("BLOCK_INDEX_ENABLED", "True").lower() in ("true", "1", "yes")
+
+    def get_block_index_prefix(self):
+        """Blob prefix of the block index segments."""
+        return os.getenv("BLOCK_INDEX_PREFIX", "index/")
+
+    def get_block_index_range_size(self):
+        """Blocks per index range (fixed once segments exist)."""
+        return int(os.getenv("BLOCK_INDEX_RANGE_SIZE", "100000"))
+
+    def get_block_index_flush_blocks(self):
+        """Blocks buffered per process before an index segment is written."""
+        return int(os.getenv("BLOCK_INDEX_FLUSH_BLOCKS", "1000"))
+
+    def get_block_index_compact_segments(self):
+        """Segments a writer adds to an index range before compacting it (0 disables)."""
+        return int(os.getenv("BLOCK_INDEX_COMPACT_SEGMENTS", "50"))
+
+    def get_registry_reload_seconds(self):
+        """Seconds between checks for contract registry changes (0 disables hot reload)."""
+        return float(os.getenv("REGISTRY_RELOAD_SECONDS", "0"))
+
+    def get_registry_gcs_prefix(self):
+        """Optional GCS prefix holding contracts.json and abis/ (default: the local config dir)."""
+        return os.getenv("REGISTRY_GCS_PREFIX") or None
+
+    def get_rollups_enabled(self):
+        """Maintain the per-collection rollups in the same transaction as each block's VALID status."""
+        return os.getenv("ROLLUPS_ENABLED", "True").lower() in ("true", "1", "yes")
+
+    def get_ownership_enabled(self):
+        """Track NFT owners (and optional ERC-20 balances) while following the tip."""
+        return os.getenv("OWNERSHIP_ENABLED", "False").lower() in ("true", "1", "yes")
+
+    def get_ownership_prefix(self):
+        """Blob prefix of the ownership state checkpoints."""
+        return os.getenv("OWNERSHIP_PREFIX", "state/ownership/")
+
+    def get_ownership_checkpoint_blocks(self):
+        """Blocks between ownership state checkpoints."""
+        return int(os.getenv("OWNERSHIP_CHECKPOINT_BLOCKS", "1000"))
+
+    def get_ownership_keep_checkpoints(self):
+        """Ownership checkpoints kept in storage."""
+        return int(os.getenv("OWNERSHIP_KEEP_CHECKPOINTS", "3"))
+
+    def get_ownership_balance_tokens(self):
+        """ERC-20 contracts whose balances the ownership tracker keeps (comma-separated)."""
+        return [token.strip().lower() for token in os.getenv("OWNERSHIP_BALANCE_TOKENS", "").split(",") if token.strip()]
+
+    def get_analytics_max_blocks(self):
+        """Largest block range a trade analytics request may load."""
+        return int(os.getenv("ANALYTICS_MAX_BLOCKS", "100000"))
+
+    def get_analytics_workers(self):
+        """Concurrent decoded block downloads when loading trades for analytics."""
+        return int(os.getenv("ANALYTICS_WORKERS", "16"))
+
+    def get_backfill_lease_seconds(self):
+        """Seconds a backfill shard lease lasts without a heartbeat."""
+        return int(os.getenv("BACKFILL_LEASE_SECONDS", "300"))
+
+    def get_backfill_heartbeat_seconds(self):
+        """Seconds between lease heartbeats (keep well under the lease length)."""
+        return int(os.getenv("BACKFILL_HEARTBEAT_SECONDS", "30"))
+
+    def get_backfill_max_attempts(self):
+        """Claims of a shard before it is marked failed."""
+        return int(os.getenv("BACKFILL_MAX_ATTEMPTS", "5"))
+
+    def get_batch_max_workers(self):
+        """Max blocks in flight during batch processing (1 = sequential)."""
+        return int(os.getenv("BATCH_MAX_WORKERS", "8"))
+
+    def get_failure_quarantine_attempts(self):
+        """Failed attempts after which a block is quarantined instead of retried."""
+        return int(os.getenv("FAILURE_QUARANTINE_ATTEMPTS", "5"))
+
+    def get_failure_retry_base_seconds(self):
+        """Delay before retrying a block after its first failure; doubles per attempt."""
+        return float(os.getenv("FAILURE_RETRY_BASE_SECONDS", "60"))
+
+    def get_failure_retry_max_seconds(self):
+        """Longest delay between retries of a failed block."""
+        return float(os.getenv("FAILURE_RETRY_MAX_SECONDS", "21600"))
+
+    def get_ordered_commit_window(self):
+        """Decoded blocks an OrderedCommitter buffers ahead of its watermark before producers wait."""
+        return int(os.getenv("ORDERED_COMMIT_WINDOW", "256"))
+
+    def get_retry_max_attempts(self):
+        """Attempts per GCS/DB call before giving up on retryable errors."""
+        return int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+
+    def get_db_pool_size(self):
+        """Connections kept open per engine."""
+        return int(os.getenv("DB_POOL_SIZE", "5"))
+
+    def get_db_max_overflow(self):
+        """Extra connections allowed above the pool size under load."""
+        return int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+    def get_db_pool_timeout(self):
+        """Seconds to wait for a pooled connection before raising."""
+        return int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+    def get_db_pool_recycle(self):
+        """Seconds after which pooled connections are replaced."""
+        return int(os.getenv("DB_POOL_RECYCLE", "300"))
+
+    def get_db_statement_timeout_ms(self):
+        """PostgreSQL statement_timeout in milliseconds (0 = none)."""
+        return int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+    def get_db_partition_size(self):
+        """Blocks per block_processing range partition (PostgreSQL, see migration 005)."""
+        return int(os.getenv("DB_PARTITION_SIZE", "1000000"))
+
+    def get_sqlite_wal(self):
+        """Use WAL journaling for file SQLite databases."""
+        return os.getenv("SQLITE_WAL", "True").lower() in ("true", "1", "yes")
+
+    def get_sqlite_busy_timeout_ms(self):
+        """How long SQLite waits on a locked database before failing."""
+        return int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
     def get_service_port(self):
         return os.getenv("PORT")
     
@@ -307,7 +503,7 @@ class IndexerEnvironment:
                 return int(match.group(1))
                 
             # Pattern 3: Just the number itself (for simpler formats)
-            match = re.search(r"(\d+)\.json$", filename)
+            match = re.search(r"(\d+)\.json(?:\.gz|\.zst)?$", filename)
             if match:
                 return int(match.group(1))
                 
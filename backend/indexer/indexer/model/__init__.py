@@ -28,6 +28,8 @@ from .block import(
     Block
 )
 
+from .compact import CompactBlock
+
 from .events import(
     BaseEvent,
     MintEvent,
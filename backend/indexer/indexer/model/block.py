@@ -3,6 +3,7 @@ from msgspec import Struct
 from datetime import datetime
 
 from .types import HexStr,EvmAddress,EvmHash
+from .events import MintEvent, RoyaltyEvent, TradeEvent, TransferEvent, UpgradeEvent
 
 
 class EncodedLog(Struct, tag=True):
@@ -37,9 +38,13 @@ class Transaction(Struct):
     function: EncodedMethod | DecodedMethod
     tx_success: bool
     logs: dict[str,EncodedLog|DecodedLog]  # key: "{tx_hash}_{log_index}" aka log_id
-    events: Optional[list[dict]] = None
+    events: Optional[list[TradeEvent|MintEvent|RoyaltyEvent|TransferEvent|UpgradeEvent]] = None  # see decoders.events
 
 class Block(Struct):
     block_number: int
     timestamp: datetime
-    transactions: Optional[list[Transaction]] = None
\ No newline at end of file
+    transactions: Optional[dict[EvmHash,Transaction]] = None  # key: tx_hash
+
+    @property
+    def transaction_count(self) -> int:
+        return len(self.transactions) if self.transactions else 0
\ No newline at end of file
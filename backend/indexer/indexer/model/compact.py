@@ -0,0 +1,209 @@
+import sys
+from array import array
+from datetime import datetime
+from typing import Optional, Iterator
+
+from .block import Block, Transaction, DecodedLog, EncodedLog
+
+
+# Log row kinds
+ENCODED = 0
+DECODED = 1
+MISSING = 2  # log (or transaction) that failed to decode, stored as None in Block
+
+# Transaction row flags
+TX_SUCCESS = 1
+TX_MISSING = 2
+
+
+class StringTable:
+    """Interned strings with dense integer ids, shared by all rows of a block."""
+
+    __slots__ = ("values", "_ids")
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def id(self, value: str) -> int:
+        table_id = self._ids.get(value)
+        if table_id is None:
+            table_id = self._ids[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return table_id
+
+
+class CompactBlock:
+    """
+    Column-oriented, memory-compact form of a decoded Block.
+
+    Contract addresses, topic0 signatures and event names are interned once per block
+    and referenced by id from per-block arrays. Logs are keyed by integer log index
+    rather than "{tx_hash}{log_index}" strings, and per-log structs are only created
+    again by to_block(), so the JSON shape of a stored block does not change.
+
+    Transaction rows are laid out in insertion order. The logs of transaction i are
+    log rows log_start[i]:log_start[i + 1].
+    """
+
+    __slots__ = (
+        "block_number", "timestamp",
+        "addresses", "signatures", "names",
+        "tx_hashes", "tx_index", "tx_from", "tx_to", "tx_flags", "functions", "events", "log_start",
+        "log_index", "log_contract", "log_signature", "log_name", "log_kind", "log_removed", "log_payload",
+    )
+
+    def __init__(self, block_number: int, timestamp: datetime):
+        self.block_number = block_number
+        self.timestamp = timestamp
+
+        self.addresses = StringTable()   # log contracts and tx from/to
+        self.signatures = StringTable()  # log topic0
+        self.names = StringTable()       # decoded event names
+
+        self.tx_hashes: list[str] = []
+        self.tx_index = array("I")
+        self.tx_from = array("i")        # address id, -1 if unknown
+        self.tx_to = array("i")          # address id, -1 for contract creation
+        self.tx_flags = bytearray()
+        self.functions: list = []        # EncodedMethod | DecodedMethod | None
+        self.events: dict[int, list] = {}  # sparse: tx row -> Transaction.events
+        self.log_start = array("I", [0])
+
+        self.log_index = array("I")
+        self.log_contract = array("I")
+        self.log_signature = array("I")
+        self.log_name = array("i")       # name id, -1 for encoded logs
+        self.log_kind = bytearray()
+        self.log_removed = bytearray()
+        self.log_payload: list = []      # decoded attributes dict, or (topics, data) for encoded logs
+
+    @property
+    def transaction_count(self) -> int:
+        return len(self.tx_hashes)
+
+    @property
+    def log_count(self) -> int:
+        return len(self.log_index)
+
+    @classmethod
+    def from_block(cls, block: Block) -> "CompactBlock":
+        compact = cls(block.block_number, block.timestamp)
+        for tx_hash, tx in (block.transactions or {}).items():
+            compact.add_transaction(tx_hash, tx)
+        return compact
+
+    def _address_id(self, address: Optional[str]) -> int:
+        return -1 if address is None else self.addresses.id(address)
+
+    def add_transaction(self, tx_hash: str, tx: Optional[Transaction]) -> None:
+        """Append a decoded transaction (None if it failed to decode)."""
+        row = len(self.tx_hashes)
+        self.tx_hashes.append(sys.intern(tx_hash))
+
+        if tx is None:
+            self.tx_index.append(0)
+            self.tx_from.append(-1)
+            self.tx_to.append(-1)
+            self.tx_flags.append(TX_MISSING)
+            self.functions.append(None)
+            self.log_start.append(len(self.log_index))
+            return
+
+        self.tx_index.append(tx.index)
+        self.tx_from.append(self._address_id(tx.origin_from))
+        self.tx_to.append(self._address_id(tx.origin_to))
+        self.tx_flags.append(TX_SUCCESS if tx.tx_success else 0)
+        self.functions.append(tx.function)
+        if tx.events is not None:
+            self.events[row] = tx.events
+
+        prefix_len = len(tx.tx_hash)
+        for log_id, log in tx.logs.items():
+            self._add_log(int(log_id[prefix_len:]), log)
+        self.log_start.append(len(self.log_index))
+
+    def _add_log(self, index: int, log: EncodedLog | DecodedLog | None) -> None:
+        self.log_index.append(index)
+        if log is None:
+            self.log_contract.append(0)
+            self.log_signature.append(0)
+            self.log_name.append(-1)
+            self.log_kind.append(MISSING)
+            self.log_removed.append(0)
+            self.log_payload.append(None)
+            return
+
+        self.log_contract.append(self.addresses.id(log.contract))
+        self.log_signature.append(self.signatures.id(log.signature))
+        self.log_removed.append(1 if log.removed else 0)
+        if isinstance(log, DecodedLog):
+            self.log_name.append(self.names.id(log.name))
+            self.log_kind.append(DECODED)
+            self.log_payload.append(log.attributes)
+        else:
+            self.log_name.append(-1)
+            self.log_kind.append(ENCODED)
+            self.log_payload.append((log.topics, log.data))
+
+    def _build_log(self, row: int) -> EncodedLog | DecodedLog | None:
+        kind = self.log_kind[row]
+        if kind == MISSING:
+            return None
+
+        contract = self.addresses.values[self.log_contract[row]]
+        signature = self.signatures.values[self.log_signature[row]]
+        if kind == DECODED:
+            return DecodedLog(
+                index=self.log_index[row],
+                removed=bool(self.log_removed[row]),
+                contract=contract,
+                signature=signature,
+                name=self.names.values[self.log_name[row]],
+                attributes=self.log_payload[row]
+            )
+        topics, data = self.log_payload[row]
+        return EncodedLog(
+            index=self.log_index[row],
+            removed=bool(self.log_removed[row]),
+            contract=contract,
+            signature=signature,
+            topics=topics,
+            data=data
+        )
+
+    def _address(self, address_id: int) -> Optional[str]:
+        return None if address_id < 0 else self.addresses.values[address_id]
+
+    def iter_transactions(self) -> Iterator[tuple[str, Optional[Transaction]]]:
+        """Yield (tx_hash, Transaction) pairs, rebuilding structs one transaction at a time."""
+        for row, tx_hash in enumerate(self.tx_hashes):
+            if self.tx_flags[row] & TX_MISSING:
+                yield tx_hash, None
+                continue
+
+            logs = {
+                tx_hash + str(self.log_index[log_row]): self._build_log(log_row)
+                for log_row in range(self.log_start[row], self.log_start[row + 1])
+            }
+            yield tx_hash, Transaction(
+                tx_hash=tx_hash,
+                index=self.tx_index[row],
+                origin_from=self._address(self.tx_from[row]),
+                origin_to=self._address(self.tx_to[row]),
+                function=self.functions[row],
+                tx_success=bool(self.tx_flags[row] & TX_SUCCESS),
+                logs=logs,
+                events=self.events.get(row)
+            )
+
+    def to_block(self) -> Block:
+        """Rebuild the Block this was built from (same JSON shape when serialized)."""
+        return Block(
+            block_number=self.block_number,
+            timestamp=self.timestamp,
+            transactions=dict(self.iter_transactions())
+        )
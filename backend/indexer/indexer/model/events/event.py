@@ -3,6 +3,6 @@ from datetime import datetime
 
 from ..types import EvmHash
 
-class BaseEvent(Struct):
+class BaseEvent(Struct, tag=True):  # encoded with "type": class name
     timestamp: datetime
     tx_hash: EvmHash
@@ -1,5 +1,5 @@
 from msgspec import Struct,field
-from typing import Optional
+from typing import Any, Optional
 
 from .types import HexStr, HexInt, EvmAddress, EvmHash
 
@@ -15,6 +15,10 @@ class EvmLog(Struct):
     transactionHash: EvmHash
     transactionIndex: HexStr
 
+    def __post_init__(self):
+        # Normalized once at decode time, so address lookups never lowercase again
+        self.address = self.address.lower()
+
 
 class EvmTxReceipt(Struct):
     blockHash: EvmHash
@@ -25,7 +29,7 @@ class EvmTxReceipt(Struct):
     from_: EvmAddress = field(name="from")  # from is protected word in python
     gasUsed: HexStr
     logs: list[EvmLog]
-    logsBloom: any
+    logsBloom: Any
     status: HexInt # 1 (Success) or 2 (Failure)
     to: Optional[EvmAddress]
     transactionHash: EvmHash
@@ -34,7 +38,7 @@ class EvmTxReceipt(Struct):
 
 
 class EvmTransaction(Struct):
-    accessList: list[any,None]
+    accessList: list[Any]
     blockHash: EvmHash
     blockNumber: HexInt
     chainId: Optional[HexInt]
@@ -48,14 +52,19 @@ class EvmTransaction(Struct):
     nonce: HexInt
     r: EvmHash
     s: EvmHash
-    to: EvmAddress
+    to: Optional[EvmAddress]  # None for contract creations
     transactionIndex: HexInt
     type: HexInt
     v: HexInt
     value: HexInt
 
+    def __post_init__(self):
+        self.from_ = self.from_.lower()
+        if self.to:
+            self.to = self.to.lower()
+
 class EvmFilteredBlock(Struct):
     block: HexStr
     timestamp: HexInt # unix timestamp in hexadecimal
-    transactions: list[EvmTransaction,None]
-    receipts: list[EvmTxReceipt,None]
\ No newline at end of file
+    transactions: list[EvmTransaction]
+    receipts: list[EvmTxReceipt]
\ No newline at end of file
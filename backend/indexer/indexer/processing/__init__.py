@@ -2,4 +2,11 @@
 
 from .processor import BlockProcessor
 from .validator import BlockValidator
-from .factory import ComponentFactory
\ No newline at end of file
+from .factory import ComponentFactory
+from .profiler import BlockProfiler
+from .backfill import BackfillWorker
+from .checkpoint import RunCheckpoint
+from .follower import TipFollower
+from .gaps import GapFiller
+from .ownership import OwnershipTracker
+from .ordered import OrderedCommitter
@@ -0,0 +1,180 @@
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from ..env import env
+from ..database.operations.leases import ShardLeaseManager
+from ..utils.logging import setup_logger
+from .processor import BlockProcessor
+
+
+class BackfillWorker:
+    """
+    Claims shards of a backfill run and processes their blocks.
+
+    Any number of workers, on any number of hosts, can run against the same run name.
+    While a shard is being processed a background thread heartbeats the lease and
+    persists the shard's cursor, so a crashed worker's shard is picked up by another
+    worker after the lease expires and resumes close to where it stopped.
+    """
+
+    def __init__(self, processor: BlockProcessor, lease_manager: ShardLeaseManager, run_name: str,
+                 worker_id: Optional[str] = None, lease_seconds: Optional[int] = None,
+                 heartbeat_seconds: Optional[int] = None, force: bool = False):
+        """
+        Initialize backfill worker.
+
+        Args:
+            processor: Block processor used for each block of a shard
+            lease_manager: Lease table operations
+            run_name: Backfill run to work on
+            worker_id: Lease owner id (default: "{hostname}:{pid}")
+            lease_seconds: Lease length (default: env BACKFILL_LEASE_SECONDS)
+            heartbeat_seconds: Heartbeat interval (default: env BACKFILL_HEARTBEAT_SECONDS)
+            force: Reprocess blocks that are already decoded
+        """
+        self.processor = processor
+        self.leases = lease_manager
+        self.run_name = run_name
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or env.get_backfill_lease_seconds()
+        self.heartbeat_seconds = heartbeat_seconds or env.get_backfill_heartbeat_seconds()
+        self.force = force
+        self.logger = setup_logger(__name__)
+
+        self._stop = threading.Event()
+
+        # Progress of the current shard, read by the heartbeat thread
+        self._next_block = 0
+        self._failed_blocks = 0
+        self._lease_lost = threading.Event()
+
+    def stop(self):
+        """Finish the current block, release the lease and exit run()."""
+        self._stop.set()
+
+    def run(self, max_shards: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Claim and process shards until the run has none left (or stop() is called).
+
+        Args:
+            max_shards: Optional maximum number of shards to process
+
+        Returns:
+            Dictionary of worker statistics
+        """
+        stats = {
+            "worker_id": self.worker_id,
+            "run_name": self.run_name,
+            "started_at": datetime.now().isoformat(),
+            "shards": 0,
+            "blocks": 0,
+            "failed_blocks": 0,
+            "leases_lost": 0
+        }
+
+        while not self._stop.is_set():
+            if max_shards is not None and stats["shards"] >= max_shards:
+                break
+
+            lease = self.leases.claim_shard(self.run_name, self.worker_id, self.lease_seconds)
+            if lease is None:
+                self.logger.info(f"No claimable shards left in run {self.run_name}")
+                break
+
+            processed, completed = self._process_shard(lease)
+            stats["blocks"] += processed
+            stats["failed_blocks"] += self._failed_blocks - lease["failed_blocks"]
+            if completed:
+                stats["shards"] += 1
+            elif self._lease_lost.is_set():
+                stats["leases_lost"] += 1
+
+        stats["ended_at"] = datetime.now().isoformat()
+        self.logger.info(
+            f"Worker {self.worker_id} finished: {stats['shards']} shards, "
+            f"{stats['blocks']} blocks, {stats['failed_blocks']} failed"
+        )
+        return stats
+
+    def _heartbeat(self, shard_id: int, done: threading.Event):
+        while not done.wait(self.heartbeat_seconds):
+            # Blocks before the persisted cursor must already be in the block index
+            next_block = self._next_block
+            self.processor.flush_index()
+            held = self.leases.heartbeat(
+                shard_id,
+                self.worker_id,
+                self.lease_seconds,
+                next_block=next_block,
+                failed_blocks=self._failed_blocks
+            )
+            if not held:
+                self.logger.warning(f"Lost lease on shard {shard_id}, stopping it")
+                self._lease_lost.set()
+                return
+
+    def _process_shard(self, lease: Dict[str, Any]) -> tuple[int, bool]:
+        """
+        Process the remaining blocks of a leased shard.
+
+        Returns:
+            Tuple of (blocks processed, shard completed)
+        """
+        shard_id = lease["id"]
+        self._next_block = lease["next_block"]
+        self._failed_blocks = lease["failed_blocks"]
+        self._lease_lost.clear()
+
+        self.logger.info(
+            f"Claimed shard {lease['start_block']}-{lease['end_block']} of {self.run_name} "
+            f"(attempt {lease['attempts']}), starting at block {lease['next_block']}"
+        )
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(shard_id, done), daemon=True)
+        heartbeat.start()
+
+        processed = 0
+        try:
+            while self._next_block <= lease["end_block"]:
+                if self._stop.is_set() or self._lease_lost.is_set():
+                    break
+
+                gcs_path = env.format_raw_block_path(self._next_block)
+                success, _ = self.processor.process_block(gcs_path, force=self.force)
+                if not success:
+                    self._failed_blocks += 1
+                processed += 1
+                self._next_block += 1
+        except Exception as e:
+            done.set()
+            heartbeat.join()
+            self.processor.flush_index()
+            self.logger.error(f"Shard {shard_id} failed at block {self._next_block}: {e}", exc_info=True)
+            self.leases.release_shard(
+                shard_id, self.worker_id, self._next_block, self._failed_blocks,
+                error=f"{type(e).__name__} at block {self._next_block}: {e}"
+            )
+            return processed, False
+
+        done.set()
+        heartbeat.join()
+        self.processor.flush_index()
+
+        if self._lease_lost.is_set():
+            return processed, False
+
+        if self._next_block > lease["end_block"]:
+            self.leases.complete_shard(shard_id, self.worker_id, self._failed_blocks)
+            self.logger.info(
+                f"Completed shard {lease['start_block']}-{lease['end_block']} "
+                f"({self._failed_blocks} failed blocks)"
+            )
+            return processed, True
+
+        # Stopped early: hand the rest of the shard back
+        self.leases.release_shard(shard_id, self.worker_id, self._next_block, self._failed_blocks)
+        return processed, False
@@ -2,17 +2,25 @@ import os
 import time
 import random
 import json
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterator
 from tqdm import tqdm
 
 from indexer.indexer.env import env
 from indexer.indexer.processing.factory import ComponentFactory
 from indexer.indexer.processing.processor import BlockProcessor
+from indexer.indexer.processing.profiler import BlockProfiler
+from indexer.indexer.processing.checkpoint import RunCheckpoint, COUNTERS
+from indexer.indexer.processing.concurrency import ConcurrencyController
+from indexer.indexer.processing.ordered import OrderedCommitter
 from indexer.indexer.storage.handler import BlockHandler
-from indexer.indexer.storage.local import LocalBlockHandler
-from indexer.indexer.database.models.status import ProcessingStatus, BlockProcess
+from indexer.indexer.storage.local import LocalBlockHandler, LocalStorageHandler
+from indexer.indexer.storage.block_index import BlockIndexWriter
+from indexer.indexer.database.models.status import ProcessingStatus
 from indexer.indexer.utils.logging import setup_logger
 from indexer.indexer.decoders.block import BlockDecoder
 
@@ -23,7 +31,9 @@ class BatchProcessor:
     Process batches of blocks with flexible storage options.
     """
     
-    def __init__(self, storage_type="gcs", local_dir=None, use_local_db=False):
+    def __init__(self, storage_type="gcs", local_dir=None, use_local_db=False,
+                 profile=False, profile_sampler=None, profile_top=10, decode_filter=None,
+                 max_workers=None):
         """
         Initialize batch processor.
         
@@ -31,6 +41,12 @@ class BatchProcessor:
             storage_type: Where to store decoded blocks ("gcs" or "local")
             local_dir: Local directory for storage if storage_type is "local"
             use_local_db: Whether to use local SQLite database
+            profile: Record per-stage and per-contract timings
+            profile_sampler: Optional sampler for slowest blocks ("cprofile" or "stack")
+            profile_top: Number of slowest blocks to keep samples for
+            decode_filter: Decode filter mode ("all", "registry" or "topics"), defaults to env DECODE_FILTER_MODE
+            max_workers: Upper bound on blocks in flight and on each stage's adaptive
+                        concurrency, defaults to env BATCH_MAX_WORKERS (1 = sequential)
         """
         self.logger = setup_logger(__name__)
         self.storage_type = storage_type
@@ -48,7 +64,7 @@ class BatchProcessor:
         self.registry = ComponentFactory.get_contract_registry()
         
         # Create decoder
-        self.decoder = BlockDecoder(self.registry)
+        self.decoder = BlockDecoder(self.registry, filter_mode=decode_filter)
         
         # Create appropriate handler
         if storage_type == "local":
@@ -65,14 +81,53 @@ class BatchProcessor:
                 decoded_prefix=env.get_decoded_prefix()
             )
         
+        # Optional profiling
+        self.profiler = None
+        if profile or profile_sampler:
+            self.profiler = BlockProfiler(sampler=profile_sampler, top_n=profile_top)
+            self.logger.info(f"Profiling enabled (sampler: {profile_sampler or 'none'})")
+
+        # Adaptive per-stage concurrency and retries
+        self.max_workers = max_workers or env.get_batch_max_workers()
+        self.controller = ConcurrencyController(
+            max_workers=self.max_workers,
+            max_attempts=env.get_retry_max_attempts()
+        )
+
+        # Address/topic0 block index, stored next to the decoded blocks
+        block_index = None
+        if env.get_block_index_enabled():
+            index_storage = LocalStorageHandler(self.handler.local_dir) if storage_type == "local" else self.gcs_handler
+            block_index = BlockIndexWriter(index_storage)
+
         # Create block processor
         self.processor = BlockProcessor(
             gcs_handler=self.gcs_handler,
             status_tracker=self.db_manager,
             validator=self.validator,
             decoder=self.decoder,
-            handler=self.handler
+            handler=self.handler,
+            profiler=self.profiler,
+            controller=self.controller,
+            block_index=block_index
         )
+
+        # In-order delivery of decoded blocks to stateful sinks (see attach_committer)
+        self.committer: Optional[OrderedCommitter] = None
+
+    def attach_committer(self, committer: OrderedCommitter):
+        """
+        Feed every processed block of later runs through an ordered commit stage.
+
+        Blocks decoded by the processor are submitted as they complete and blocks
+        skipped as already decoded are read back from storage. A failed block stops the
+        watermark before it, so the sinks end the run at the last contiguous block.
+        Block paths must then be in ascending block order, and a run must continue
+        from the watermark: decoded blocks in between are replayed first (see
+        _catch_up_committer).
+        """
+        self.committer = committer
+        self.processor.subscribe(committer.submit)
     
     def list_available_blocks(self, prefix=None, max_blocks=1000, sync_first=True) -> List[str]:
         """
@@ -150,16 +205,17 @@ class BatchProcessor:
             count = self.db_manager.sync_gcs_objects(prefix=prefix)
             self.logger.info(f"Synced {count} GCS objects to database")
         
-        # Get blocks from database
+        # Get blocks from database, all lookups on one session
         block_paths = []
-        for block_number in block_numbers:
-            if self.db_manager.block_exists_in_gcs(block_number, file_type):
-                if file_type == 'raw':
-                    block_paths.append(env.format_raw_block_path(block_number))
+        with self.db_manager.unit_of_work():
+            for block_number in block_numbers:
+                if self.db_manager.block_exists_in_gcs(block_number, file_type):
+                    if file_type == 'raw':
+                        block_paths.append(env.format_raw_block_path(block_number))
+                    else:
+                        block_paths.append(env.format_decoded_block_path(block_number))
                 else:
-                    block_paths.append(env.format_decoded_block_path(block_number))
-            else:
-                self.logger.warning(f"Block {block_number} not found in database")
+                    self.logger.warning(f"Block {block_number} not found in database")
         
         return block_paths
     
@@ -226,17 +282,7 @@ class BatchProcessor:
         
         # If status is provided, query database for blocks in range with that status
         if status:
-            with self.db_manager.db.get_session() as session:
-                blocks = session.query(BlockProcess).filter(
-                    BlockProcess.block_number >= min_block,
-                    BlockProcess.block_number <= max_block
-                )
-                
-                blocks = blocks.filter(BlockProcess.status == status)
-                blocks = blocks.order_by(BlockProcess.block_number).all()
-                
-                # Return GCS paths
-                return [block.gcs_path for block in blocks if block.gcs_path]
+            return self.db_manager.get_block_paths_by_status(status, min_block, max_block)
         
         # If no status filter, get blocks directly from GCS objects table
         else:
@@ -246,7 +292,247 @@ class BatchProcessor:
                 max_block=max_block
             )
     
-    def process_blocks(self, block_paths: List[str], batch_size: int = None, force: bool = False, sync_first: bool = True) -> Dict[str, Any]:
+    @property
+    def runs_dir(self) -> Path:
+        """Directory holding run checkpoints."""
+        return env.get_path('data_dir') / 'runs'
+
+    def create_run(self, block_paths: List[str], batch_size: int = None, force: bool = False) -> RunCheckpoint:
+        """
+        Persist the plan of a new checkpointed run.
+        
+        Args:
+            block_paths: Resolved block paths, in processing order
+            batch_size: Batch size to process (and resume) with
+            force: Force reprocessing even if decoded blocks already exist
+            
+        Returns:
+            Run checkpoint to pass to process_blocks
+        """
+        checkpoint = RunCheckpoint.create(self.runs_dir, block_paths, options={
+            "batch_size": batch_size,
+            "force": force,
+            "storage_type": self.storage_type,
+            "local_dir": str(self.local_dir) if self.local_dir else None
+        })
+        self.logger.info(f"Created run {checkpoint.run_id} with {len(block_paths)} blocks")
+        return checkpoint
+
+    def resume_run(self, run_id: str, checkpoint_every: int = 100) -> Dict[str, Any]:
+        """
+        Resume a checkpointed run from its last committed cursor.
+        
+        The persisted plan is reused as is: GCS is not listed or synced again, and
+        blocks before the cursor are not re-checked.
+        
+        Args:
+            run_id: Run to resume
+            checkpoint_every: Commit the cursor every N blocks
+            
+        Returns:
+            Processing results for the resumed part of the run
+        """
+        checkpoint = RunCheckpoint.load(self.runs_dir, run_id)
+        if checkpoint.completed:
+            self.logger.warning(f"Run {run_id} already completed")
+            return {"run_id": run_id, "total": 0, **{counter: 0 for counter in COUNTERS}}
+
+        self.logger.info(
+            f"Resuming run {run_id} at {checkpoint.cursor}/{len(checkpoint.block_paths)} "
+            f"({checkpoint.state['success']} successful, {checkpoint.state['failure']} failed, "
+            f"{checkpoint.state['skipped']} skipped so far)"
+        )
+        return self.process_blocks(
+            checkpoint.block_paths,
+            batch_size=checkpoint.options.get("batch_size"),
+            force=checkpoint.options.get("force", False),
+            sync_first=False,
+            checkpoint=checkpoint,
+            checkpoint_every=checkpoint_every
+        )
+
+    def retry_failed(self, limit: int = 1000, block_numbers: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Retry dead-letter blocks whose backoff has elapsed, on the parallel pipeline.
+
+        Args:
+            limit: Most blocks to retry, longest waiting first
+            block_numbers: Retry these blocks instead of the due ones
+
+        Returns:
+            Processing results, with the dead-letter summary after the retry
+        """
+        failures = self.processor.failures
+        if block_numbers is None:
+            block_numbers = failures.due(limit)
+        paths = self.db_manager.get_block_paths(sorted(block_numbers))
+        self.logger.info(f"Retrying {len(paths)} failed blocks")
+
+        # Forced: a block that failed after storing its decoded file must not be skipped
+        results = self.process_blocks(paths, force=True, sync_first=False)
+        results["dead_letter"] = failures.summary()
+        return results
+
+    def _process_path(self, path: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Skip-check and process a single block.
+        
+        Returns:
+            Block result entry for the results details
+        """
+        try:
+            # Extract block number
+            block_number = env.extract_block_number(path)
+            
+            # Quarantined blocks are only retried once released, or when forcing
+            if not force and self.processor.is_quarantined(block_number):
+                return self._quarantined(path, block_number)
+
+            # Check if decoded block already exists (if not forcing)
+            if not force:
+                decoded_exists = False
+                
+                # Check database first
+                if self.db_manager.block_exists_in_gcs(block_number, 'decoded'):
+                    decoded_exists = True
+                # Fallback to direct check if database might not be up to date
+                elif hasattr(self.handler, 'decoded_block_exists'):
+                    if self.handler.decoded_block_exists(block_number):
+                        decoded_exists = True
+                
+                if decoded_exists:
+                    self.logger.debug(f"Block {block_number} already decoded, skipping")
+                    if self.committer is not None:
+                        self._commit(block_number, success=True, already_decoded=True)
+                    return {
+                        "path": path,
+                        "block_number": block_number,
+                        "success": True,
+                        "skipped": True,
+                        "reason": "already_decoded"
+                    }
+            
+            # Process the block
+            success, result_info = self.processor.process_block(path, force=force, skip_checked=True)
+            if self.committer is not None:
+                self._commit(block_number, success, already_decoded=result_info.get("skipped", False))
+            return {
+                "path": path,
+                "block_number": block_number,
+                "success": success,
+                "info": result_info
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Error processing {path}: {str(e)}")
+            
+            try:
+                block_number = env.extract_block_number(path)
+            except:
+                block_number = None
+
+            if self.committer is not None and block_number is not None:
+                self.committer.fail(block_number)
+            
+            return {
+                "path": path,
+                "block_number": block_number,
+                "success": False,
+                "error": str(e)
+            }
+
+    def _quarantined(self, path: str, block_number: int) -> Dict[str, Any]:
+        self.logger.debug(f"Block {block_number} is quarantined, skipping")
+        if self.committer is not None:
+            self._commit(block_number, success=False)
+        return {
+            "path": path,
+            "block_number": block_number,
+            "success": False,
+            "skipped": True,
+            "reason": "quarantined"
+        }
+
+    def _commit(self, block_number: int, success: bool, already_decoded: bool = False):
+        """Hand a finished block to the ordered commit stage unless the processor already did."""
+        if not self.committer.expects(block_number):
+            return  # at or below the watermark, or submitted by the processor listener
+        if success and already_decoded:
+            # Decoded by an earlier run; the sinks still need it
+            block = self.handler.get_decoded_block(block_number)
+            if block is not None:
+                self.committer.submit(block_number, block)
+                return
+        # Failed, or its decoded block never reached the stage: the sinks can't pass it
+        self.committer.fail(block_number)
+
+    def _catch_up_committer(self, first_block: int):
+        """
+        Replay the decoded blocks between the ordered stage's watermark and the first
+        block of a run, so the sinks don't miss them (e.g. a resumed run whose cursor
+        was committed after the sinks' last checkpoint, or a range starting later).
+
+        Raises:
+            ValueError: A block in between isn't decoded (failed, quarantined or not
+                processed yet); process it first
+        """
+        after = self.committer.watermark
+        if first_block <= after + 1:
+            return
+        unfinished = sorted(
+            env.extract_block_number(path)
+            for status in ProcessingStatus if status != ProcessingStatus.VALID
+            for path in self.db_manager.get_block_paths_by_status(status, after + 1, first_block - 1)
+        )
+        if unfinished:
+            shown = ", ".join(str(n) for n in unfinished[:10])
+            raise ValueError(
+                f"{len(unfinished)} blocks between the ordered stage's watermark {after} and block "
+                f"{first_block} aren't decoded ({shown}{', ...' if len(unfinished) > 10 else ''}); "
+                f"process them first"
+            )
+
+        numbers = [env.extract_block_number(path) for path in
+                   self.db_manager.get_block_paths_by_status(ProcessingStatus.VALID, after + 1, first_block - 1)]
+        if not numbers:
+            return
+        self.logger.info(f"Replaying {len(numbers)} decoded blocks after block {after} into the ordered stage")
+        self.committer.expect(numbers)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            for block_number, block in zip(numbers, executor.map(self.handler.get_decoded_block, numbers)):
+                if block is None:
+                    self.committer.fail(block_number)
+                    raise ValueError(f"Block {block_number} is VALID but has no decoded file; reprocess it first")
+                self.committer.submit(block_number, block)
+
+    def _run_batch(self, batch: List[str], force: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Process a batch, yielding block results in batch order.
+        
+        With max_workers > 1 blocks run on a thread pool with a bounded window of
+        in-flight blocks; the concurrency controller decides how many of them are in
+        each stage at once.
+        """
+        if self.max_workers <= 1:
+            for path in batch:
+                yield self._process_path(path, force)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="block") as executor:
+            paths = iter(batch)
+            pending = deque(
+                executor.submit(self._process_path, path, force)
+                for path in islice(paths, self.max_workers * 2)
+            )
+            while pending:
+                block_result = pending.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(executor.submit(self._process_path, next_path, force))
+                yield block_result
+
+    def process_blocks(self, block_paths: List[str], batch_size: int = None, force: bool = False, sync_first: bool = True,
+                       checkpoint: Optional[RunCheckpoint] = None, checkpoint_every: int = 100) -> Dict[str, Any]:
         """
         Process a batch of blocks, optionally breaking into smaller batches.
         
@@ -256,24 +542,48 @@ class BatchProcessor:
                        (None = process all at once)
             force: Force reprocessing even if decoded blocks already exist
             sync_first: Whether to sync GCS objects to database first
+            checkpoint: Optional run checkpoint; processing starts at its cursor and the
+                       cursor is committed every checkpoint_every blocks
+            checkpoint_every: Blocks between checkpoint commits
             
         Returns:
             Processing results
         """
+        start = 0
+        if checkpoint is not None:
+            start = checkpoint.cursor
+            block_paths = block_paths[start:]
+        cursor = start
+        committed = {counter: 0 for counter in COUNTERS}
+
         results = {
             "total": len(block_paths),
             "success": 0,
             "failure": 0,
             "skipped": 0,
+            "quarantined": 0,
             "started_at": datetime.now().isoformat(),
             "batches": [],
             "details": []
         }
+
+        if checkpoint is not None:
+            results["run_id"] = checkpoint.run_id
+            results["resumed_from"] = start
         
         if not block_paths:
             self.logger.warning("No blocks to process")
+            if checkpoint is not None:
+                checkpoint.complete()
             return results
         
+        if self.committer is not None:
+            block_numbers = [env.extract_block_number(path) for path in block_paths]
+            if any(a >= b for a, b in zip(block_numbers, block_numbers[1:])):
+                raise ValueError("An ordered commit stage needs block paths in ascending block order")
+            self._catch_up_committer(block_numbers[0])
+            self.committer.expect(block_numbers)
+
         # Sync database if requested
         if sync_first:
             # Update database to know about decoded blocks
@@ -299,6 +609,7 @@ class BatchProcessor:
                 "success": 0,
                 "failure": 0,
                 "skipped": 0,
+                "quarantined": 0,
                 "started_at": batch_start_time.isoformat(),
                 "blocks": []
             }
@@ -310,111 +621,58 @@ class BatchProcessor:
             status_update_interval = 60  # Status update every minute for long batches
             
             with tqdm(total=total_blocks, desc=f"Batch {batch_index + 1}/{len(batches)}") as progress:
-                for i, path in enumerate(batch):
-                    try:
-                        # Extract block number
-                        block_number = env.extract_block_number(path)
-                        
-                        # Check if decoded block already exists (if not forcing)
-                        skip_processing = False
-                        if not force:
-                            decoded_exists = False
-                            
-                            # Check database first
-                            if self.db_manager.block_exists_in_gcs(block_number, 'decoded'):
-                                decoded_exists = True
-                            # Fallback to direct check if database might not be up to date
-                            elif hasattr(self.handler, 'decoded_block_exists'):
-                                if self.handler.decoded_block_exists(block_number):
-                                    decoded_exists = True
-                            
-                            if decoded_exists:
-                                self.logger.debug(f"Block {block_number} already decoded, skipping")
-                                skip_processing = True
-                                results["skipped"] += 1
-                                batch_results["skipped"] += 1
-                                
-                                block_result = {
-                                    "path": path,
-                                    "block_number": block_number,
-                                    "success": True,
-                                    "skipped": True,
-                                    "reason": "already_decoded"
-                                }
-                                
-                                results["details"].append(block_result)
-                                batch_results["blocks"].append(block_result)
-                        
-                        if not skip_processing:
-                            # Process the block
-                            success, result_info = self.processor.process_block(path)
-                            
-                            block_result = {
-                                "path": path,
-                                "block_number": block_number,
-                                "success": success,
-                                "info": result_info
-                            }
-                            
-                            if success:
-                                results["success"] += 1
-                                batch_results["success"] += 1
-                            else:
-                                results["failure"] += 1
-                                batch_results["failure"] += 1
-                            
-                            results["details"].append(block_result)
-                            batch_results["blocks"].append(block_result)
-                        
-                        # Update progress
-                        progress.update(1)
-                        
-                        # Periodic status updates for long-running batches
-                        current_time = time.time()
-                        blocks_processed = i + 1
-                        
-                        if (blocks_processed % status_interval == 0 or 
-                            current_time - last_status_time > status_update_interval):
-                            
-                            completion_percentage = (blocks_processed / total_blocks) * 100
-                            elapsed_time = current_time - batch_start_time.timestamp()
-                            blocks_per_second = blocks_processed / elapsed_time if elapsed_time > 0 else 0
-                            
-                            est_remaining_seconds = ((total_blocks - blocks_processed) / 
-                                                    blocks_per_second if blocks_per_second > 0 else float('inf'))
-                            est_remaining = str(datetime.timedelta(seconds=int(est_remaining_seconds)))
-                            
-                            self.logger.info(
-                                f"Status update: {blocks_processed}/{total_blocks} blocks processed "
-                                f"({completion_percentage:.1f}%) - "
-                                f"{batch_results['success']} successful, {batch_results['failure']} failed, "
-                                f"{batch_results['skipped']} skipped. "
-                                f"Rate: {blocks_per_second:.2f} blocks/sec. "
-                                f"Est. remaining: {est_remaining}"
-                            )
-                            
-                            last_status_time = current_time
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error processing {path}: {str(e)}")
+                for i, block_result in enumerate(self._run_batch(batch, force)):
+                    if block_result.get("reason") == "quarantined":
+                        results["quarantined"] += 1
+                        batch_results["quarantined"] += 1
+                    elif block_result.get("skipped"):
+                        results["skipped"] += 1
+                        batch_results["skipped"] += 1
+                    elif block_result["success"]:
+                        results["success"] += 1
+                        batch_results["success"] += 1
+                    else:
                         results["failure"] += 1
                         batch_results["failure"] += 1
-                        
-                        try:
-                            block_number = env.extract_block_number(path)
-                        except:
-                            block_number = None
-                        
-                        error_result = {
-                            "path": path,
-                            "block_number": block_number,
-                            "success": False,
-                            "error": str(e)
-                        }
-                        
-                        results["details"].append(error_result)
-                        batch_results["blocks"].append(error_result)
-                        progress.update(1)
+                    
+                    results["details"].append(block_result)
+                    batch_results["blocks"].append(block_result)
+                    
+                    # Update progress
+                    progress.update(1)
+                    
+                    # Periodic status updates for long-running batches
+                    current_time = time.time()
+                    blocks_processed = i + 1
+                    
+                    if (blocks_processed % status_interval == 0 or 
+                        current_time - last_status_time > status_update_interval):
+                    
+                        completion_percentage = (blocks_processed / total_blocks) * 100
+                        elapsed_time = current_time - batch_start_time.timestamp()
+                        blocks_per_second = blocks_processed / elapsed_time if elapsed_time > 0 else 0
+                    
+                        est_remaining_seconds = ((total_blocks - blocks_processed) / 
+                                                blocks_per_second if blocks_per_second > 0 else float('inf'))
+                        est_remaining = str(timedelta(seconds=int(est_remaining_seconds))) if blocks_per_second > 0 else "unknown"
+                    
+                        self.logger.info(
+                            f"Status update: {blocks_processed}/{total_blocks} blocks processed "
+                            f"({completion_percentage:.1f}%) - "
+                            f"{batch_results['success']} successful, {batch_results['failure']} failed, "
+                            f"{batch_results['skipped']} skipped. "
+                            f"Rate: {blocks_per_second:.2f} blocks/sec. "
+                            f"Est. remaining: {est_remaining}"
+                        )
+                    
+                        last_status_time = current_time
+
+                    cursor += 1
+                    if checkpoint is not None and cursor - checkpoint.cursor >= checkpoint_every:
+                        # Index postings must be durable before the cursor moves past their blocks
+                        self.processor.flush_index()
+                        checkpoint.commit(cursor, {c: results[c] - committed[c] for c in COUNTERS})
+                        committed = {c: results[c] for c in COUNTERS}
             
             # Finalize batch results
             batch_end_time = datetime.now()
@@ -427,17 +685,31 @@ class BatchProcessor:
                 f"{batch_results['success']} successful, "
                 f"{batch_results['failure']} failed, "
                 f"{batch_results['skipped']} skipped, "
+                f"{batch_results['quarantined']} quarantined, "
                 f"in {batch_results['duration_seconds']:.2f} seconds"
             )
             
             # Add to overall results
             results["batches"].append(batch_results)
-            
-            # Optional: Add a brief pause between batches
-            if batch_index < len(batches) - 1:
-                time.sleep(1)  # Prevent potential resource contention
         
+        self.processor.flush_index()
+        if checkpoint is not None:
+            checkpoint.commit(cursor, {c: results[c] - committed[c] for c in COUNTERS})
+            checkpoint.complete()
+            results["run_totals"] = {c: checkpoint.state[c] for c in COUNTERS}
+
         # Finalize overall results
+        results["decode_memo"] = self.decoder.memo_stats()
+        results["contract_lookups"] = self.decoder.contract_manager.stats()
+        results["decode_filter"] = self.decoder.filter.stats()
+        results["concurrency"] = self.controller.stats()
+        if self.committer is not None:
+            results["ordered_commit"] = self.committer.stats()
+            if self.committer.halted_at is not None:
+                self.logger.error(
+                    f"Ordered commit stopped before failed block {self.committer.halted_at}; sinks are at block "
+                    f"{self.committer.watermark}. Retry the block, then run again from block {self.committer.watermark + 1}"
+                )
         results["ended_at"] = datetime.now().isoformat()
         results["duration_seconds"] = (
             datetime.fromisoformat(results["ended_at"]) - 
@@ -450,8 +722,35 @@ class BatchProcessor:
             f"{results['success']} successful, "
             f"{results['failure']} failed, "
             f"{results['skipped']} skipped, "
+            f"{results['quarantined']} quarantined, "
             f"in {results['duration_seconds']:.2f} seconds"
         )
+
+        for kind, stats in results["decode_memo"].items():
+            if stats:
+                self.logger.info(
+                    f"Decode memo ({kind}): {stats['hit_rate'] * 100:.1f}% hit rate, "
+                    f"{stats['entries']} entries, ~{stats['bytes'] / 1e6:.1f} MB, {stats['evictions']} evictions"
+                )
+
+        lookups = results["contract_lookups"]
+        self.logger.info(
+            f"Contract lookups: {lookups['hit_rate'] * 100:.1f}% hit rate, "
+            f"{lookups['known']} known and {lookups['unknown']} unknown addresses cached"
+        )
+
+        self.logger.info(
+            "Concurrency limits: " + ", ".join(
+                f"{stage}={stats['limit']} ({stats['throttles']} throttled)"
+                for stage, stats in results["concurrency"]["stages"].items()
+            ) + f", {results['concurrency']['retries']} retries"
+        )
+
+        if self.decoder.filter.active:
+            self.logger.info(
+                f"Decode filter ({self.decoder.filter.mode}): skipped "
+                f"{self.decoder.filter.transactions_skipped} transactions, {self.decoder.filter.logs_skipped} logs"
+            )
         
         return results
     
@@ -478,6 +777,12 @@ class BatchProcessor:
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+        # Write profile summary next to the results
+        if self.profiler is not None:
+            output_path = Path(output_file)
+            profile_file = output_path.with_name(f"{output_path.stem}_profile.json")
+            results["profile_summary"] = self.profiler.write_summary(profile_file, registry=self.decoder.registry)
         
         # Save results
         with open(output_file, 'w') as f:
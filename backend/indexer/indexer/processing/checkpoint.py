@@ -0,0 +1,133 @@
+import os
+import json
+import uuid
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+
+COUNTERS = ("success", "failure", "skipped", "quarantined")
+
+
+def _write_atomic(path: Path, data: Dict[str, Any]):
+    """Write JSON so a crash leaves either the old or the new file, never a torn one."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class RunCheckpoint:
+    """
+    Persisted plan and cursor of a batch run.
+
+    A run directory holds plan.json (the resolved block paths and run options, written
+    once) and checkpoint.json (index of the next unprocessed path plus running counts,
+    committed every N blocks). Resuming a run continues from the committed cursor, so
+    no GCS listing or skip checks are needed for the part of the plan already done.
+    """
+
+    def __init__(self, run_dir: Path, plan: Dict[str, Any], state: Dict[str, Any]):
+        self.run_dir = Path(run_dir)
+        self.plan = plan
+        self.state = state
+
+    @property
+    def run_id(self) -> str:
+        return self.plan["run_id"]
+
+    @property
+    def block_paths(self) -> List[str]:
+        return self.plan["block_paths"]
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return self.plan["options"]
+
+    @property
+    def cursor(self) -> int:
+        return self.state["cursor"]
+
+    @property
+    def completed(self) -> bool:
+        return self.state["status"] == "completed"
+
+    @classmethod
+    def create(cls, runs_dir: Path, block_paths: List[str],
+               options: Optional[Dict[str, Any]] = None) -> "RunCheckpoint":
+        """
+        Start a new run and persist its plan.
+
+        Args:
+            runs_dir: Directory holding one subdirectory per run
+            block_paths: Resolved block paths, in processing order
+            options: Run options needed to resume (force, batch_size, ...)
+        """
+        now = datetime.now()
+        run_id = f"run_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        run_dir = Path(runs_dir) / run_id
+        run_dir.mkdir(parents=True, exist_ok=False)
+
+        plan = {
+            "run_id": run_id,
+            "created_at": now.isoformat(),
+            "options": options or {},
+            "block_paths": list(block_paths)
+        }
+        state = {
+            "run_id": run_id,
+            "status": "running",
+            "cursor": 0,
+            "total": len(plan["block_paths"]),
+            "updated_at": now.isoformat(),
+            **{counter: 0 for counter in COUNTERS}
+        }
+        _write_atomic(run_dir / "plan.json", plan)
+        checkpoint = cls(run_dir, plan, state)
+        checkpoint._save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, runs_dir: Path, run_id: str) -> "RunCheckpoint":
+        run_dir = Path(runs_dir) / run_id
+        if not (run_dir / "plan.json").exists():
+            raise ValueError(f"Run {run_id} not found in {runs_dir}")
+
+        with open(run_dir / "plan.json") as f:
+            plan = json.load(f)
+        with open(run_dir / "checkpoint.json") as f:
+            state = json.load(f)
+        return cls(run_dir, plan, state)
+
+    @classmethod
+    def list_runs(cls, runs_dir: Path) -> List[Dict[str, Any]]:
+        """Checkpoint state of every run, newest first."""
+        runs = []
+        for checkpoint_file in sorted(Path(runs_dir).glob("*/checkpoint.json"), reverse=True):
+            with open(checkpoint_file) as f:
+                runs.append(json.load(f))
+        return runs
+
+    def _save(self):
+        self.state["updated_at"] = datetime.now().isoformat()
+        _write_atomic(self.run_dir / "checkpoint.json", self.state)
+
+    def commit(self, cursor: int, counts: Dict[str, int]):
+        """
+        Record that every path before cursor is processed.
+
+        Args:
+            cursor: Index of the next unprocessed path in the plan
+            counts: Counts since the previous commit, keyed by success/failure/skipped/quarantined
+        """
+        self.state["cursor"] = cursor
+        for counter in COUNTERS:
+            # Runs checkpointed before a counter existed start it at 0
+            self.state[counter] = self.state.get(counter, 0) + counts.get(counter, 0)
+        self._save()
+
+    def complete(self):
+        self.state["status"] = "completed"
+        self._save()
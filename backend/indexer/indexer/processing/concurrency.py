@@ -0,0 +1,195 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterable
+
+from sqlalchemy import exc as sa_exc
+
+from ..utils.logging import setup_logger
+
+
+THROTTLE_CODES = {429, 503}                      # back off hard
+RETRYABLE_CODES = THROTTLE_CODES | {500, 502, 504}
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Errors that mean the backend wants less concurrency."""
+    if getattr(error, "code", None) in THROTTLE_CODES:  # google.api_core HTTP errors
+        return True
+    if isinstance(error, sa_exc.TimeoutError):           # connection pool wait timed out
+        return True
+    if isinstance(error, sa_exc.OperationalError) and "locked" in str(error).lower():  # SQLite writers
+        return True
+    return False
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Errors worth retrying after a backoff."""
+    if is_throttle_error(error):
+        return True
+    if getattr(error, "code", None) in RETRYABLE_CODES:
+        return True
+    if isinstance(error, sa_exc.OperationalError) and getattr(error, "connection_invalidated", False):
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit for one stage, adjusted by additive increase / multiplicative decrease.
+
+    The limit grows by about one slot per limit's worth of successful calls while the
+    stage is saturated and latency stays near the best latency seen. It shrinks by
+    backoff on throttling errors (at most once per cooldown) and gently when latency
+    climbs well above that baseline, e.g. when more threads only add contention.
+    """
+
+    def __init__(self, name: str, initial: int = 1, min_limit: int = 1, max_limit: int = 8,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, smoothing: float = 0.2,
+                 cooldown: float = 1.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.latency: Optional[float] = None   # EWMA of call latency
+        self.baseline: Optional[float] = None  # best EWMA seen, slowly forgotten
+        self._last_decrease = 0.0
+
+        self.calls = 0
+        self.throttles = 0
+        self.wait_seconds = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold one unit of concurrency for the duration of a call."""
+        start = time.perf_counter()
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self.wait_seconds += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
+
+    def on_success(self, latency: float):
+        with self._cond:
+            self.calls += 1
+            self.latency = latency if self.latency is None else (
+                self.smoothing * latency + (1 - self.smoothing) * self.latency
+            )
+            # Let the baseline drift up slowly so a permanently slower backend is re-learned
+            self.baseline = self.latency if self.baseline is None else min(self.latency, self.baseline * 1.01)
+
+            if self.latency > self.baseline * self.latency_tolerance:
+                self._decrease(0.9)
+            elif self.in_flight >= int(self.limit):
+                previous = int(self.limit)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                if int(self.limit) > previous:
+                    self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            self.throttles += 1
+            self._decrease(self.backoff)
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "throttles": self.throttles,
+                "latency_ms": self.latency * 1e3 if self.latency is not None else None,
+                "baseline_ms": self.baseline * 1e3 if self.baseline is not None else None,
+                "wait_seconds": self.wait_seconds
+            }
+
+
+class ConcurrencyController:
+    """
+    Per-stage adaptive concurrency and retries for block processing.
+
+    Each stage (download, decode, store, db) gets its own AIMDLimiter, so e.g. GCS
+    downloads can run many-wide while CPU-bound decoding settles near one. Calls
+    that fail with retryable errors are retried with jittered exponential backoff,
+    sleeping outside the stage's slot.
+    """
+
+    STAGES = ("download", "decode", "store", "db")
+
+    def __init__(self, max_workers: int = 8, stages: Iterable[str] = STAGES,
+                 max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize concurrency controller.
+
+        Args:
+            max_workers: Upper bound for every stage's limit
+            stages: Stage names to create limiters for
+            max_attempts: Attempts per call before the last error is raised
+            base_delay: First retry delay ceiling in seconds
+            max_delay: Retry delay cap in seconds
+        """
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiters = {stage: AIMDLimiter(stage, max_limit=max_workers) for stage in stages}
+        self.retries = 0
+        self.logger = setup_logger(__name__)
+
+    def call(self, stage: str, fn: Callable, *args, **kwargs):
+        """Run fn under the stage's limit, retrying retryable errors."""
+        limiter = self.limiters[stage]
+        attempt = 0
+        while True:
+            try:
+                with limiter.slot():
+                    start = time.perf_counter()
+                    result = fn(*args, **kwargs)
+                    limiter.on_success(time.perf_counter() - start)
+                return result
+            except Exception as e:
+                if is_throttle_error(e):
+                    limiter.on_throttle()
+                attempt += 1
+                if attempt >= self.max_attempts or not is_retryable_error(e):
+                    raise
+                delay = backoff_delay(attempt - 1, self.base_delay, self.max_delay)
+                self.retries += 1
+                self.logger.warning(
+                    f"{stage} failed ({type(e).__name__}: {e}), retry {attempt}/{self.max_attempts - 1} "
+                    f"in {delay:.2f}s, limit now {int(limiter.limit)}"
+                )
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "retries": self.retries,
+            "stages": {stage: limiter.stats() for stage, limiter in self.limiters.items()}
+        }
@@ -1,11 +1,18 @@
 from ..env import env
 from ..contracts.registry import ContractRegistry
 from ..contracts.manager import ContractManager
+from ..contracts.watcher import RegistryWatcher
 from ..storage.base import GCSBaseHandler
 from .validator import BlockValidator
 from ..database.operations.manager import DatabaseManager
 from ..database.operations.session import ConnectionManager
+from ..database.operations.leases import ShardLeaseManager
+from ..database.operations.partitions import BlockPartitionManager
+from ..database.operations.rollups import RollupManager
+from ..database.operations.failures import BlockFailureManager
 from ..storage.local import LocalBlockHandler
+from ..storage.block_index import BlockIndex
+from .ownership import OwnershipTracker
 
 class ComponentFactory:
     @classmethod
@@ -64,4 +71,98 @@ class ComponentFactory:
         validator = BlockValidator()
         env.register_component('block_validator', validator)
         return validator
-    
\ No newline at end of file
+    
+    @classmethod
+    def get_shard_lease_manager(cls):
+        lease_manager = env.get_component('shard_lease_manager')
+        if lease_manager:
+            return lease_manager
+        
+        conn_manager = ConnectionManager(env.get_db_url())
+        lease_manager = ShardLeaseManager(conn_manager, max_attempts=env.get_backfill_max_attempts())
+        env.register_component('shard_lease_manager', lease_manager)
+        return lease_manager
+
+    @classmethod
+    def get_block_partition_manager(cls):
+        partition_manager = env.get_component('block_partition_manager')
+        if partition_manager:
+            return partition_manager
+        
+        conn_manager = ConnectionManager(env.get_db_url())
+        partition_manager = BlockPartitionManager(conn_manager, partition_size=env.get_db_partition_size())
+        env.register_component('block_partition_manager', partition_manager)
+        return partition_manager
+
+    @classmethod
+    def get_rollup_manager(cls):
+        rollup_manager = env.get_component('rollup_manager')
+        if rollup_manager:
+            return rollup_manager
+
+        # Same connection manager as the status tracker, so rollups join its unit_of_work
+        rollup_manager = RollupManager(cls.get_database_manager().db)
+        env.register_component('rollup_manager', rollup_manager)
+        return rollup_manager
+
+    @classmethod
+    def get_failure_manager(cls):
+        failure_manager = env.get_component('failure_manager')
+        if failure_manager:
+            return failure_manager
+
+        # Same connection manager as the status tracker, so failures join its unit_of_work
+        failure_manager = BlockFailureManager(cls.get_database_manager().db)
+        env.register_component('failure_manager', failure_manager)
+        return failure_manager
+
+    @classmethod
+    def get_ownership_tracker(cls, storage=None):
+        tracker = env.get_component('ownership_tracker')
+        if tracker:
+            return tracker
+
+        tracker = OwnershipTracker(
+            storage or cls.get_gcs_handler(),
+            prefix=env.get_ownership_prefix(),
+            undo_depth=env.get_follower_reorg_depth(),
+            balance_tokens=env.get_ownership_balance_tokens(),
+            keep_checkpoints=env.get_ownership_keep_checkpoints()
+        )
+        env.register_component('ownership_tracker', tracker)
+        return tracker
+
+    @classmethod
+    def get_block_index(cls):
+        block_index = env.get_component('block_index')
+        if block_index:
+            return block_index
+        
+        block_index = BlockIndex(cls.get_gcs_handler())
+        env.register_component('block_index', block_index)
+        return block_index
+
+    @classmethod
+    def get_registry_watcher(cls):
+        watcher = env.get_component('registry_watcher')
+        if watcher:
+            return watcher
+
+        prefix = env.get_registry_gcs_prefix()
+        if prefix:
+            # Nothing loaded from the bucket yet: the first check() loads it
+            watcher = RegistryWatcher(storage=cls.get_gcs_handler(), prefix=prefix,
+                                      interval=env.get_registry_reload_seconds())
+        else:
+            watcher = RegistryWatcher(env.get_path('config_dir') / 'contracts.json',
+                                      env.get_path('config_dir') / 'abis',
+                                      interval=env.get_registry_reload_seconds(),
+                                      registry=cls.get_contract_registry())
+
+        def register(registry):
+            env.register_component('contract_registry', registry)
+            env.register_component('contract_manager', None)  # rebuilt from the new registry on next use
+
+        watcher.subscribe(register)
+        env.register_component('registry_watcher', watcher)
+        return watcher
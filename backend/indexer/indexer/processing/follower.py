@@ -0,0 +1,274 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+import msgspec
+
+from ..env import env
+from ..rpc.client import RpcClient, to_filtered_block
+from ..database.models.status import ProcessingStatus
+from ..database.operations.manager import DatabaseManager
+from ..utils.logging import setup_logger
+from .processor import BlockProcessor
+from .ownership import OwnershipTracker
+
+
+class TipFollower:
+    """
+    Follows the chain tip over JSON-RPC and decodes new blocks as they appear.
+
+    Blocks and receipts are fetched in JSON-RPC batches and handed to the block
+    processor in memory, skipping the GCS round trip of the stream pipeline. The
+    hash and parent hash of every ingested block are kept (in memory for the last
+    reorg_depth blocks, and in chain_headers across restarts); when a new block's
+    parent hash doesn't match, the follower walks back to the fork point, marks the
+    orphaned blocks PENDING for redecode, removes their rollup contributions and
+    contract usage, and re-ingests the canonical ones.
+    """
+
+    def __init__(self, processor: BlockProcessor, client: Optional[RpcClient] = None,
+                 status_tracker: Optional[DatabaseManager] = None,
+                 poll_seconds: Optional[float] = None, batch_blocks: Optional[int] = None,
+                 reorg_depth: Optional[int] = None, confirmations: Optional[int] = None,
+                 archive_raw: bool = False, ownership: Optional[OwnershipTracker] = None):
+        """
+        Initialize tip follower.
+
+        Args:
+            processor: Block processor that validates, decodes and stores blocks
+            client: RPC client (default: one for env AVAX_RPC)
+            status_tracker: Status and header storage (default: the processor's)
+            poll_seconds: Sleep between polls when caught up (default: env FOLLOWER_POLL_SECONDS)
+            batch_blocks: Max blocks fetched per poll (default: env FOLLOWER_BATCH_BLOCKS)
+            reorg_depth: Block hashes kept for reorg detection (default: env FOLLOWER_REORG_DEPTH)
+            confirmations: Blocks to stay behind the tip (default: env FOLLOWER_CONFIRMATIONS)
+            archive_raw: Also write raw blocks to GCS in the QuickNode layout
+            ownership: NFT ownership state fed with every ingested block, rolled back on reorgs;
+                a block that fails is retried on the next poll instead of skipped, and
+                the follower stops once it's quarantined
+        """
+        self.processor = processor
+        self.client = client or RpcClient()
+        self.status_tracker = status_tracker or processor.status_tracker
+        self.handler = processor.handler
+        self.poll_seconds = poll_seconds if poll_seconds is not None else env.get_follower_poll_seconds()
+        self.batch_blocks = batch_blocks or env.get_follower_batch_blocks()
+        self.reorg_depth = reorg_depth or env.get_follower_reorg_depth()
+        self.confirmations = confirmations if confirmations is not None else env.get_follower_confirmations()
+        self.archive_raw = archive_raw
+        self.ownership = ownership
+        self.logger = setup_logger(__name__)
+        if ownership is not None:
+            processor.subscribe(ownership.apply_block)
+            ownership.fill_gaps_from(self.handler, self.status_tracker)
+
+        # block_number -> (block_hash, parent_hash), ascending
+        self.headers: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self.next_block: Optional[int] = None
+        self._redecode = set()
+        self._stop = threading.Event()
+
+        self.stats = {
+            "blocks": 0,
+            "empty_blocks": 0,
+            "failed_blocks": 0,
+            "reorgs": 0,
+            "orphaned_blocks": 0,
+            "max_reorg_depth": 0,
+            "lag_blocks": 0
+        }
+
+    def stop(self):
+        """Finish the current poll and exit run()."""
+        self._stop.set()
+
+    def raw_path(self, block_number: int) -> str:
+        return f"{self.handler.raw_prefix}{self.handler.build_path_from_block(block_number)}"
+
+    def start_from(self, block_number: Optional[int] = None):
+        """
+        Set the first block to ingest and load known headers.
+
+        Args:
+            block_number: First block (default: after the last recorded header, else the tip)
+        """
+        for number, block_hash, parent_hash in self.status_tracker.get_recent_headers(self.reorg_depth):
+            self.headers[number] = (block_hash, parent_hash)
+
+        if block_number is not None:
+            # Headers at or above the start would be re-ingested anyway
+            for number in [n for n in self.headers if n >= block_number]:
+                del self.headers[number]
+            self.next_block = block_number
+        elif self.headers:
+            self.next_block = next(reversed(self.headers)) + 1
+        else:
+            self.next_block = self.client.block_number() - self.confirmations
+
+        if self.ownership is not None:
+            self.ownership.restore_latest(max_block=self.next_block - 1)
+            self._sync_ownership(self.next_block - 1)
+
+        self.logger.info(f"Following from block {self.next_block} ({len(self.headers)} known headers)")
+
+    def _sync_ownership(self, block_number: int):
+        """Bring the ownership state to block_number: roll back or restore a checkpoint, then replay stored blocks."""
+        tracker = self.ownership
+        if tracker.block_number > block_number and not tracker.rollback(block_number):
+            self.logger.warning(f"Ownership undo log doesn't reach block {block_number}, restoring a checkpoint")
+            tracker.restore_latest(max_block=block_number)
+        if tracker.block_number < block_number:
+            paths = self.status_tracker.get_block_paths_by_status(
+                ProcessingStatus.VALID, tracker.block_number + 1, block_number
+            )
+            if paths:
+                self.logger.info(f"Replaying {len(paths)} decoded blocks into the ownership state")
+                tracker.replay(self.handler, [self.handler.extract_block_number(path) for path in paths])
+
+    def run(self, max_blocks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Poll and ingest until stop() is called.
+
+        Args:
+            max_blocks: Optional number of blocks after which to stop
+
+        Returns:
+            Follower statistics
+        """
+        if self.next_block is None:
+            self.start_from()
+        started = datetime.now()
+
+        while not self._stop.is_set():
+            if max_blocks is not None and self.stats["blocks"] >= max_blocks:
+                break
+            try:
+                ingested = self.poll_once()
+            except Exception as e:
+                self.logger.error(f"Poll failed: {type(e).__name__}: {e}")
+                ingested = 0
+            if not ingested:
+                self._stop.wait(self.poll_seconds)
+
+        self.processor.flush_index()
+        result = {**self.stats, "next_block": self.next_block, "rpc": self.client.stats()}
+        if self.ownership is not None:
+            self.ownership.checkpoint()
+            result["ownership"] = self.ownership.stats()
+        return {**result,
+                "started_at": started.isoformat(), "finished_at": datetime.now().isoformat()}
+
+    def poll_once(self) -> int:
+        """
+        Fetch and ingest the next batch of blocks up to the (confirmed) tip.
+
+        Returns:
+            Number of blocks ingested (0 when caught up or after handling a reorg)
+        """
+        tip = self.client.block_number() - self.confirmations
+        self.stats["lag_blocks"] = max(0, tip - self.next_block + 1)
+        if tip < self.next_block:
+            return 0
+
+        numbers = list(range(self.next_block, min(tip, self.next_block + self.batch_blocks - 1) + 1))
+        ingested = 0
+        for number, (block, receipts) in zip(numbers, self.client.get_blocks_with_receipts(numbers)):
+            if block is None:
+                break  # load-balanced node that hasn't seen this block yet
+
+            parent = self.headers.get(number - 1)
+            if parent is not None and block["parentHash"] != parent[0]:
+                self._handle_reorg(number - 1)
+                break
+
+            if not self._ingest(number, block, receipts):
+                break
+            ingested += 1
+        return ingested
+
+    def _ingest(self, number: int, block: Dict[str, Any], receipts: list) -> bool:
+        """Process and record one block; False if it failed and must be retried before moving on."""
+        path = self.raw_path(number)
+        if block["transactions"]:
+            payload = msgspec.json.encode(to_filtered_block(block, receipts))
+            # Tip blocks are new (or re-ingested after a reorg): skip the decoded-exists lookup
+            success, result_info = self.processor.process_block_data(payload, path, force=True)
+            if not success:
+                self.stats["failed_blocks"] += 1
+                self.logger.warning(f"Block {number} failed: {result_info.get('errors')}")
+                if self.ownership is not None:
+                    # Moving on would leave the block's transfers out of the ownership state
+                    if result_info.get("failure", {}).get("quarantined"):
+                        self.logger.error(f"Block {number} is quarantined; stopping so the ownership state "
+                                          f"doesn't skip it (release it and restart)")
+                        self.stop()
+                    return False
+            if self.archive_raw:
+                self.processor.gcs_handler.upload_blob_from_string(payload, path, content_type="application/json")
+        else:
+            # The stream only delivers blocks with matching transactions; nothing to decode here
+            self.stats["empty_blocks"] += 1
+            if number in self._redecode:
+                # The orphaned block had transactions, its canonical replacement has none
+                # (its rollups and contract usage went with the reorg)
+                self.handler.delete_decoded_block(number)
+                self.status_tracker.record_block(number, path, status=ProcessingStatus.VALID)
+
+        self.status_tracker.record_header(number, block["hash"], block["parentHash"])
+        self.headers[number] = (block["hash"], block["parentHash"])
+        while len(self.headers) > self.reorg_depth:
+            self.headers.popitem(last=False)
+        self._redecode.discard(number)
+        self.next_block = number + 1
+        self.stats["blocks"] += 1
+
+        if number % self.reorg_depth == 0:
+            self.status_tracker.prune_headers(number - self.reorg_depth)
+            self.processor.flush_index()
+        if self.ownership is not None and number % env.get_ownership_checkpoint_blocks() == 0:
+            self.ownership.checkpoint()
+        return True
+
+    def _find_fork_point(self, from_block: int) -> int:
+        """Highest known block whose hash is still canonical."""
+        known = [n for n in self.headers if n <= from_block]
+        canonical = self.client.get_headers(known)
+        for number, header in zip(reversed(known), reversed(canonical)):
+            if header is not None and header["hash"] == self.headers[number][0]:
+                return number
+
+        # Deeper than the window: redo everything we still know about
+        fork = known[0] - 1 if known else from_block
+        self.logger.error(f"Reorg deeper than {self.reorg_depth} blocks, rewinding to block {fork}")
+        return fork
+
+    def _handle_reorg(self, from_block: int):
+        fork = self._find_fork_point(from_block)
+        orphaned = [n for n in self.headers if n > fork]
+        depth = len(orphaned)
+
+        self.logger.warning(
+            f"Reorg at block {from_block + 1}: {depth} orphaned blocks after fork point {fork}, redecoding"
+        )
+        reason = f"reorg: replaced after fork at block {fork}"
+        with self.status_tracker.unit_of_work(write=True):
+            self.status_tracker.mark_for_redecode(orphaned, reason)
+            # Until their replacements are decoded, the orphaned blocks count nowhere
+            self.status_tracker.delete_contract_usage(orphaned)
+            if self.processor.rollups is not None:
+                self.processor.rollups.remove_blocks(orphaned)
+            self.status_tracker.delete_headers_from(fork + 1)
+        if self.processor.block_index is not None:
+            self.processor.block_index.discard(orphaned)
+
+        for number in orphaned:
+            del self.headers[number]
+        if self.ownership is not None:
+            self._sync_ownership(fork)
+        self._redecode.update(orphaned)
+        self.next_block = fork + 1
+
+        self.stats["reorgs"] += 1
+        self.stats["orphaned_blocks"] += depth
+        self.stats["max_reorg_depth"] = max(self.stats["max_reorg_depth"], depth)
@@ -0,0 +1,168 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List, Optional
+
+import msgspec
+
+from ..env import env
+from ..rpc.client import RpcClient, to_filtered_block
+from ..storage.base import GCSBaseHandler
+from ..storage.handler import BlockHandler
+from ..database.operations.manager import DatabaseManager
+from ..utils.logging import setup_logger
+from .concurrency import ConcurrencyController
+from .validator import BlockValidator
+
+
+class GapFiller:
+    """
+    Fetches raw blocks that are missing from GCS over JSON-RPC.
+
+    Gaps come from gcs_objects (run a sync first). Missing blocks are fetched in
+    chunks of blocks_per_request, each chunk one batched HTTP POST of
+    eth_getBlockByNumber + eth_getBlockReceipts pairs over the client's keep-alive
+    pool. Up to max_workers chunks are in flight; the concurrency controller narrows
+    that when the endpoint throttles. Blocks are written in the QuickNode layout
+    under the raw prefix and recorded in gcs_objects, so the regular pipeline picks
+    them up. Blocks without transactions are not written, matching the stream, and
+    blocks that fail schema validation are counted as failed instead of written (the
+    pipeline would reject them, and a recorded object would hide the gap).
+    """
+
+    def __init__(self, gcs_handler: GCSBaseHandler, handler: BlockHandler, status_tracker: DatabaseManager,
+                 client: Optional[RpcClient] = None, max_workers: Optional[int] = None,
+                 blocks_per_request: Optional[int] = None,
+                 controller: Optional[ConcurrencyController] = None,
+                 validator: Optional[BlockValidator] = None):
+        """
+        Initialize gap filler.
+
+        Args:
+            gcs_handler: Storage the raw blocks are written to
+            handler: Block handler providing the raw prefix and path layout
+            status_tracker: gcs_objects access
+            client: RPC client (default: one for env AVAX_RPC, pooled for max_workers)
+            max_workers: Concurrent RPC requests (default: env RPC_MAX_CONCURRENCY)
+            blocks_per_request: Blocks per HTTP POST (default: half of RPC_BATCH_SIZE,
+                                two calls per block)
+            controller: Concurrency controller (default: one with rpc/upload/db stages)
+            validator: Schema check run on each block before it is written
+        """
+        self.gcs_handler = gcs_handler
+        self.handler = handler
+        self.status_tracker = status_tracker
+        self.max_workers = max_workers or env.get_rpc_max_concurrency()
+        self.client = client or RpcClient(pool_size=self.max_workers)
+        self.blocks_per_request = blocks_per_request or max(1, self.client.max_batch // 2)
+        self.controller = controller or ConcurrencyController(
+            self.max_workers, stages=("rpc", "upload", "db")
+        )
+        self.validator = validator or BlockValidator()
+        self.logger = setup_logger(__name__)
+
+    def raw_path(self, block_number: int) -> str:
+        return f"{self.handler.raw_prefix}{self.handler.build_path_from_block(block_number)}"
+
+    def find_gaps(self, min_block: int, max_block: int) -> List[int]:
+        """Raw blocks in [min_block, max_block] that gcs_objects doesn't know about."""
+        return self.status_tracker.find_missing_blocks(min_block, max_block, file_type='raw')
+
+    def fill(self, block_numbers: List[int], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Fetch and write the given blocks.
+
+        Args:
+            block_numbers: Blocks to fetch, usually from find_gaps()
+            dry_run: Fetch but don't write or record anything
+
+        Returns:
+            Dictionary of statistics
+        """
+        stats = {
+            "requested": len(block_numbers),
+            "written": 0,
+            "empty": 0,
+            "unavailable": 0,
+            "failed": 0,
+            "bytes": 0,
+            "failed_blocks": [],
+            "started_at": datetime.now().isoformat()
+        }
+        chunks = [
+            block_numbers[i:i + self.blocks_per_request]
+            for i in range(0, len(block_numbers), self.blocks_per_request)
+        ]
+
+        done = 0
+        for index, chunk_stats in enumerate(self._run_chunks(chunks, dry_run), 1):
+            for key in ("written", "empty", "unavailable", "failed", "bytes"):
+                stats[key] += chunk_stats[key]
+            stats["failed_blocks"].extend(chunk_stats["failed_blocks"])
+            done += len(chunk_stats["blocks"])
+            if index % 20 == 0:
+                self.logger.info(f"Gap fill progress: {done}/{len(block_numbers)} blocks")
+
+        stats["finished_at"] = datetime.now().isoformat()
+        stats["rpc"] = self.client.stats()
+        stats["concurrency"] = self.controller.stats()
+        return stats
+
+    def _run_chunks(self, chunks: List[List[int]], dry_run: bool):
+        """Yield per-chunk results with at most max_workers * 2 chunks submitted at once."""
+        if self.max_workers <= 1:
+            for chunk in chunks:
+                yield self._fill_chunk(chunk, dry_run)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gap") as executor:
+            remaining = iter(chunks)
+            pending = deque(
+                executor.submit(self._fill_chunk, chunk, dry_run)
+                for chunk in islice(remaining, self.max_workers * 2)
+            )
+            while pending:
+                chunk_stats = pending.popleft().result()
+                next_chunk = next(remaining, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(self._fill_chunk, next_chunk, dry_run))
+                yield chunk_stats
+
+    def _fill_chunk(self, chunk: List[int], dry_run: bool) -> Dict[str, Any]:
+        chunk_stats = {"blocks": chunk, "written": 0, "empty": 0, "unavailable": 0, "failed": 0,
+                       "bytes": 0, "failed_blocks": []}
+        try:
+            fetched = self.controller.call("rpc", self.client.get_blocks_with_receipts, chunk)
+        except Exception as e:
+            self.logger.error(f"Fetching blocks {chunk[0]}-{chunk[-1]} failed: {type(e).__name__}: {e}")
+            chunk_stats["failed"] = len(chunk)
+            chunk_stats["failed_blocks"] = list(chunk)
+            return chunk_stats
+
+        for number, (block, receipts) in zip(chunk, fetched):
+            if block is None:
+                chunk_stats["unavailable"] += 1
+                continue
+            if not block["transactions"]:
+                chunk_stats["empty"] += 1
+                continue
+
+            path = self.raw_path(number)
+            try:
+                payload = msgspec.json.encode(to_filtered_block(block, receipts))
+                is_valid, error, _ = self.validator.validate_block_data(payload)
+                if not is_valid:
+                    raise ValueError(f"block fails the raw block schema: {error}")
+                if not dry_run:
+                    self.controller.call("upload", self.gcs_handler.upload_blob_from_string,
+                                         payload, path, content_type="application/json")
+                    self.controller.call("db", self.status_tracker.record_gcs_object,
+                                         path, number, 'raw', len(payload))
+                chunk_stats["written"] += 1
+                chunk_stats["bytes"] += len(payload)
+            except Exception as e:
+                self.logger.error(f"Writing block {number} failed: {type(e).__name__}: {e}")
+                chunk_stats["failed"] += 1
+                chunk_stats["failed_blocks"].append(number)
+        return chunk_stats
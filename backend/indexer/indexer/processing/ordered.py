@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from ..env import env
+from ..utils.logging import setup_logger
+
+
+_SKIPPED = object()
+
+
+class OrderedCommitter:
+    """
+    Reorder buffer between parallel block processing and stateful sinks.
+
+    Workers submit decoded blocks in completion order; sinks (e.g.
+    OwnershipTracker.apply_block) are called with (block_number, decoded_block) in
+    block order, one block at a time. The watermark is the last block released; a
+    block is released once every expected block below it has been submitted or
+    skipped. skip() is only for blocks known to have no decoded output; a block that
+    failed is reported with fail(), which stops the watermark before it for good, so
+    the sinks stay at the last contiguous block instead of missing one.
+
+    Expected blocks are either every block after start_after, or, once expect() has
+    been called, only the listed ones (for runs over a sparse set of blocks). Once
+    window blocks wait in the buffer, a producer submitting further ahead waits
+    until the watermark moves. The next block and skips are never held back, so
+    producers that hand out blocks in ascending order can't deadlock.
+    """
+
+    def __init__(self, start_after: int = -1, window: Optional[int] = None):
+        """
+        Initialize ordered committer.
+
+        Args:
+            start_after: Watermark to start from; blocks at or below it are dropped
+            window: Blocks buffered ahead of the watermark (default: env ORDERED_COMMIT_WINDOW)
+        """
+        self.window = max(1, window or env.get_ordered_commit_window())
+        self.logger = setup_logger(__name__)
+
+        self.watermark = start_after
+        self.halted_at: Optional[int] = None  # first failed block; nothing from it on is released
+        self._next: Optional[int] = start_after + 1
+        self._planned: Optional[Set[int]] = None  # None: every block is expected
+        self._plan: Deque[int] = deque()
+        self._buffer: Dict[int, Any] = {}
+        self._sinks: List[Callable[[int, Any], None]] = []
+        self._cond = threading.Condition()
+        self._release_lock = threading.Lock()  # sinks see one block at a time
+
+        self.released = 0
+        self.skipped = 0
+        self.failed = 0
+        self.dropped = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_buffered = 0
+        self.sink_errors = 0
+
+    def subscribe(self, sink: Callable[[int, Any], None]) -> None:
+        """Call sink(block_number, decoded_block) for every released block, in block order."""
+        self._sinks.append(sink)
+
+    def expect(self, block_numbers: Iterable[int]) -> int:
+        """
+        Release only these blocks, in ascending order (can be called again to extend the plan).
+
+        Returns:
+            Number of blocks added to the plan
+        """
+        with self._cond:
+            if self._planned is None:
+                self._planned = set()
+                self._next = None
+            if self._plan:
+                last = self._plan[-1]
+            else:
+                last = self.watermark if self._next is None else self._next
+            added = sorted(n for n in set(block_numbers) if n > last)
+            self._planned.update(added)
+            self._plan.extend(added)
+            if self._next is None and self._plan:
+                self._next = self._plan.popleft()
+            self._cond.notify_all()
+        self._drain()
+        return len(added)
+
+    def submit(self, block_number: int, block: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Add a processed block, waiting while the buffer is full and it isn't the next block.
+
+        Args:
+            block_number: Block number
+            block: Decoded block handed to the sinks
+            timeout: Longest wait for buffer space (None: no limit)
+
+        Returns:
+            False if the block isn't expected (at or below the watermark, already
+            buffered, outside the plan, or after a failed block)
+
+        Raises:
+            TimeoutError: The buffer stayed full for timeout seconds
+        """
+        with self._cond:
+            if not self._expected(block_number):
+                self.dropped += 1
+                return False
+            if len(self._buffer) >= self.window and block_number != self._next:
+                self.waits += 1
+                started = time.monotonic()
+                deadline = None if timeout is None else started + timeout
+                while (len(self._buffer) >= self.window and block_number != self._next
+                       and self._expected(block_number)):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"Block {block_number} waited {timeout}s for the watermark "
+                                           f"to pass block {self._next}")
+                    self._cond.wait(remaining)
+                self.wait_seconds += time.monotonic() - started
+                if not self._expected(block_number):
+                    self.dropped += 1
+                    return False
+            self._buffer[block_number] = block
+            self.max_buffered = max(self.max_buffered, len(self._buffer))
+        self._drain()
+        return True
+
+    def skip(self, block_number: int) -> bool:
+        """
+        Let the watermark pass a block that has no decoded output (nothing for the sinks).
+
+        Does nothing if the block was already submitted or released.
+        """
+        with self._cond:
+            if not self._expected(block_number):
+                return False
+            self._buffer[block_number] = _SKIPPED
+        self._drain()
+        return True
+
+    def fail(self, block_number: int) -> bool:
+        """
+        Stop the watermark before a block that failed: it and every later block are
+        dropped, so the sinks end at the last block before it.
+
+        Does nothing if the block was already submitted or released.
+        """
+        with self._cond:
+            if not self._expected(block_number):
+                return False
+            self.failed += 1
+            self.halted_at = block_number
+            for number in [n for n in self._buffer if n > block_number]:
+                del self._buffer[number]
+                self.dropped += 1
+            self._cond.notify_all()
+        self.logger.error(f"Block {block_number} failed; ordered sinks stop before it")
+        return True
+
+    def expects(self, block_number: int) -> bool:
+        """Whether the block is still to be submitted or skipped."""
+        with self._cond:
+            return self._expected(block_number)
+
+    def _expected(self, block_number: int) -> bool:
+        if block_number <= self.watermark or block_number in self._buffer:
+            return False
+        if self.halted_at is not None and block_number >= self.halted_at:
+            return False
+        return self._planned is None or block_number in self._planned
+
+    def _pop_next(self):
+        """Next releasable (block_number, block), or None."""
+        with self._cond:
+            if self._next is None or self._next not in self._buffer:
+                return None
+            block_number = self._next
+            block = self._buffer.pop(block_number)
+            self.watermark = block_number
+            if self._planned is None:
+                self._next = block_number + 1
+            else:
+                self._planned.discard(block_number)
+                self._next = self._plan.popleft() if self._plan else None
+            self._cond.notify_all()
+            return block_number, block
+
+    def _drain(self):
+        with self._release_lock:
+            while (item := self._pop_next()) is not None:
+                block_number, block = item
+                if block is _SKIPPED:
+                    self.skipped += 1
+                    if self._sinks:
+                        self.logger.warning(f"Block {block_number} skipped; ordered sinks won't see it")
+                    continue
+                for sink in self._sinks:
+                    try:
+                        sink(block_number, block)
+                    except Exception as e:
+                        self.sink_errors += 1
+                        self.logger.error(f"Ordered sink {sink} failed on block {block_number}: "
+                                          f"{type(e).__name__}: {e}")
+                self.released += 1
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def next_block(self) -> Optional[int]:
+        """Block the watermark is waiting for (None when a plan is exhausted)."""
+        return self._next
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watermark": self.watermark,
+            "next_block": self._next,
+            "halted_at": self.halted_at,
+            "buffered": len(self._buffer),
+            "max_buffered": self.max_buffered,
+            "window": self.window,
+            "released": self.released,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "sink_errors": self.sink_errors
+        }
@@ -0,0 +1,388 @@
+import gzip
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import msgspec
+
+from ..database.models.status import ProcessingStatus
+from ..decoders.events import ZERO_ADDRESS, block_events
+from ..model.block import Block
+from ..model.compact import CompactBlock
+from ..utils.logging import setup_logger
+
+
+CHECKPOINT_SUFFIX = ".msgpack.gz"
+
+_ABSENT = object()
+
+
+class OwnershipSnapshot(msgspec.Struct, array_like=True):
+    """
+    State of an OwnershipTracker after block_number.
+
+    Token ids and balances are decimal strings: uint256 values don't fit msgpack ints.
+    """
+    block_number: int
+    owners: Dict[str, Dict[str, str]]    # collection -> token id -> owner
+    balances: Dict[str, Dict[str, str]]  # ERC-20 token -> holder -> balance
+
+
+_snapshot_encoder = msgspec.msgpack.Encoder()
+_snapshot_decoder = msgspec.msgpack.Decoder(type=OwnershipSnapshot)
+
+
+def _decoded_logs(block: Any) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(contract, event name, attributes) of the decoded logs of a block, in chain order."""
+    if isinstance(block, CompactBlock):
+        transactions = [tx for _, tx in block.iter_transactions() if tx is not None]
+    elif isinstance(block, Block):
+        transactions = list((block.transactions or {}).values())
+    else:
+        transactions = list((block.get("transactions") or {}).values())
+
+    for tx in sorted(transactions, key=lambda tx: tx["index"] if isinstance(tx, dict) else tx.index):
+        logs = tx["logs"] if isinstance(tx, dict) else tx.logs
+        for log in sorted(logs.values(), key=lambda log: log["index"] if isinstance(log, dict) else log.index):
+            if isinstance(log, dict):
+                if log.get("type") == "DecodedLog":
+                    yield log["contract"], log["name"], log["attributes"]
+            elif hasattr(log, "attributes"):
+                yield log.contract, log.name, log.attributes
+
+
+class OwnershipTracker:
+    """
+    Current owner of every NFT, and optionally ERC-20 balances, from decoded blocks.
+
+    Blocks are applied in block order from their TransferEvents (ERC-721 transfers,
+    mints and burns) and, for the tokens in balance_tokens, their ERC-20 Transfer,
+    Deposit and Withdrawal logs. State lives in hash maps keyed by collection and
+    token id, so owner queries are lookups rather than replays. Every applied block
+    keeps an undo list of the entries it overwrote, for the last undo_depth blocks.
+    A reorg inside that window is rolled back with rollback(); deeper ones restore a
+    checkpoint and replay the stored decoded blocks.
+
+    Blocks between two applied blocks are assumed to have no transfers. With
+    fill_gaps_from(), apply_block checks that assumption against the status table
+    and replays any VALID block it skips over first, so a block missed by the caller
+    (e.g. a failed attempt decoded later) isn't lost.
+
+    Checkpoints are gzipped msgpack snapshots in GCS or a local directory, at
+    {prefix}{block_number:012d}.msgpack.gz. The newest keep_checkpoints are kept.
+    Balances only count the transfers applied since tracking began, so start from a
+    token's deployment for absolute values.
+    """
+
+    def __init__(self, storage=None, prefix: str = "state/ownership/", undo_depth: int = 64,
+                 balance_tokens: Optional[Iterable[str]] = None, keep_checkpoints: int = 3):
+        """
+        Initialize ownership tracker.
+
+        Args:
+            storage: GCSBaseHandler or LocalStorageHandler for checkpoints (None: in memory only)
+            prefix: Blob prefix of the checkpoints
+            undo_depth: Applied blocks that can be rolled back without a checkpoint
+            balance_tokens: ERC-20 contracts whose balances are tracked
+            keep_checkpoints: Checkpoints kept when a new one is written
+        """
+        self.storage = storage
+        self.prefix = prefix
+        self.undo_depth = undo_depth
+        self.balance_tokens: Set[str] = {token.lower() for token in balance_tokens or ()}
+        self.keep_checkpoints = keep_checkpoints
+        self.logger = setup_logger(__name__)
+
+        self.block_number = -1  # last applied block
+        self.owners: Dict[str, Dict[int, str]] = {}
+        self.balances: Dict[str, Dict[str, int]] = {}
+        self._undo: Deque[Tuple[int, List[Tuple[Dict, Any, Any]]]] = deque()
+        self._undo_floor = -1  # lowest block the state can be rolled back to
+        self._lock = threading.RLock()
+        self._refreshed_at = 0.0
+        self._block_handler = None
+        self._status_tracker = None
+        self.transfers = 0
+        self.gap_blocks = 0
+
+    # Applying blocks
+
+    def fill_gaps_from(self, handler, status_tracker) -> None:
+        """
+        Replay stored decoded blocks that apply_block would otherwise skip over.
+
+        Args:
+            handler: BlockHandler or LocalBlockHandler holding the decoded blocks
+            status_tracker: DatabaseManager whose VALID blocks have a decoded file
+        """
+        self._block_handler = handler
+        self._status_tracker = status_tracker
+
+    def apply_block(self, block_number: int, block: Any) -> int:
+        """
+        Apply the transfers of the next block.
+
+        Args:
+            block_number: Block number, above every block applied so far
+            block: Decoded Block, CompactBlock or stored JSON block
+
+        Returns:
+            Number of transfers applied (not counting replayed gap blocks)
+        """
+        with self._lock:
+            if block_number <= self.block_number:
+                raise ValueError(f"Block {block_number} is not after the last applied block {self.block_number}; "
+                                 f"roll back first")
+            if self._status_tracker is not None and 0 <= self.block_number < block_number - 1:
+                self._fill_gap(block_number - 1)
+            return self._apply(block_number, block)
+
+    def _fill_gap(self, block_number: int) -> None:
+        paths = self._status_tracker.get_block_paths_by_status(
+            ProcessingStatus.VALID, self.block_number + 1, block_number
+        )
+        if paths:
+            numbers = [self._block_handler.extract_block_number(path) for path in paths]
+            self.logger.warning(f"Blocks {numbers[0]}..{numbers[-1]} were decoded but not applied, "
+                                f"replaying {len(numbers)} before block {block_number + 1}")
+            self.gap_blocks += self.replay(self._block_handler, numbers)
+
+    def _apply(self, block_number: int, block: Any) -> int:
+        with self._lock:
+            changes: List[Tuple[Dict, Any, Any]] = []
+            applied = 0
+            for kind, event in block_events(block):
+                if kind != "TransferEvent":
+                    continue
+                get = dict.get if isinstance(event, dict) else getattr
+                nft_address = get(event, "nft_address").lower()
+                collection = self.owners.get(nft_address)
+                if collection is None:
+                    collection = self.owners[nft_address] = {}
+                nft_id = int(get(event, "nft_id"))
+                to_address = get(event, "to_address").lower()
+                changes.append((collection, nft_id, collection.get(nft_id, _ABSENT)))
+                if to_address == ZERO_ADDRESS:
+                    collection.pop(nft_id, None)  # burned
+                else:
+                    collection[nft_id] = to_address
+                applied += 1
+
+            if self.balance_tokens:
+                for contract, name, attributes in _decoded_logs(block):
+                    if contract.lower() in self.balance_tokens:
+                        applied += self._apply_erc20(contract.lower(), name, attributes, changes)
+
+            self.block_number = block_number
+            self._undo.append((block_number, changes))
+            while len(self._undo) > self.undo_depth:
+                self._undo_floor = self._undo.popleft()[0]
+            self.transfers += applied
+            return applied
+
+    def _apply_erc20(self, token: str, name: str, attributes: Dict[str, Any], changes: List) -> int:
+        values = list(attributes.values())
+        if name == "Transfer" and "tokenId" not in attributes and len(values) == 3:
+            moves = [(str(values[0]).lower(), -int(values[2])), (str(values[1]).lower(), int(values[2]))]
+        elif name == "Deposit" and len(values) == 2:      # WAVAX wrap
+            moves = [(str(values[0]).lower(), int(values[1]))]
+        elif name == "Withdrawal" and len(values) == 2:   # WAVAX unwrap
+            moves = [(str(values[0]).lower(), -int(values[1]))]
+        else:
+            return 0
+
+        balances = self.balances.setdefault(token, {})
+        for holder, amount in moves:
+            if holder == ZERO_ADDRESS or not amount:
+                continue  # mint/burn counterpart
+            previous = balances.get(holder, _ABSENT)
+            changes.append((balances, holder, previous))
+            balance = (0 if previous is _ABSENT else previous) + amount
+            if balance:
+                balances[holder] = balance
+            else:
+                balances.pop(holder, None)
+        return 1
+
+    def rollback(self, block_number: int) -> bool:
+        """
+        Undo every applied block above block_number (e.g. the fork point of a reorg).
+
+        Returns:
+            False, leaving the state untouched, if the undo window doesn't reach back
+            that far: restore a checkpoint at or below block_number and replay instead
+        """
+        with self._lock:
+            if block_number < self._undo_floor:
+                return False
+            while self._undo and self._undo[-1][0] > block_number:
+                _, changes = self._undo.pop()
+                for mapping, key, previous in reversed(changes):
+                    if previous is _ABSENT:
+                        mapping.pop(key, None)
+                    else:
+                        mapping[key] = previous
+            self.block_number = min(self.block_number, block_number)
+            return True
+
+    def replay(self, handler, block_numbers: Iterable[int], workers: int = 8) -> int:
+        """
+        Apply stored decoded blocks in order, downloading them concurrently.
+
+        Args:
+            handler: BlockHandler or LocalBlockHandler holding the decoded blocks
+            block_numbers: Blocks to apply; ones at or below the last applied block are skipped
+
+        Returns:
+            Number of blocks applied
+        """
+        pending = sorted(n for n in block_numbers if n > self.block_number)
+        applied = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for block_number, block in zip(pending, executor.map(handler.get_decoded_block, pending)):
+                if block is None:
+                    self.logger.warning(f"Block {block_number} has no decoded file, skipping")
+                    continue
+                self._apply(block_number, block)
+                applied += 1
+        return applied
+
+    # Queries
+
+    def owner_of(self, nft_address: str, nft_id: int) -> Optional[str]:
+        """Current owner of an NFT (None if unknown or burned)."""
+        return self.owners.get(nft_address.lower(), {}).get(int(nft_id))
+
+    def tokens_of(self, owner: str, nft_address: Optional[str] = None) -> Dict[str, List[int]]:
+        """Token ids held by an address, per collection."""
+        owner = owner.lower()
+        collections = [nft_address.lower()] if nft_address else list(self.owners)
+        with self._lock:
+            held = {}
+            for collection in collections:
+                ids = [nft_id for nft_id, holder in self.owners.get(collection, {}).items() if holder == owner]
+                if ids:
+                    held[collection] = sorted(ids)
+            return held
+
+    def holders(self, nft_address: str) -> Dict[str, int]:
+        """Tokens held per owner in a collection."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for holder in self.owners.get(nft_address.lower(), {}).values():
+                counts[holder] = counts.get(holder, 0) + 1
+            return counts
+
+    def balance_of(self, token: str, holder: str) -> int:
+        return self.balances.get(token.lower(), {}).get(holder.lower(), 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "block_number": self.block_number,
+            "collections": len(self.owners),
+            "nfts": sum(len(collection) for collection in self.owners.values()),
+            "balance_tokens": len(self.balances),
+            "transfers": self.transfers,
+            "gap_blocks": self.gap_blocks,
+            "undo_blocks": len(self._undo)
+        }
+
+    # Snapshots and checkpoints
+
+    def snapshot(self) -> bytes:
+        """Serialized state (gzipped msgpack)."""
+        with self._lock:
+            snapshot = OwnershipSnapshot(
+                block_number=self.block_number,
+                owners={c: {str(i): o for i, o in ids.items()} for c, ids in self.owners.items()},
+                balances={t: {h: str(b) for h, b in held.items()} for t, held in self.balances.items()}
+            )
+        return gzip.compress(_snapshot_encoder.encode(snapshot), compresslevel=6)
+
+    def restore(self, data: bytes) -> None:
+        """Replace the state with a snapshot; the undo log starts empty."""
+        snapshot = _snapshot_decoder.decode(gzip.decompress(data))
+        with self._lock:
+            self.block_number = snapshot.block_number
+            self.owners = {c: {int(i): o for i, o in ids.items()} for c, ids in snapshot.owners.items()}
+            self.balances = {t: {h: int(b) for h, b in held.items()} for t, held in snapshot.balances.items()}
+            self._undo.clear()
+            self._undo_floor = snapshot.block_number
+
+    def list_checkpoints(self) -> List[int]:
+        """Block numbers of the stored checkpoints, ascending."""
+        if self.storage is None:
+            return []
+        numbers = []
+        for blob in self.storage.list_blobs(prefix=self.prefix):
+            name = blob.name[len(self.prefix):]
+            if name.endswith(CHECKPOINT_SUFFIX) and name[:-len(CHECKPOINT_SUFFIX)].isdigit():
+                numbers.append(int(name[:-len(CHECKPOINT_SUFFIX)]))
+        return sorted(numbers)
+
+    def _checkpoint_name(self, block_number: int) -> str:
+        return f"{self.prefix}{block_number:012d}{CHECKPOINT_SUFFIX}"
+
+    def checkpoint(self) -> Optional[int]:
+        """
+        Store a snapshot of the current state and prune old checkpoints.
+
+        Returns:
+            Block number of the checkpoint, or None without storage or applied blocks
+        """
+        if self.storage is None or self.block_number < 0:
+            return None
+        block_number = self.block_number
+        data = self.snapshot()
+        if not self.storage.upload_blob_from_string(data, self._checkpoint_name(block_number),
+                                                    content_type="application/octet-stream"):
+            raise IOError(f"Failed to write ownership checkpoint at block {block_number}")
+        for old in self.list_checkpoints()[:-self.keep_checkpoints]:
+            self.storage.delete_blob(self._checkpoint_name(old))
+        self.logger.info(f"Ownership checkpoint at block {block_number} ({len(data)} bytes)")
+        return block_number
+
+    def refresh(self, interval: float = 60.0) -> bool:
+        """
+        Load the newest checkpoint if it's ahead of the state, checking at most every
+        interval seconds (for readers of checkpoints written by another process).
+        """
+        if time.monotonic() - self._refreshed_at < interval:
+            return False
+        self._refreshed_at = time.monotonic()
+        checkpoints = self.list_checkpoints()
+        if checkpoints and checkpoints[-1] > self.block_number:
+            return self.restore_latest() is not None
+        return False
+
+    def restore_latest(self, max_block: Optional[int] = None) -> Optional[int]:
+        """
+        Restore the newest readable checkpoint, at or below max_block if given.
+
+        Returns:
+            Block number restored, or None if there is none (state is reset)
+        """
+        for block_number in reversed(self.list_checkpoints()):
+            if max_block is not None and block_number > max_block:
+                continue
+            data = self.storage.download_blob_as_bytes(self._checkpoint_name(block_number))
+            try:
+                self.restore(data)
+            except Exception as e:
+                self.logger.warning(f"Skipping unreadable checkpoint at block {block_number}: {type(e).__name__}: {e}")
+                continue
+            self.logger.info(f"Restored ownership state at block {block_number}")
+            return block_number
+
+        self.reset()
+        return None
+
+    def reset(self) -> None:
+        """Forget all state, as before the first block."""
+        with self._lock:
+            self.block_number = -1
+            self.owners, self.balances = {}, {}
+            self._undo.clear()
+            self._undo_floor = -1
@@ -1,14 +1,22 @@
-from typing import Tuple, Optional, Dict, Any, List
+from typing import Tuple, Optional, Dict, Any, List, Callable
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 from .factory import ComponentFactory
+from ..env import env
 from ..storage.base import GCSBaseHandler
 from ..database.models.status import ProcessingStatus
 from ..database.operations.manager import DatabaseManager
+from ..database.operations.rollups import RollupManager
+from ..database.operations.failures import BlockFailureManager
 from .validator import BlockValidator
 from ..storage.handler import BlockHandler 
+from ..storage.block_index import BlockIndexWriter
 from ..decoders.block import BlockDecoder
 from ..utils.logging import setup_logger
+from .profiler import BlockProfiler
+from .concurrency import ConcurrencyController
 
 class BlockProcessor:
     """
@@ -20,7 +28,12 @@ class BlockProcessor:
                  status_tracker: Optional[DatabaseManager] = None,
                  validator: Optional[BlockValidator] = None,
                  decoder: Optional[BlockDecoder] = None,
-                 handler: Optional[BlockHandler] = None):
+                 handler: Optional[BlockHandler] = None,
+                 profiler: Optional[BlockProfiler] = None,
+                 controller: Optional[ConcurrencyController] = None,
+                 block_index: Optional[BlockIndexWriter] = None,
+                 rollups: Optional[RollupManager] = None,
+                 failures: Optional[BlockFailureManager] = None):
 
         self.gcs_handler = gcs_handler or ComponentFactory.get_gcs_handler()
         self.status_tracker = status_tracker or ComponentFactory.get_database_manager()
@@ -33,6 +46,20 @@ class BlockProcessor:
         else:
             self.decoder = decoder
 
+        self.profiler = profiler
+        if profiler is not None:
+            self.decoder.set_profiler(profiler)
+
+        self.controller = controller
+        self.block_index = block_index
+
+        # Shares the status tracker's connection manager to join its unit_of_work
+        if rollups is None and env.get_rollups_enabled():
+            rollups = RollupManager(self.status_tracker.db)
+        self.rollups = rollups
+        self.failures = failures or BlockFailureManager(self.status_tracker.db)
+        self._listeners: List[Callable[[int, Any], None]] = []
+
         self.logger = setup_logger(__name__)        
     
     def _json_serializer(self, obj):
@@ -41,13 +68,125 @@ class BlockProcessor:
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
 
-    def process_block(self, gcs_path: str, force: bool = False) -> Tuple[bool, Dict[str, Any]]:
+    def _stage(self, name: str):
+        """Profiling context for a processing stage (no-op unless profiling)."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name)
+
+    def _call(self, stage: str, fn, *args, **kwargs):
+        """Run a GCS/DB/decode call under the concurrency controller, if any."""
+        if self.controller is None:
+            return fn(*args, **kwargs)
+        return self.controller.call(stage, fn, *args, **kwargs)
+
+    def _mark_valid(self, block_number: int, contract_versions: Dict[str, Optional[str]], decoded_data=None,
+                    clear_failures: bool = True):
+        """
+        Record the contracts and ABI versions a decode used, and its events' rollup
+        deltas, together with its VALID status.
+
+        clear_failures drops the block's dead-letter entry; callers skip it for blocks
+        that can't have one (new or previously VALID).
+        """
+        with self.status_tracker.unit_of_work(write=True):
+            self.status_tracker.record_contract_usage(block_number, contract_versions)
+            if self.rollups is not None and decoded_data is not None:
+                self.rollups.apply_block(block_number, decoded_data)
+            if clear_failures:
+                self.failures.clear([block_number])
+            self.status_tracker.update_status(block_number=block_number, status=ProcessingStatus.VALID)
+
+    def _fail(self, block_number: int, stage: str, error_message: str, result_info: Dict[str, Any],
+              error: Optional[Exception] = None, error_class: Optional[str] = None):
+        """
+        Record a failed attempt in the dead-letter queue and mark the block INVALID, or
+        QUARANTINED once it has failed too often.
+        """
+        cause = getattr(error, "cause", None) or error  # TransactionDecodeError wraps the decoder's error
+        error_class = error_class or type(cause).__name__
+        result_info["errors"].append(error_message)
+        with self.status_tracker.unit_of_work(write=True):
+            failure = self.failures.record(block_number, stage, error_class, error_message,
+                                           contract=getattr(error, "contract", None))
+            self.status_tracker.update_status(
+                block_number=block_number,
+                status=ProcessingStatus.QUARANTINED if failure["quarantined"] else ProcessingStatus.INVALID,
+                error_message=f"{stage}: {error_class}: {error_message}"
+            )
+        result_info["failure"] = {key: failure[key] for key in
+                                  ("stage", "error_class", "contract", "attempts", "quarantined", "next_retry_at")}
+
+    def subscribe(self, listener: Callable[[int, Any], None]) -> None:
+        """
+        Call listener(block_number, decoded_block) after every block marked VALID.
+
+        Listeners run on the processing thread in completion order, which is block
+        order only for sequential callers such as TipFollower; parallel callers put an
+        OrderedCommitter in between (see BatchProcessor.attach_committer).
+        """
+        self._listeners.append(listener)
+
+    def is_quarantined(self, block_number: int) -> bool:
+        """Whether a block failed too often and waits to be released."""
+        record = self.status_tracker.get_block(block_number)
+        return record is not None and record.status == ProcessingStatus.QUARANTINED
+
+    def flush_index(self) -> int:
+        """Write buffered block index postings (call when a run or shard ends)."""
+        if self.block_index is None:
+            return 0
+        return self.block_index.flush()
+
+    def process_block(self, gcs_path: str, force: bool = False,
+                      skip_checked: bool = False) -> Tuple[bool, Dict[str, Any]]:
         """
         Process a block from GCS through validation, decoding, and storage.
         
+        Args:
+            gcs_path: Raw block path
+            force: Reprocess even if decoded or quarantined
+            skip_checked: The caller already checked that the block isn't quarantined or
+                decoded (BatchProcessor does), so those lookups are not repeated
+        
+        Returns:
+            Tuple of (success, result_info)
+        """
+        if self.profiler is None:
+            return self._process_block(gcs_path, force, skip_checked=skip_checked)
+
+        try:
+            block_number = self.handler.extract_block_number(gcs_path)
+        except ValueError:
+            block_number = None
+
+        with self.profiler.profile_block(gcs_path, block_number) as record:
+            success, result_info = self._process_block(gcs_path, force, skip_checked=skip_checked)
+            record.success = success
+        return success, result_info
+
+    def process_block_data(self, block_data: bytes, gcs_path: str,
+                           force: bool = False) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Process a raw block that is already in memory (e.g. fetched from the RPC).
+        
+        Same as process_block without the download; gcs_path is the block's raw path in
+        the QuickNode layout, recorded in the status table and used for its block number.
+        
         Returns:
             Tuple of (success, result_info)
         """
+        if self.profiler is None:
+            return self._process_block(gcs_path, force, block_data)
+
+        with self.profiler.profile_block(gcs_path, self.handler.extract_block_number(gcs_path)) as record:
+            success, result_info = self._process_block(gcs_path, force, block_data)
+            record.success = success
+        return success, result_info
+
+    def _process_block(self, gcs_path: str, force: bool = False,
+                       block_data: Optional[bytes] = None,
+                       skip_checked: bool = False) -> Tuple[bool, Dict[str, Any]]:
         self.logger.info(f"Starting processing of block from path: {gcs_path}")
         result_info = {
             "validation": False,
@@ -56,96 +195,103 @@ class BlockProcessor:
             "errors": []
         }
         
+        stage = "processing"
         try:
             block_number = self.handler.extract_block_number(gcs_path)
             self.logger.info(f"Processing block number: {block_number}")
 
+            # Quarantined blocks wait for an explicit release (or a forced reprocess)
+            with self._stage("skip_check"):
+                quarantined = not (force or skip_checked) and self._call("db", self.is_quarantined, block_number)
+            if quarantined:
+                self.logger.warning(f"Block {block_number} is quarantined, skipping (release it to retry)")
+                return True, {"skipped": True, "reason": "quarantined"}
+
             # Check if decoded block already exists
-            if not force and self.handler.decoded_block_exists(block_number):
+            with self._stage("skip_check"):
+                decoded_exists = not (force or skip_checked) and self.handler.decoded_block_exists(block_number)
+            if decoded_exists:
                 self.logger.info(f"Block {block_number} already decoded, skipping")
                 return True, {"skipped": True, "reason": "already_decoded"}
 
-            self.status_tracker.record_block(
-                block_number=block_number,
-                gcs_path=gcs_path,
-                status=ProcessingStatus.PROCESSING
-            )
+            with self._stage("status"):
+                previous_status = self._call("db", self.status_tracker.start_block, block_number, gcs_path)
+            # Only blocks that failed before (or were released/reset since) have a failure row
+            had_failure = previous_status not in (None, ProcessingStatus.VALID)
             
-            self.logger.debug(f"Downloading block data from GCS: {gcs_path}")
-            block_data = self.gcs_handler.download_blob_as_bytes(gcs_path)
+            stage = "download"
+            if block_data is None:
+                self.logger.debug(f"Downloading block data from GCS: {gcs_path}")
+                with self._stage("download"):
+                    block_data = self._call("download", self.gcs_handler.download_blob_as_bytes, gcs_path)
             if not block_data:
                 error_msg = f"Failed to download block from {gcs_path}"
                 self.logger.error(error_msg)
-                result_info["errors"].append(error_msg)
-                self.status_tracker.update_status(
-                    block_number=block_number,
-                    status=ProcessingStatus.INVALID,
-                    error_message=error_msg
-                )
+                self._fail(block_number, "download", error_msg, result_info, error_class="DownloadError")
                 return False, result_info
 
+            stage = "validation"
             self.logger.debug(f"Validating block structure")
-            is_valid, error, raw_block = self.validator.validate_block_data(block_data)
+            with self._stage("validation"):
+                is_valid, error, raw_block = self.validator.validate_block_data(block_data)
             
             if not is_valid:
                 self.logger.error(f"Block validation failed: {error}")
-                self.status_tracker.update_status(
-                    block_number=block_number,
-                    status=ProcessingStatus.INVALID,
-                    error_message=error
-                )
-                result_info["errors"].append(f"Validation failed: {error}")
+                self._fail(block_number, "validation", f"Validation failed: {error}", result_info,
+                           error_class="ValidationError")
                 return False, result_info
             
             result_info["validation"] = True
             self.logger.info(f"Block {block_number} validation successful")
 
+            registry = self.decoder.registry  # versions recorded below are the ones decoded with
             try:
                 self.logger.debug(f"Decoding block {block_number}")
-                decoded_data = self.decoder.decode_block(raw_block)
-                self.logger.info(f"Block {block_number} decoded successfully with {len(decoded_data.transactions)} transactions")
+                with self._stage("decoding"):
+                    decoded_data = self._call("decode", self.decoder.decode_block, raw_block)
+                self.logger.info(f"Block {block_number} decoded successfully with {decoded_data.transaction_count} transactions")
                 result_info["decoding"] = True
             except Exception as e:
                 error_msg = f"Decoding failed: {str(e)}"
                 self.logger.error(error_msg, exc_info=True)
-                result_info["errors"].append(error_msg)
-                self.status_tracker.update_status(
-                    block_number=block_number,
-                    status=ProcessingStatus.INVALID,
-                    error_message=error_msg
-                )
+                self._fail(block_number, "decoding", error_msg, result_info, error=e)
                 return False, result_info
             
             try:
                 self.logger.debug(f"Storing decoded block {block_number}")
                 
-                if hasattr(self.handler,'store_decoded_block'):
-                    self.handler.store_decoded_block(block_number, decoded_data)
-                else:
-                    store_path = f"{self.handler.decoded_prefix}{block_number}"
-                    self.gcs_handler.upload_blob_from_string(
-                        json.dumps(decoded_data, default=self._json_serializer), 
-                        store_path,
-                        content_type="application/json"
-                    )
+                with self._stage("storage"):
+                    if hasattr(self.handler,'store_decoded_block'):
+                        self._call("store", self.handler.store_decoded_block, block_number, decoded_data)
+                    else:
+                        store_path = f"{self.handler.decoded_prefix}{block_number}"
+                        self.gcs_handler.upload_blob_from_string(
+                            json.dumps(decoded_data, default=self._json_serializer), 
+                            store_path,
+                            content_type="application/json"
+                        )
 
                 self.logger.info(f"Block {block_number} stored successfully")
                 result_info["storage"] = True
             except Exception as e:
                 error_msg = f"Storage failed: {str(e)}"
                 self.logger.error(error_msg, exc_info=True)
-                result_info["errors"].append(error_msg)
-                self.status_tracker.update_status(
-                    block_number=block_number,
-                    status=ProcessingStatus.INVALID,
-                    error_message=error_msg
-                )
+                self._fail(block_number, "storage", error_msg, result_info, error=e)
                 return False, result_info
             
-            self.status_tracker.update_status(
-                block_number=block_number,
-                status=ProcessingStatus.VALID
-            )
+            stage = "status"
+            addresses = self.decoder.contract_addresses(raw_block)
+            with self._stage("status"):
+                self._call("db", self._mark_valid, block_number,
+                           self.decoder.contract_versions(addresses, registry), decoded_data,
+                           clear_failures=had_failure)
+            if self.block_index is not None:
+                self.block_index.add(block_number, addresses, self.decoder.event_topics(raw_block))
+            for listener in self._listeners:
+                try:
+                    listener(block_number, decoded_data)
+                except Exception as e:
+                    self.logger.error(f"Block listener {listener} failed on block {block_number}: {type(e).__name__}: {e}")
             self.logger.info(f"Block {block_number} processing completed successfully")
             
             return True, result_info
@@ -153,14 +299,16 @@ class BlockProcessor:
         except Exception as e:
             error_msg = f"Processing error: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
-            result_info["errors"].append(error_msg)
             
             if 'block_number' in locals():
-                self.status_tracker.update_status(
-                    block_number=block_number,
-                    status=ProcessingStatus.INVALID,
-                    error_message=error_msg
-                )
+                try:
+                    self._fail(block_number, stage, error_msg, result_info, error=e)
+                except Exception as record_error:
+                    # e.g. the database itself is failing; the block stays PROCESSING
+                    self.logger.error(f"Could not record failure of block {block_number}: {record_error}")
+                    result_info["errors"].append(error_msg)
+            else:
+                result_info["errors"].append(error_msg)
             return False, result_info
     
     def reprocess_block(self, block_number: int) -> Tuple[bool, Dict[str, Any]]:
@@ -174,12 +322,17 @@ class BlockProcessor:
         if not block_record:
             return False, {"errors": [f"Block {block_number} not found in records"]}
         
-        return self.process_block(block_record.gcs_path)
+        # Forced: a block that failed after storing its decoded file must not be skipped
+        return self.process_block(block_record.gcs_path, force=True)
     
-    def reprocess_blocks(self, block_numbers: List[int]) -> Dict[str, Any]:
+    def reprocess_blocks(self, block_numbers: List[int], max_workers: int = 1) -> Dict[str, Any]:
         """
         Reprocess multiple blocks by block number.
         
+        Args:
+            block_numbers: Blocks to reprocess
+            max_workers: Blocks reprocessed concurrently
+        
         Returns:
             Dictionary with processing results
         """
@@ -190,9 +343,13 @@ class BlockProcessor:
             "details": []
         }
         
-        for block_number in block_numbers:
-            success, result_info = self.reprocess_block(block_number)
-            
+        if max_workers > 1 and len(block_numbers) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reprocess") as executor:
+                outcomes = list(executor.map(self.reprocess_block, block_numbers))
+        else:
+            outcomes = map(self.reprocess_block, block_numbers)
+        
+        for block_number, (success, result_info) in zip(block_numbers, outcomes):
             if success:
                 results["success"] += 1
             else:
@@ -0,0 +1,330 @@
+import io
+import sys
+import json
+import time
+import heapq
+import pstats
+import cProfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from typing import Optional, Dict, Any, List, Tuple
+
+from ..utils.logging import setup_logger
+
+
+SAMPLER_MODES = ("cprofile", "stack")
+
+# Only one cProfile.Profile can be enabled per process on Python 3.12+ (it hooks
+# sys.monitoring, which is process-wide), so profilers share this lock.
+_CPROFILE_LOCK = threading.Lock()
+
+
+class _StackSampler:
+    """
+    Periodically samples the stack of a single thread and counts collapsed stacks.
+    Cheaper than cProfile since the profiled thread is never instrumented.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+class BlockProfile:
+    """Timings collected for a single block."""
+
+    def __init__(self, gcs_path: str, block_number: Optional[int] = None):
+        self.gcs_path = gcs_path
+        self.block_number = block_number
+        self.success: Optional[bool] = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.sample = None  # pstats text or collapsed stacks, kept for slowest blocks only
+
+    def add_stage(self, name: str, wall: float, cpu: float):
+        stage = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        stage["wall"] += wall
+        stage["cpu"] += cpu
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "gcs_path": self.gcs_path,
+            "block_number": self.block_number,
+            "success": self.success,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "stages": self.stages
+        }
+
+
+class BlockProfiler:
+    """
+    Opt-in profiler for BlockProcessor.
+
+    Records wall and CPU time per processing stage and per block, attributes decode
+    time to contracts and event signatures, and optionally keeps a cProfile or stack
+    sample for the slowest N blocks.
+
+    cProfile samples one block at a time: when several workers process blocks in
+    parallel, blocks that start while another is being cProfiled get a stack sample
+    instead.
+    """
+
+    def __init__(self, sampler: Optional[str] = None, top_n: int = 10, sample_interval: float = 0.005):
+        """
+        Initialize block profiler.
+
+        Args:
+            sampler: None, "cprofile" or "stack"
+            top_n: Number of slowest blocks to keep samples for
+            sample_interval: Seconds between stack samples (sampler="stack" only)
+        """
+        if sampler is not None and sampler not in SAMPLER_MODES:
+            raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLER_MODES}")
+
+        self.sampler = sampler
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.logger = setup_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counter = 0
+
+        self.blocks: List[BlockProfile] = []
+        self._slowest: List[Tuple[float, int, BlockProfile]] = []  # min-heap on wall time
+        self.stage_totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"wall": 0.0, "cpu": 0.0, "count": 0})
+        self.decode_costs: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+
+    @property
+    def current(self) -> Optional[BlockProfile]:
+        """Block profile active on the calling thread, if any."""
+        return getattr(self._local, "block", None)
+
+    @contextmanager
+    def profile_block(self, gcs_path: str, block_number: Optional[int] = None):
+        """Profile one block. Yields the BlockProfile being filled in."""
+        record = BlockProfile(gcs_path, block_number)
+        self._local.block = record
+
+        profile = None
+        sampler = None
+        if self.sampler == "cprofile" and _CPROFILE_LOCK.acquire(blocking=False):
+            try:
+                profile = cProfile.Profile()
+                profile.enable()
+            except Exception:
+                _CPROFILE_LOCK.release()
+                raise
+        elif self.sampler is not None:
+            sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall_start
+            record.cpu = time.thread_time() - cpu_start
+
+            if profile is not None:
+                profile.disable()
+                _CPROFILE_LOCK.release()
+                record.sample = profile
+            elif sampler is not None:
+                record.sample = sampler.stop()
+
+            self._local.block = None
+            self._finish_block(record)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a processing stage of the current block."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            record = self.current
+            if record is not None:
+                record.add_stage(name, wall, cpu)
+
+    def record_decode(self, kind: str, contract: Optional[str], signature: Optional[str],
+                      seconds: float, name: Optional[str] = None):
+        """
+        Attribute decode time to a contract and event topic / function selector.
+
+        Args:
+            kind: "log" or "function"
+            contract: Contract address the log/call targets
+            signature: topic0 for logs, 4-byte selector for calls
+            seconds: Time spent decoding
+            name: Decoded event or function name, if decoding succeeded
+        """
+        key = (kind, (contract or "").lower(), signature)
+        with self._lock:
+            cost = self.decode_costs.get(key)
+            if cost is None:
+                cost = self.decode_costs[key] = {"count": 0, "seconds": 0.0, "decoded": 0, "name": None}
+            cost["count"] += 1
+            cost["seconds"] += seconds
+            if name:
+                cost["decoded"] += 1
+                cost["name"] = name
+
+    def _finish_block(self, record: BlockProfile):
+        with self._lock:
+            self.blocks.append(record)
+            for name, stage in record.stages.items():
+                totals = self.stage_totals[name]
+                totals["wall"] += stage["wall"]
+                totals["cpu"] += stage["cpu"]
+                totals["count"] += 1
+
+            # Only retain samples for the slowest N blocks
+            self._counter += 1
+            entry = (record.wall, self._counter, record)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, entry)
+            else:
+                dropped = heapq.heappushpop(self._slowest, entry)[2]
+                dropped.sample = None
+
+    def slowest_blocks(self) -> List[BlockProfile]:
+        """Slowest retained blocks, slowest first."""
+        with self._lock:
+            return [entry[2] for entry in sorted(self._slowest, reverse=True)]
+
+    def _rank(self, kind: str, by_signature: bool, registry=None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        grouped: Dict[Tuple, Dict[str, Any]] = {}
+        for (cost_kind, contract, signature), cost in self.decode_costs.items():
+            if cost_kind != kind:
+                continue
+            key = (contract, signature) if by_signature else (contract,)
+            entry = grouped.get(key)
+            if entry is None:
+                entry = grouped[key] = {"contract": contract, "count": 0, "decoded": 0, "seconds": 0.0}
+                if by_signature:
+                    entry["signature"] = signature
+                    entry["name"] = cost["name"]
+                if registry is not None:
+                    contract_info = registry.get_contract(contract) if contract else None
+                    entry["contract_name"] = contract_info.metadata.name if contract_info else None
+            entry["count"] += cost["count"]
+            entry["decoded"] += cost["decoded"]
+            entry["seconds"] += cost["seconds"]
+            if by_signature and cost["name"]:
+                entry["name"] = cost["name"]
+
+        ranked = sorted(grouped.values(), key=lambda e: e["seconds"], reverse=True)
+        for entry in ranked:
+            entry["avg_us"] = entry["seconds"] / entry["count"] * 1e6 if entry["count"] else 0.0
+        return ranked[:limit] if limit else ranked
+
+    def summary(self, registry=None, limit: int = 25) -> Dict[str, Any]:
+        """
+        Build a summary of collected timings.
+
+        Args:
+            registry: Optional ContractRegistry used to add contract names
+            limit: Maximum entries per ranking
+
+        Returns:
+            Dictionary with stage totals, slowest blocks and decode cost rankings
+        """
+        with self._lock:
+            block_count = len(self.blocks)
+            total_wall = sum(b.wall for b in self.blocks)
+            total_cpu = sum(b.cpu for b in self.blocks)
+            stages = {
+                name: {
+                    "wall": totals["wall"],
+                    "cpu": totals["cpu"],
+                    "count": totals["count"],
+                    "wall_share": totals["wall"] / total_wall if total_wall else 0.0
+                }
+                for name, totals in self.stage_totals.items()
+            }
+
+        return {
+            "blocks": block_count,
+            "wall": total_wall,
+            "cpu": total_cpu,
+            "avg_block_wall": total_wall / block_count if block_count else 0.0,
+            "stages": stages,
+            "slowest_blocks": [b.to_dict() for b in self.slowest_blocks()],
+            "contracts_by_log_cost": self._rank("log", False, registry, limit),
+            "events_by_cost": self._rank("log", True, registry, limit),
+            "contracts_by_function_cost": self._rank("function", False, registry, limit),
+            "functions_by_cost": self._rank("function", True, registry, limit)
+        }
+
+    def write_summary(self, output_file: str, registry=None) -> str:
+        """
+        Write summary JSON, plus samples for the slowest blocks alongside it.
+
+        cProfile samples are written as .prof files (readable with pstats/snakeviz),
+        stack samples as collapsed stacks (readable with flamegraph.pl/speedscope).
+
+        Returns:
+            Path to the summary file
+        """
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        summary = self.summary(registry=registry)
+        samples = []
+        for record in self.slowest_blocks():
+            if record.sample is None:
+                continue
+            label = record.block_number if record.block_number is not None else Path(record.gcs_path).stem
+            if isinstance(record.sample, cProfile.Profile):
+                sample_path = output_file.with_name(f"{output_file.stem}_block_{label}.prof")
+                record.sample.dump_stats(str(sample_path))
+                stream = io.StringIO()
+                pstats.Stats(record.sample, stream=stream).sort_stats("cumulative").print_stats(15)
+                top = stream.getvalue()
+            else:
+                sample_path = output_file.with_name(f"{output_file.stem}_block_{label}.stacks")
+                with open(sample_path, "w") as f:
+                    for stack, count in record.sample.most_common():
+                        f.write(f"{stack} {count}\n")
+                top = [{"stack": stack.split(";")[-1], "samples": count}
+                       for stack, count in record.sample.most_common(15)]
+            samples.append({"block_number": record.block_number, "path": str(sample_path), "top": top})
+        summary["samples"] = samples
+
+        with open(output_file, "w") as f:
+            json.dump(summary, f, indent=2)
+
+        self.logger.info(f"Profile summary for {summary['blocks']} blocks saved to {output_file}")
+        return str(output_file)
@@ -0,0 +1,3 @@
+"""JSON-RPC access to the chain."""
+
+from .client import RpcClient, RpcError, to_filtered_block
@@ -0,0 +1,179 @@
+from typing import List, Tuple, Dict, Any, Optional, Sequence
+import itertools
+import threading
+import msgspec
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..env import env
+from ..utils.logging import setup_logger
+
+
+class RpcError(Exception):
+    """JSON-RPC or HTTP error. code is the HTTP status or JSON-RPC error code."""
+
+    def __init__(self, message: str, code: Optional[int] = None, method: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.method = method
+
+
+class RpcClient:
+    """
+    JSON-RPC client over a persistent HTTP connection pool.
+
+    Calls are sent as JSON-RPC batches of at most max_batch requests per HTTP
+    POST. HTTP 429/5xx responses raise RpcError with the status as code and
+    connection failures raise ConnectionError, so ConcurrencyController retries
+    and backs off on them like GCS errors.
+    """
+
+    def __init__(self, url: Optional[str] = None, timeout: Optional[float] = None,
+                 max_batch: Optional[int] = None, pool_size: int = 10):
+        """
+        Initialize RPC client.
+
+        Args:
+            url: JSON-RPC endpoint (default: env AVAX_RPC)
+            timeout: Seconds per HTTP request (default: env RPC_TIMEOUT)
+            max_batch: Requests per HTTP POST (default: env RPC_BATCH_SIZE)
+            pool_size: Keep-alive connections kept open to the endpoint
+        """
+        self.url = url or env.get_rpc_url()
+        self.timeout = timeout or env.get_rpc_timeout()
+        self.max_batch = max_batch or env.get_rpc_batch_size()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+
+        # Shared by worker threads: the adapter pools connections, ids and counters are locked
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.calls = 0
+        self.logger = setup_logger(__name__)
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, payload) -> Any:
+        try:
+            response = self.session.post(self.url, data=msgspec.json.encode(payload), timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise ConnectionError(f"RPC request to {self.url} failed: {e}") from e
+        with self._lock:
+            self.requests += 1
+        if response.status_code != 200:
+            raise RpcError(f"HTTP {response.status_code}: {response.text[:200]}", code=response.status_code)
+        return msgspec.json.decode(response.content)
+
+    def batch(self, calls: Sequence[Tuple[str, list]]) -> List[Any]:
+        """
+        Run calls as JSON-RPC batches.
+
+        Args:
+            calls: (method, params) pairs
+
+        Returns:
+            Results in call order
+        """
+        results = []
+        for start in range(0, len(calls), self.max_batch):
+            chunk = calls[start:start + self.max_batch]
+            with self._lock:
+                ids = [next(self._ids) for _ in chunk]
+            payload = [
+                {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+                for request_id, (method, params) in zip(ids, chunk)
+            ]
+            response = self._post(payload)
+            if isinstance(response, dict):
+                # Some providers answer a rejected batch with a single error object
+                error = response.get("error") or {}
+                raise RpcError(error.get("message", str(response)), code=error.get("code"))
+
+            # Batch responses may come back in any order
+            by_id = {item.get("id"): item for item in response}
+            for request_id, (method, _) in zip(ids, chunk):
+                item = by_id.get(request_id)
+                if item is None:
+                    raise RpcError(f"No response for {method} (id {request_id})", method=method)
+                if item.get("error"):
+                    error = item["error"]
+                    raise RpcError(f"{method}: {error.get('message')}", code=error.get("code"), method=method)
+                results.append(item.get("result"))
+            with self._lock:
+                self.calls += len(chunk)
+        return results
+
+    def call(self, method: str, *params) -> Any:
+        return self.batch([(method, list(params))])[0]
+
+    def block_number(self) -> int:
+        return int(self.call("eth_blockNumber"), 16)
+
+    def get_headers(self, block_numbers: Sequence[int]) -> List[Optional[Dict[str, Any]]]:
+        """Blocks without transaction bodies (None for blocks the node doesn't have yet)."""
+        return self.batch([("eth_getBlockByNumber", [hex(number), False]) for number in block_numbers])
+
+    def get_blocks_with_receipts(self, block_numbers: Sequence[int]) -> List[Tuple[Optional[Dict[str, Any]], Optional[list]]]:
+        """
+        Full blocks and their receipts, fetched together in one batch.
+
+        Returns:
+            (block, receipts) per block number; block is None if the node doesn't have it yet
+        """
+        calls = []
+        for number in block_numbers:
+            calls.append(("eth_getBlockByNumber", [hex(number), True]))
+            calls.append(("eth_getBlockReceipts", [hex(number)]))
+        results = self.batch(calls)
+        return [(results[i], results[i + 1]) for i in range(0, len(results), 2)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"http_requests": self.requests, "calls": self.calls}
+
+
+def _filtered_transaction(tx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill the fields EvmTransaction requires but the node omits for some types.
+
+    Legacy (type 0) transactions carry neither an access list nor EIP-1559 fees,
+    type 1 has no fees and pre-EIP-155 ones no chainId; fees fall back to gasPrice,
+    which is what such a transaction pays. Contract creations keep their null to.
+    """
+    if "accessList" in tx and "maxFeePerGas" in tx and "chainId" in tx:
+        return tx
+    tx = dict(tx)
+    tx.setdefault("accessList", [])
+    tx.setdefault("maxFeePerGas", tx["gasPrice"])
+    tx.setdefault("maxPriorityFeePerGas", tx["gasPrice"])
+    tx.setdefault("chainId", None)
+    return tx
+
+
+def _filtered_receipt(receipt: Dict[str, Any], tx: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill receipt fields some nodes omit (type and effectiveGasPrice predate EIP-2718/1559)."""
+    if "type" in receipt and "effectiveGasPrice" in receipt and "contractAddress" in receipt:
+        return receipt
+    receipt = dict(receipt)
+    receipt.setdefault("type", tx.get("type", "0x0") if tx else "0x0")
+    receipt.setdefault("effectiveGasPrice", tx.get("gasPrice", "0x0") if tx else "0x0")
+    receipt.setdefault("contractAddress", None)
+    return receipt
+
+
+def to_filtered_block(block: Dict[str, Any], receipts: list) -> Dict[str, Any]:
+    """RPC block and receipts in the QuickNode EvmFilteredBlock file layout."""
+    transactions = [_filtered_transaction(tx) for tx in block["transactions"]]
+    by_hash = {tx["hash"]: tx for tx in transactions}
+    return {
+        "block": block["number"],
+        "timestamp": block["timestamp"],
+        "transactions": transactions,
+        "receipts": [_filtered_receipt(receipt, by_hash.get(receipt.get("transactionHash")))
+                     for receipt in receipts or []]
+    }
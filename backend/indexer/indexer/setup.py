@@ -5,7 +5,7 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "web3>=6.0.0",
+        "web3>=7.0.0",
         "msgspec>=0.18.0",
         "sqlalchemy>=2.0.0",
         "google-cloud-storage>=2.0.0",
@@ -14,6 +14,7 @@ setup(
         "tqdm>=4.65.0",
         "requests>=2.28.0",
         "functions-framework>=3.0.0",
-        "psycopg[binary]>=3.0.0"
+        "psycopg[binary]>=3.0.0",
+        "numpy>=1.24.0"
     ]
 )
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .base import GCSBaseHandler
 from .handler import BlockHandler
-from .local import LocalBlockHandler
\ No newline at end of file
+from .local import LocalBlockHandler, LocalStorageHandler
+from .compression import BlockCompressor, train_dictionary
+from .block_index import BlockIndex, BlockIndexWriter
@@ -202,8 +202,12 @@ class GCSBaseHandler:
         return True
     
     def upload_blob_from_string(self, data: Union[str, bytes], destination_blob_name: str, 
-                               content_type: Optional[str] = None) -> bool:
+                               content_type: Optional[str] = None,
+                               content_encoding: Optional[str] = None) -> bool:
         blob = self.bucket.blob(destination_blob_name)
+        if content_encoding:
+            # gzip objects are served decompressed to clients that don't accept gzip
+            blob.content_encoding = content_encoding
         blob.upload_from_string(data, content_type=content_type)
         return True
     
@@ -0,0 +1,362 @@
+import os
+import uuid
+import socket
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import msgspec
+
+from ..env import env
+from ..utils.logging import setup_logger
+
+
+SEGMENT_SUFFIX = ".idx"
+
+
+def encode_postings(block_numbers: Iterable[int], base: int) -> bytes:
+    """Sorted block numbers as LEB128 varint deltas (the first relative to base)."""
+    out = bytearray()
+    previous = base
+    for number in sorted(block_numbers):
+        delta = number - previous
+        previous = number
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data: bytes, base: int) -> List[int]:
+    """Inverse of encode_postings."""
+    numbers = []
+    current = base
+    delta = shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += delta
+        numbers.append(current)
+        delta = shift = 0
+    return numbers
+
+
+class IndexSegment(msgspec.Struct, array_like=True):
+    """
+    Postings for one block range written by one flush.
+
+    blocks lists every block the segment covers, so a lookup can tell blocks that
+    don't touch a key from blocks that were never indexed. Keys are raw bytes:
+    20-byte addresses and 32-byte topic0s.
+    """
+    range_start: int
+    range_end: int
+    blocks: bytes
+    addresses: Dict[bytes, bytes]
+    topics: Dict[bytes, bytes]
+
+
+_segment_encoder = msgspec.msgpack.Encoder()
+_segment_decoder = msgspec.msgpack.Decoder(type=IndexSegment)
+
+
+def _key(hex_value: str) -> bytes:
+    return bytes.fromhex(hex_value[2:] if hex_value.startswith("0x") else hex_value)
+
+
+class _RangeBuffer:
+    def __init__(self):
+        self.blocks: Set[int] = set()
+        self.addresses: Dict[bytes, Set[int]] = defaultdict(set)
+        self.topics: Dict[bytes, Set[int]] = defaultdict(set)
+
+    def merge(self, other: "_RangeBuffer"):
+        self.blocks |= other.blocks
+        for key, numbers in other.addresses.items():
+            self.addresses[key] |= numbers
+        for key, numbers in other.topics.items():
+            self.topics[key] |= numbers
+
+
+class BlockIndexWriter:
+    """
+    Collects the contract addresses and topic0s of decoded blocks into index segments.
+
+    Blocks are buffered per range of range_size blocks and written every flush_blocks
+    blocks (and on flush()) as one immutable segment per range, named by writer, so
+    any number of processes can index the same range without coordination.
+    BlockIndex.compact merges a range's segments later; with compact_segments set,
+    the writer compacts a range itself once it has written that many segments to it,
+    which bounds the segments a lookup reads when flushes are frequent.
+    """
+
+    def __init__(self, storage, prefix: Optional[str] = None, range_size: Optional[int] = None,
+                 flush_blocks: Optional[int] = None, writer_id: Optional[str] = None,
+                 compact_segments: Optional[int] = None):
+        """
+        Initialize index writer.
+
+        Args:
+            storage: GCSBaseHandler or LocalStorageHandler segments are written to
+            prefix: Blob prefix of the index (default: env BLOCK_INDEX_PREFIX)
+            range_size: Blocks per range (default: env BLOCK_INDEX_RANGE_SIZE)
+            flush_blocks: Blocks buffered before writing (default: env BLOCK_INDEX_FLUSH_BLOCKS)
+            writer_id: Segment name prefix (default: hostname, pid and a random suffix)
+            compact_segments: Segments written to a range before compacting it
+                              (default: env BLOCK_INDEX_COMPACT_SEGMENTS, 0 disables)
+        """
+        self.storage = storage
+        self.prefix = prefix if prefix is not None else env.get_block_index_prefix()
+        self.range_size = range_size or env.get_block_index_range_size()
+        self.flush_blocks = flush_blocks or env.get_block_index_flush_blocks()
+        self.writer_id = writer_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.compact_segments = (env.get_block_index_compact_segments()
+                                 if compact_segments is None else compact_segments)
+        self.logger = setup_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._ranges: Dict[int, _RangeBuffer] = {}
+        self._buffered = 0
+        self._sequence = 0
+        self._range_segments: Dict[int, int] = defaultdict(int)
+        self.segments_written = 0
+        self.ranges_compacted = 0
+
+    def add(self, block_number: int, addresses: Iterable[str], topics: Iterable[str]):
+        """Record the addresses and topic0s of a decoded block."""
+        range_start = block_number - block_number % self.range_size
+        with self._lock:
+            buffer = self._ranges.get(range_start)
+            if buffer is None:
+                buffer = self._ranges[range_start] = _RangeBuffer()
+            buffer.blocks.add(block_number)
+            for address in addresses:
+                buffer.addresses[_key(address)].add(block_number)
+            for topic in topics:
+                buffer.topics[_key(topic)].add(block_number)
+            self._buffered += 1
+            full = self._buffered >= self.flush_blocks
+
+        if full:
+            self.flush()
+
+    def discard(self, block_numbers: Iterable[int]) -> int:
+        """
+        Drop the buffered postings of blocks (e.g. orphaned by a reorg).
+
+        Segments already written are immutable, so postings flushed before keep the
+        blocks as candidates (see BlockIndex).
+
+        Returns:
+            Number of buffered blocks dropped
+        """
+        dropped = 0
+        with self._lock:
+            for block_number in set(block_numbers):
+                range_start = block_number - block_number % self.range_size
+                buffer = self._ranges.get(range_start)
+                if buffer is None or block_number not in buffer.blocks:
+                    continue
+                buffer.blocks.discard(block_number)
+                for postings in (buffer.addresses, buffer.topics):
+                    for key in [key for key, numbers in postings.items() if block_number in numbers]:
+                        postings[key].discard(block_number)
+                        if not postings[key]:
+                            del postings[key]
+                if not buffer.blocks:
+                    del self._ranges[range_start]
+                self._buffered = max(0, self._buffered - 1)
+                dropped += 1
+        return dropped
+
+    def flush(self) -> int:
+        """
+        Write buffered blocks as one segment per range.
+
+        Returns:
+            Number of segments written (ranges that failed stay buffered for the next flush)
+        """
+        with self._flush_lock:
+            with self._lock:
+                ranges, self._ranges = self._ranges, {}
+                self._buffered = 0
+
+            written = 0
+            for range_start, buffer in sorted(ranges.items()):
+                name = self.segment_name(range_start)
+                try:
+                    self.storage.upload_blob_from_string(self._encode(range_start, buffer), name,
+                                                        content_type="application/octet-stream")
+                    written += 1
+                    self._range_segments[range_start] += 1
+                except Exception as e:
+                    self.logger.error(f"Writing index segment {name} failed: {type(e).__name__}: {e}")
+                    with self._lock:
+                        self._ranges.setdefault(range_start, _RangeBuffer()).merge(buffer)
+                        self._buffered += len(buffer.blocks)
+
+            self.segments_written += written
+            if self.compact_segments > 0:
+                for range_start in [start for start, count in self._range_segments.items()
+                                    if count >= self.compact_segments]:
+                    self._compact(range_start)
+            return written
+
+    def _compact(self, range_start: int):
+        """Merge a range's segments (those of other writers too); failures wait for the next flush."""
+        try:
+            merged = BlockIndex(self.storage, self.prefix, self.range_size, cache_segments=0).compact(range_start)
+        except Exception as e:
+            self.logger.error(f"Compacting index range {range_start} failed: {type(e).__name__}: {e}")
+            return
+        del self._range_segments[range_start]
+        self.ranges_compacted += 1
+        self.logger.info(f"Compacted {merged} segments of index range {range_start}")
+
+    def segment_name(self, range_start: int) -> str:
+        self._sequence += 1
+        return f"{self.prefix}{range_start:012d}/{self.writer_id}-{self._sequence:06d}{SEGMENT_SUFFIX}"
+
+    def _encode(self, range_start: int, buffer: _RangeBuffer) -> bytes:
+        return _segment_encoder.encode(IndexSegment(
+            range_start=range_start,
+            range_end=range_start + self.range_size - 1,
+            blocks=encode_postings(buffer.blocks, range_start),
+            addresses={key: encode_postings(numbers, range_start) for key, numbers in buffer.addresses.items()},
+            topics={key: encode_postings(numbers, range_start) for key, numbers in buffer.topics.items()}
+        ))
+
+
+class BlockIndex:
+    """
+    Lookups over the segments written by BlockIndexWriter.
+
+    Results are candidate blocks: a block redecoded after an ABI change or replaced by
+    a reorg keeps its earlier postings, so callers decode the blocks they get back.
+    """
+
+    def __init__(self, storage, prefix: Optional[str] = None, range_size: Optional[int] = None,
+                 cache_segments: int = 256):
+        """
+        Initialize index reader.
+
+        Args:
+            storage: GCSBaseHandler or LocalStorageHandler holding the segments
+            prefix: Blob prefix of the index (default: env BLOCK_INDEX_PREFIX)
+            range_size: Blocks per range, must match the writers (default: env BLOCK_INDEX_RANGE_SIZE)
+            cache_segments: Decoded segments kept in memory (segments are immutable)
+        """
+        self.storage = storage
+        self.prefix = prefix if prefix is not None else env.get_block_index_prefix()
+        self.range_size = range_size or env.get_block_index_range_size()
+        self.cache_segments = cache_segments
+        self.logger = setup_logger(__name__)
+
+        self._cache: "OrderedDict[str, IndexSegment]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def range_starts(self, min_block: int, max_block: int) -> List[int]:
+        first = min_block - min_block % self.range_size
+        return list(range(first, max_block + 1, self.range_size))
+
+    def list_ranges(self) -> List[int]:
+        """Start blocks of every range with at least one segment."""
+        starts = set()
+        for blob in self.storage.list_blobs(prefix=self.prefix):
+            directory = blob.name[len(self.prefix):].split("/", 1)[0]
+            if blob.name.endswith(SEGMENT_SUFFIX) and directory.isdigit():
+                starts.add(int(directory))
+        return sorted(starts)
+
+    def segment_names(self, range_start: int) -> List[str]:
+        prefix = f"{self.prefix}{range_start:012d}/"
+        return sorted(blob.name for blob in self.storage.list_blobs(prefix=prefix)
+                      if blob.name.endswith(SEGMENT_SUFFIX))
+
+    def _load(self, name: str) -> Optional[IndexSegment]:
+        with self._cache_lock:
+            segment = self._cache.get(name)
+            if segment is not None:
+                self._cache.move_to_end(name)
+                return segment
+
+        data = self.storage.download_blob_as_bytes(name)
+        if data is None:
+            return None
+        segment = _segment_decoder.decode(data)
+
+        with self._cache_lock:
+            self._cache[name] = segment
+            while len(self._cache) > self.cache_segments:
+                self._cache.popitem(last=False)
+        return segment
+
+    def _segments(self, range_start: int) -> List[IndexSegment]:
+        # A compaction may delete listed segments after writing their merge: list again
+        for _ in range(2):
+            names = self.segment_names(range_start)
+            segments = [self._load(name) for name in names]
+            if all(segment is not None for segment in segments):
+                return segments
+        return [segment for segment in segments if segment is not None]
+
+    def _lookup(self, field: str, key: bytes, min_block: int, max_block: int) -> List[int]:
+        found = set()
+        for range_start in self.range_starts(min_block, max_block):
+            for segment in self._segments(range_start):
+                postings = getattr(segment, field).get(key)
+                if postings:
+                    found.update(decode_postings(postings, segment.range_start))
+        return sorted(n for n in found if min_block <= n <= max_block)
+
+    def lookup_address(self, address: str, min_block: int, max_block: int) -> List[int]:
+        """Blocks in [min_block, max_block] where a contract was called or emitted logs."""
+        return self._lookup("addresses", _key(address.lower()), min_block, max_block)
+
+    def lookup_topic(self, topic0: str, min_block: int, max_block: int) -> List[int]:
+        """Blocks in [min_block, max_block] with a log whose first topic is topic0."""
+        return self._lookup("topics", _key(topic0.lower()), min_block, max_block)
+
+    def indexed_blocks(self, min_block: int, max_block: int) -> List[int]:
+        """Blocks in [min_block, max_block] covered by the index (lookups can't see the others)."""
+        found = set()
+        for range_start in self.range_starts(min_block, max_block):
+            for segment in self._segments(range_start):
+                found.update(decode_postings(segment.blocks, segment.range_start))
+        return sorted(n for n in found if min_block <= n <= max_block)
+
+    def compact(self, range_start: int) -> int:
+        """
+        Merge a range's segments into one.
+
+        Returns:
+            Number of segments merged (0 if the range already had at most one)
+        """
+        names = self.segment_names(range_start)
+        if len(names) < 2:
+            return 0
+
+        merged = _RangeBuffer()
+        for name in names:
+            segment = self._load(name)
+            if segment is None:
+                continue
+            merged.blocks.update(decode_postings(segment.blocks, segment.range_start))
+            for key, postings in segment.addresses.items():
+                merged.addresses[key].update(decode_postings(postings, segment.range_start))
+            for key, postings in segment.topics.items():
+                merged.topics[key].update(decode_postings(postings, segment.range_start))
+
+        writer = BlockIndexWriter(self.storage, self.prefix, self.range_size, writer_id=f"compact-{uuid.uuid4().hex[:8]}")
+        self.storage.upload_blob_from_string(writer._encode(range_start, merged), writer.segment_name(range_start),
+                                             content_type="application/octet-stream")
+        for name in names:
+            self.storage.delete_blob(name)
+        with self._cache_lock:
+            for name in names:
+                self._cache.pop(name, None)
+        return len(names)
@@ -0,0 +1,176 @@
+import gzip
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # only needed for DECODED_COMPRESSION=zstd
+    zstandard = None
+
+from ..env import env
+
+
+CODECS = ("none", "gzip", "zstd")
+EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+CONTENT_ENCODINGS = {"none": None, "gzip": "gzip", "zstd": "zstd"}
+DEFAULT_LEVELS = {"none": None, "gzip": 6, "zstd": 3}
+DICTIONARY_SUFFIX = ".zdict"
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+
+def detect_codec(data: bytes) -> str:
+    """Codec of a stored payload, from its magic bytes."""
+    if data[:4] == ZSTD_MAGIC:
+        return "zstd"
+    if data[:2] == GZIP_MAGIC:
+        return "gzip"
+    return "none"
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = 112640, level: int = 3) -> bytes:
+    """
+    Train a zstd dictionary on sample decoded blocks.
+
+    Decoded blocks share most of their keys, addresses and event names, so a
+    dictionary lets each block reference them instead of re-learning them per object.
+
+    Args:
+        samples: Serialized (uncompressed) decoded blocks
+        dict_size: Target dictionary size in bytes
+        level: Compression level the dictionary is tuned for
+
+    Returns:
+        Dictionary bytes, to be saved as a .zdict file
+    """
+    _require_zstandard()
+    return zstandard.train_dictionary(dict_size, samples, level=level).as_bytes()
+
+
+class BlockCompressor:
+    """
+    Compression codec for decoded blocks.
+
+    Writes use the configured codec (none, gzip or zstd, optionally with a trained
+    dictionary). Reads detect the codec from the payload itself, so objects written
+    under any setting stay readable. Every .zdict file next to the configured
+    dictionary is loaded for reading, so blocks written with a previous dictionary
+    still decompress after retraining. Lookups only try the configured codec's object
+    name unless read_all_codecs is set (while objects written under another codec remain).
+    """
+
+    def __init__(self, codec: str = "none", level: Optional[int] = None,
+                 dictionary_path: Optional[Union[str, Path]] = None,
+                 read_all_codecs: bool = False):
+        """
+        Initialize block compressor.
+
+        Args:
+            codec: none, gzip or zstd
+            level: Compression level (default: 6 for gzip, 3 for zstd)
+            dictionary_path: Optional zstd dictionary used for writing
+            read_all_codecs: Also look for objects stored with the other codecs
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown compression codec {codec!r}, expected one of {', '.join(CODECS)}")
+        if codec == "zstd":
+            _require_zstandard()
+
+        self.codec = codec
+        self.level = level if level is not None else DEFAULT_LEVELS[codec]
+        self.read_all_codecs = read_all_codecs
+        self.dictionary = None
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        if dictionary_path:
+            self._load_dictionaries(Path(dictionary_path))
+
+        # zstandard (de)compressor objects are not thread-safe
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "BlockCompressor":
+        return cls(
+            env.get_decoded_compression(),
+            level=env.get_decoded_compression_level(),
+            dictionary_path=env.get_zstd_dictionary_path(),
+            read_all_codecs=env.get_decoded_read_all_codecs()
+        )
+
+    @property
+    def extension(self) -> str:
+        """Suffix appended to .json object names."""
+        return EXTENSIONS[self.codec]
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        return CONTENT_ENCODINGS[self.codec]
+
+    def read_extensions(self, all_codecs: Optional[bool] = None) -> List[str]:
+        """
+        Suffixes to look for, the configured codec first.
+
+        Each suffix costs a request per lookup, so the other codecs are only tried when
+        all_codecs (default: read_all_codecs) is set.
+        """
+        if not (self.read_all_codecs if all_codecs is None else all_codecs):
+            return [self.extension]
+        return [self.extension] + [ext for ext in EXTENSIONS.values() if ext != self.extension]
+
+    def _load_dictionaries(self, path: Path):
+        _require_zstandard()
+        self.dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+        self._dictionaries[self.dictionary.dict_id()] = self.dictionary
+        for other in path.parent.glob(f"*{DICTIONARY_SUFFIX}"):
+            if other != path:
+                dictionary = zstandard.ZstdCompressionDict(other.read_bytes())
+                self._dictionaries.setdefault(dictionary.dict_id(), dictionary)
+
+    def _zstd_compressor(self):
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary)
+            self._local.compressor = compressor
+        return compressor
+
+    def _zstd_decompressor(self, dict_id: int):
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                dictionary = self._dictionaries.get(dict_id)
+                if dictionary is None:
+                    raise ValueError(
+                        f"Block was compressed with zstd dictionary {dict_id}, which is not loaded "
+                        f"(put its {DICTIONARY_SUFFIX} file next to ZSTD_DICTIONARY_PATH)"
+                    )
+            decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        if self.codec == "gzip":
+            return gzip.compress(data, compresslevel=self.level, mtime=0)
+        if self.codec == "zstd":
+            return self._zstd_compressor().compress(data)
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress a stored payload written with any codec (plain JSON passes through)."""
+        codec = detect_codec(data)
+        if codec == "gzip":
+            return gzip.decompress(data)
+        if codec == "zstd":
+            _require_zstandard()
+            dict_id = zstandard.get_frame_parameters(data).dict_id
+            return self._zstd_decompressor(dict_id).decompress(data)
+        return data
@@ -1,17 +1,33 @@
 from typing import Tuple, Optional, Dict, Any, List
+from collections.abc import Mapping
 import json
+import msgspec
 
 from ..env import env
+from ..model.compact import CompactBlock
 from ..utils.logging import setup_logger
 from .base import GCSBaseHandler
+from .compression import BlockCompressor
+
+
+def _decoded_enc_hook(obj):
+    """msgspec encode hook for web3 values found in decoded attributes."""
+    if isinstance(obj, bytes):
+        return "0x" + bytes(obj).hex()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise NotImplementedError(f"Type {type(obj)} not serializable")
+
 
 class BlockHandler():
     def __init__(self,gcs_handler: GCSBaseHandler,
                  raw_prefix: str = None,
-                 decoded_prefix: str = None):
+                 decoded_prefix: str = None,
+                 compressor: Optional[BlockCompressor] = None):
         self.gcs_handler = gcs_handler
         self.raw_prefix = raw_prefix or env.get_rpc_prefix()
         self.decoded_prefix = decoded_prefix or env.get_decoded_prefix()
+        self.compressor = compressor or BlockCompressor.from_env()
         self.logger = setup_logger(__name__)
 
     def extract_block_number(self, gcs_path: str) -> int:
@@ -22,6 +38,16 @@ class BlockHandler():
         padded_number = str(block_number).zfill(12)
         return f"quicknode_avalanche-mainnet_block_with_receipts_{padded_number}-{padded_number}.json"
 
+    def serialize_decoded_block(self, decoded_data) -> bytes:
+        """Encode a decoded Block, CompactBlock (or plain dict) as JSON bytes."""
+        if isinstance(decoded_data, CompactBlock):
+            decoded_data = decoded_data.to_block()
+        return msgspec.json.encode(decoded_data, enc_hook=_decoded_enc_hook)
+
+    def decoded_block_names(self, block_number: int, all_codecs: Optional[bool] = None) -> List[str]:
+        """Candidate file names of a decoded block, the configured codec's first (see read_extensions)."""
+        return [f"{block_number}.json{extension}" for extension in self.compressor.read_extensions(all_codecs)]
+
     def store_decoded_block(self, block_number: int, decoded_data: Dict[str, Any]) -> bool:
         """
         Store decoded block data in GCS.
@@ -29,11 +55,12 @@ class BlockHandler():
         Returns:
             True if storage was successful
         """
-        destination = f"{self.decoded_prefix}{block_number}.json"
+        destination = f"{self.decoded_prefix}{block_number}.json{self.compressor.extension}"
         return self.gcs_handler.upload_blob_from_string(
-            json.dumps(decoded_data), 
+            self.compressor.compress(self.serialize_decoded_block(decoded_data)), 
             destination,
-            content_type="application/json"
+            content_type="application/json",
+            content_encoding=self.compressor.content_encoding
         )
     
     def get_raw_block_path(self, block_number: int) -> str:
@@ -61,12 +88,22 @@ class BlockHandler():
         Returns:
             Decoded block data if found, None otherwise
         """
-        path = f"{self.decoded_prefix}{block_number}.json"
-        data = self.gcs_handler.download_blob_as_text(path)
-        if data:
-            return json.loads(data)
+        for name in self.decoded_block_names(block_number):
+            # GCS may already have transcoded gzip; decompress() passes plain JSON through
+            data = self.gcs_handler.download_blob_as_bytes(f"{self.decoded_prefix}{name}")
+            if data:
+                return json.loads(self.compressor.decompress(data))
         return None
     
+    def delete_decoded_block(self, block_number: int) -> bool:
+        """Delete a decoded block, whatever codec it was stored with."""
+        deleted = False
+        for name in self.decoded_block_names(block_number, all_codecs=True):
+            deleted = self.gcs_handler.delete_blob(f"{self.decoded_prefix}{name}") or deleted
+        return deleted
+    
     def decoded_block_exists(self, block_number: int) -> bool:
-        path = f"{self.decoded_prefix}{block_number}.json"
-        return self.gcs_handler.blob_exists(path)
\ No newline at end of file
+        return any(
+            self.gcs_handler.blob_exists(f"{self.decoded_prefix}{name}")
+            for name in self.decoded_block_names(block_number)
+        )
\ No newline at end of file
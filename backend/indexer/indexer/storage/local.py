@@ -1,6 +1,10 @@
 
+import os
 import json
+import msgspec
 from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Optional, Union
 
 from ..env import env
 from .handler import BlockHandler
@@ -9,8 +13,8 @@ from ..utils.logging import setup_logger
 class LocalBlockHandler(BlockHandler):
     """Extension of BlockHandler that stores decoded blocks locally."""
     
-    def __init__(self, gcs_handler, local_dir=None, raw_prefix=None, decoded_prefix=None):
-        super().__init__(gcs_handler, raw_prefix, decoded_prefix)
+    def __init__(self, gcs_handler, local_dir=None, raw_prefix=None, decoded_prefix=None, compressor=None):
+        super().__init__(gcs_handler, raw_prefix, decoded_prefix, compressor)
         self.local_dir = Path(local_dir or env.get_path('data_dir'))
         self.local_decoded_dir = self.local_dir / "decoded"
         self.local_decoded_dir.mkdir(parents=True, exist_ok=True)
@@ -19,23 +23,140 @@ class LocalBlockHandler(BlockHandler):
     def store_decoded_block(self, block_number: int, decoded_data):
         """Store decoded block data to local filesystem."""
         try:
-            file_path = self.local_decoded_dir / f"{block_number}.json"
+            file_path = self.local_decoded_dir / f"{block_number}.json{self.compressor.extension}"
             self.logger.info(f"Storing decoded block {block_number} to {file_path}")
             
-            with open(file_path, 'w') as f:
-                json.dump(decoded_data, f, default=self._json_serializer, indent=2)
+            data = self.serialize_decoded_block(decoded_data)
+            if self.compressor.codec == "none":
+                data = msgspec.json.format(data, indent=2)  # kept readable when uncompressed
+            
+            with open(file_path, 'wb') as f:
+                f.write(self.compressor.compress(data))
             
             return True
         except Exception as e:
             self.logger.error(f"Failed to store decoded block {block_number}: {str(e)}")
             return False
         
+    def get_decoded_block(self, block_number: int):
+        """Read a decoded block from the local filesystem."""
+        for name in self.decoded_block_names(block_number):
+            file_path = self.local_decoded_dir / name
+            if file_path.exists():
+                return json.loads(self.compressor.decompress(file_path.read_bytes()))
+        return None
+        
+    def delete_decoded_block(self, block_number: int) -> bool:
+        deleted = False
+        for name in self.decoded_block_names(block_number, all_codecs=True):
+            file_path = self.local_decoded_dir / name
+            if file_path.exists():
+                file_path.unlink()
+                deleted = True
+        return deleted
+        
     def decoded_block_exists(self, block_number: int) -> bool:
-        file_path = self.local_decoded_dir / f"{block_number}.json"
-        return file_path.exists()
+        return any((self.local_decoded_dir / name).exists() for name in self.decoded_block_names(block_number))
     
     def _json_serializer(self, obj):
         """Custom JSON serializer for objects not serializable by default json code"""
         if hasattr(obj, 'isoformat'):
             return obj.isoformat()
-        raise TypeError(f"Type {type(obj)} not serializable")
\ No newline at end of file
+        raise TypeError(f"Type {type(obj)} not serializable")
+
+class LocalBlob:
+    """Minimal stand-in for storage.Blob used by LocalStorageHandler."""
+
+    def __init__(self, name: str, path: Path):
+        stat = path.stat()
+        self.name = name
+        self.size = stat.st_size
+        self.updated = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        self.time_created = self.updated
+        self.generation = stat.st_mtime_ns
+        self.metageneration = 1
+        self.md5_hash = None
+        self.content_type = "application/json" if ".json" in name else None
+        self.etag = None
+
+
+class LocalStorageHandler:
+    """
+    Filesystem-backed drop-in for GCSBaseHandler.
+    Blob names map to paths under root_dir, so GCS prefixes work unchanged.
+    """
+
+    def __init__(self, root_dir: Union[str, Path]):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.bucket_name = str(self.root_dir)
+
+    def _path(self, blob_name: str) -> Path:
+        return self.root_dir / blob_name
+
+    def list_blobs(self, prefix: Optional[str] = None) -> List[LocalBlob]:
+        prefix = prefix or ""
+        # Walk only the directory part of the prefix, then filter on the full prefix
+        base = self._path(prefix) if prefix.endswith("/") else self._path(prefix).parent
+        if not base.exists():
+            return []
+        blobs = []
+        for path in sorted(base.rglob("*")):
+            if not path.is_file():
+                continue
+            name = path.relative_to(self.root_dir).as_posix()
+            if name.startswith(prefix):
+                blobs.append(LocalBlob(name, path))
+        return blobs
+
+    def get_blob(self, blob_name: str) -> Optional[LocalBlob]:
+        path = self._path(blob_name)
+        if path.is_file():
+            return LocalBlob(blob_name, path)
+        return None
+
+    def download_blob_to_file(self, blob_name: str, destination_file_path: str) -> bool:
+        data = self.download_blob_as_bytes(blob_name)
+        if data is None:
+            return False
+        os.makedirs(os.path.dirname(destination_file_path), exist_ok=True)
+        with open(destination_file_path, 'wb') as f:
+            f.write(data)
+        return True
+
+    def download_blob_as_bytes(self, blob_name: str) -> Optional[bytes]:
+        path = self._path(blob_name)
+        if not path.is_file():
+            return None
+        return path.read_bytes()
+
+    def download_blob_as_text(self, blob_name: str) -> Optional[str]:
+        data = self.download_blob_as_bytes(blob_name)
+        return data.decode("utf-8") if data is not None else None
+
+    def upload_blob_from_file(self, source_file_path: str, destination_blob_name: str) -> bool:
+        if not os.path.exists(source_file_path):
+            return False
+        with open(source_file_path, 'rb') as f:
+            return self.upload_blob_from_string(f.read(), destination_blob_name)
+
+    def upload_blob_from_string(self, data: Union[str, bytes], destination_blob_name: str,
+                               content_type: Optional[str] = None,
+                               content_encoding: Optional[str] = None) -> bool:
+        # Encoding is carried by the file extension locally
+        path = self._path(destination_blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+        return True
+
+    def delete_blob(self, blob_name: str) -> bool:
+        path = self._path(blob_name)
+        if not path.is_file():
+            return False
+        path.unlink()
+        return True
+
+    def blob_exists(self, blob_name: str) -> bool:
+        return self._path(blob_name).is_file()
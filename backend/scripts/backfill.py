@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.processing.factory import ComponentFactory
+from indexer.indexer.utils.logging import setup_logger
+
+
+def run_worker(args, worker_index: int):
+    """
+    Entry point of one worker process.
+
+    Worker processes are spawned, not forked, so the engine, connection pool and
+    lease manager used here are created in the worker rather than shared with the
+    parent's open database connections.
+    """
+    from indexer.indexer.processing.batch import BatchProcessor
+    from indexer.indexer.processing.backfill import BackfillWorker
+
+    batch_processor = BatchProcessor(
+        storage_type=args.storage,
+        local_dir=args.local_dir,
+        use_local_db=args.local_db,
+        decode_filter=args.decode_filter
+    )
+    worker_id = f"{args.worker_id}-{worker_index}" if args.worker_id else None
+    worker = BackfillWorker(
+        batch_processor.processor,
+        ComponentFactory.get_shard_lease_manager(),
+        args.run,
+        worker_id=worker_id,
+        lease_seconds=args.lease_seconds,
+        heartbeat_seconds=args.heartbeat_seconds,
+        force=args.force
+    )
+
+    # Release the current shard cleanly on SIGTERM (e.g. VM preemption)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    try:
+        return worker.run(max_shards=args.max_shards)
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Sharded backfill coordinator for WESMOL Indexer")
+    parser.add_argument("--local-db", action="store_true",
+                       help="Use local SQLite database instead of PostgreSQL")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan = subparsers.add_parser("plan", help="Split a block range into shards for a run")
+    plan.add_argument("--run", required=True, help="Run name")
+    plan.add_argument("--range", type=int, nargs=2, metavar=("MIN", "MAX"), required=True,
+                      help="Block range MIN to MAX (inclusive)")
+    plan.add_argument("--shard-size", type=int, default=1000,
+                      help="Blocks per shard (default: 1000)")
+
+    work = subparsers.add_parser("work", help="Claim and process shards until the run is done")
+    work.add_argument("--run", required=True, help="Run name")
+    work.add_argument("--processes", type=int, default=1,
+                      help="Worker processes on this host (default: 1)")
+    work.add_argument("--worker-id", type=str, default=None,
+                      help="Lease owner prefix (default: hostname:pid)")
+    work.add_argument("--max-shards", type=int, default=None,
+                      help="Stop each worker after this many shards")
+    work.add_argument("--lease-seconds", type=int, default=None,
+                      help="Lease length (default: env BACKFILL_LEASE_SECONDS)")
+    work.add_argument("--heartbeat-seconds", type=int, default=None,
+                      help="Heartbeat interval (default: env BACKFILL_HEARTBEAT_SECONDS)")
+    work.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                      help="Where to store decoded blocks (default: gcs)")
+    work.add_argument("--local-dir", type=str, default=None,
+                      help="Local directory for storage (default: data_dir from env)")
+    work.add_argument("--decode-filter", choices=["all", "registry", "topics"], default=None,
+                      help="Decode filter mode (default: env DECODE_FILTER_MODE)")
+    work.add_argument("--force", action="store_true",
+                      help="Reprocess blocks that are already decoded")
+
+    status = subparsers.add_parser("status", help="Show run progress")
+    status.add_argument("--run", required=True, help="Run name")
+
+    requeue = subparsers.add_parser("requeue", help="Requeue shards with expired leases")
+    requeue.add_argument("--run", default=None, help="Run name (default: all runs)")
+    requeue.add_argument("--failed", action="store_true",
+                         help="Also retry shards that exhausted their attempts")
+
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    leases = ComponentFactory.get_shard_lease_manager()
+
+    if args.command == "plan":
+        created = leases.plan_run(args.run, args.range[0], args.range[1], args.shard_size)
+        print(f"Created {created} shards for run {args.run}")
+
+    elif args.command == "work":
+        if args.processes <= 1:
+            stats = run_worker(args, 0)
+            print(json.dumps(stats, indent=2))
+        else:
+            # Pooled connections must not be inherited by the workers
+            leases.db.engine.dispose()
+            context = multiprocessing.get_context("spawn")
+            processes = [
+                context.Process(target=run_worker, args=(args, index))
+                for index in range(args.processes)
+            ]
+            for process in processes:
+                process.start()
+            try:
+                for process in processes:
+                    process.join()
+            except KeyboardInterrupt:
+                for process in processes:
+                    process.terminate()
+                for process in processes:
+                    process.join()
+        print(json.dumps(leases.get_progress(args.run), indent=2, default=str))
+
+    elif args.command == "status":
+        print(json.dumps(leases.get_progress(args.run), indent=2, default=str))
+
+    elif args.command == "requeue":
+        count = leases.requeue_expired(args.run)
+        print(f"Requeued {count} expired shards")
+        if args.failed:
+            if not args.run:
+                parser.error("--failed requires --run")
+            print(f"Reset {leases.reset_failed(args.run)} failed shards")
+
+
+if __name__ == "__main__":
+    main()
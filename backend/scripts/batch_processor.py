@@ -11,6 +11,7 @@ sys.path.append(str(project_root))
 # Import from indexer package
 from indexer.indexer.env import env
 from indexer.indexer.processing.batch import BatchProcessor
+from indexer.indexer.processing.checkpoint import RunCheckpoint
 from indexer.indexer.database.models.status import ProcessingStatus
 from indexer.indexer.utils.logging import setup_logger
 
@@ -44,17 +45,21 @@ def main():
                       help="Sample N random blocks")
     group.add_argument("--block-numbers", type=int, nargs="+",
                       help="Process specific block numbers")
-    group.add_argument("--status", choices=["pending", "valid", "invalid", "processing"],
+    group.add_argument("--status", choices=["pending", "valid", "invalid", "processing", "quarantined"],
                       help="Process blocks with specific status")
     group.add_argument("--file", type=str,
                       help="File with list of block numbers or paths")
     group.add_argument("--range", type=int, nargs=2, metavar=("MIN", "MAX"),
                       help="Process blocks in range MIN to MAX (inclusive)")
+    group.add_argument("--resume", type=str, metavar="RUN_ID",
+                      help="Resume a checkpointed run from its last committed cursor")
+    group.add_argument("--list-runs", action="store_true",
+                      help="List checkpointed runs and their progress")
     
     # Other options
     parser.add_argument("--prefix", type=str, default=None,
                       help="GCS prefix for blocks (default: from env)")
-    parser.add_argument("--filter-status", choices=["pending", "valid", "invalid", "processing"],
+    parser.add_argument("--filter-status", choices=["pending", "valid", "invalid", "processing", "quarantined"],
                       help="Filter blocks in range by status")
     parser.add_argument("--limit", type=int, default=100,
                       help="Maximum number of blocks to process for --status (default: 100)")
@@ -68,6 +73,27 @@ def main():
                       help="Don't sync GCS objects to database before querying")
     parser.add_argument("--output", type=str, default=None,
                       help="Output file for results (default: auto-generated)")
+    parser.add_argument("--max-workers", type=int, default=None,
+                      help="Max blocks in flight; per-stage concurrency adapts below it (default: env BATCH_MAX_WORKERS)")
+    parser.add_argument("--checkpoint-every", type=int, default=100,
+                      help="Persist the run plan and commit its cursor every N blocks, 0 disables (default: 100)")
+    parser.add_argument("--ownership", action="store_true",
+                      help="Apply processed blocks to the NFT ownership state in block order, through an "
+                           "ordered commit stage (block paths must be ascending, e.g. --range)")
+    
+    # Profiling options
+    parser.add_argument("--profile", action="store_true",
+                      help="Record per-stage and per-contract timings and write a profile summary")
+    parser.add_argument("--profile-sampler", choices=["cprofile", "stack"], default=None,
+                      help="Keep cProfile or stack samples for the slowest blocks (implies --profile); "
+                           "cProfile covers one block at a time, others fall back to stack samples")
+    parser.add_argument("--profile-top", type=int, default=10,
+                      help="Number of slowest blocks to keep samples for (default: 10)")
+
+    # Decoding options
+    parser.add_argument("--decode-filter", choices=["all", "registry", "topics"], default=None,
+                      help="Only decode logs/transactions of registry contracts (plus allowlisted "
+                           "topics from DECODE_TOPIC_ALLOWLIST for 'topics') (default: env DECODE_FILTER_MODE)")
     parser.set_defaults(sync=True)
     
     args = parser.parse_args()
@@ -84,17 +110,62 @@ def main():
     batch_processor = BatchProcessor(
         storage_type=args.storage,
         local_dir=args.local_dir,
-        use_local_db=args.local_db
+        use_local_db=args.local_db,
+        profile=args.profile,
+        profile_sampler=args.profile_sampler,
+        profile_top=args.profile_top,
+        decode_filter=args.decode_filter,
+        max_workers=args.max_workers
     )
     
+    # Stateful sinks see the parallel run's blocks in block order
+    ownership = None
+    if args.ownership:
+        from indexer.indexer.processing.factory import ComponentFactory
+        from indexer.indexer.processing.ordered import OrderedCommitter
+        from indexer.indexer.storage.local import LocalStorageHandler
+
+        storage = LocalStorageHandler(args.local_dir or env.get_path('data_dir')) if args.storage == "local" else None
+        ownership = ComponentFactory.get_ownership_tracker(storage)
+        ownership.restore_latest()
+        # Decoded blocks the plan passes over (sparse plans) are replayed by the tracker
+        ownership.fill_gaps_from(batch_processor.handler, batch_processor.db_manager)
+        committer = OrderedCommitter(start_after=ownership.block_number)
+        committer.subscribe(ownership.apply_block)
+
+        checkpoint_blocks = env.get_ownership_checkpoint_blocks()
+        def checkpoint_ownership(block_number, _):
+            if (committer.released + 1) % checkpoint_blocks == 0:
+                ownership.checkpoint()
+        committer.subscribe(checkpoint_ownership)
+        batch_processor.attach_committer(committer)
+        logger.info(f"Ownership state at block {ownership.block_number}; later blocks are applied in order")
+
     # Map status string to enum
     status_map = {
         "pending": ProcessingStatus.PENDING,
         "valid": ProcessingStatus.VALID,
         "invalid": ProcessingStatus.INVALID,
-        "processing": ProcessingStatus.PROCESSING
+        "processing": ProcessingStatus.PROCESSING,
+        "quarantined": ProcessingStatus.QUARANTINED
     }
     
+    if args.list_runs:
+        for run in RunCheckpoint.list_runs(batch_processor.runs_dir):
+            print(f"{run['run_id']}  {run['status']:<10} {run['cursor']}/{run['total']}  "
+                  f"success={run['success']} failure={run['failure']} skipped={run['skipped']} "
+                  f"quarantined={run.get('quarantined', 0)}  "
+                  f"updated {run['updated_at']}")
+        return
+
+    if args.resume:
+        results = batch_processor.resume_run(args.resume, checkpoint_every=args.checkpoint_every or 100)
+        if ownership is not None:
+            ownership.checkpoint()
+            results["ownership"] = ownership.stats()
+        batch_processor.save_results(results, args.output)
+        return
+
     # Determine which blocks to process
     if args.sample:
         block_paths = batch_processor.sample_blocks(args.sample, args.prefix, sync_first=args.sync)
@@ -127,13 +198,24 @@ def main():
     
     logger.info(f"Will process {len(block_paths)} blocks with {args.storage} storage")
     
+    # Persist the plan so the run can be resumed with --resume
+    checkpoint = None
+    if args.checkpoint_every > 0:
+        checkpoint = batch_processor.create_run(block_paths, batch_size=args.batch_size, force=args.force)
+        logger.info(f"Run ID: {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
+    
     # Process blocks
     results = batch_processor.process_blocks(
         block_paths,
         batch_size=args.batch_size,
         force=args.force,
-        sync_first=args.sync
+        sync_first=args.sync,
+        checkpoint=checkpoint,
+        checkpoint_every=args.checkpoint_every
     )
+    if ownership is not None:
+        ownership.checkpoint()
+        results["ownership"] = ownership.stats()
     
     # Save results
     batch_processor.save_results(results, args.output)
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.processing.factory import ComponentFactory
+from indexer.indexer.decoders.block import BlockDecoder
+from indexer.indexer.storage.block_index import BlockIndex, BlockIndexWriter
+from indexer.indexer.storage.local import LocalStorageHandler
+from indexer.indexer.utils.logging import setup_logger
+
+
+def build(args, index_storage, logger):
+    """Index raw blocks of a range without decoding them (blocks decoded before the index existed)."""
+    gcs_handler = ComponentFactory.get_gcs_handler()
+    db_manager = ComponentFactory.get_database_manager()
+    validator = ComponentFactory.get_block_validator()
+
+    if args.sync_first:
+        db_manager.sync_gcs_objects(prefix=env.get_rpc_prefix())
+    paths = db_manager.get_available_block_paths('raw', args.range[0], args.range[1])
+    logger.info(f"Indexing {len(paths)} raw blocks")
+
+    writer = BlockIndexWriter(index_storage)
+
+    def index_block(path):
+        data = gcs_handler.download_blob_as_bytes(path)
+        is_valid, error, raw_block = validator.validate_block_data(data) if data else (False, "missing", None)
+        if not is_valid:
+            logger.warning(f"Skipping {path}: {error}")
+            return False
+        block_number = int(raw_block.block, 16)
+        writer.add(block_number, BlockDecoder.contract_addresses(raw_block), BlockDecoder.event_topics(raw_block))
+        return True
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        indexed = sum(executor.map(index_block, paths))
+    writer.flush()
+    return {"indexed": indexed, "skipped": len(paths) - indexed, "segments": writer.segments_written}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Query and maintain the address/topic0 block index")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where the index is stored, next to the decoded blocks (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local storage directory (default: data_dir from env)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL (build)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    lookup = subparsers.add_parser("lookup", help="Blocks that touched an address or emitted a topic0")
+    key = lookup.add_mutually_exclusive_group(required=True)
+    key.add_argument("--address", type=str, help="Contract address")
+    key.add_argument("--topic", type=str, help="Event topic0")
+    lookup.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    lookup.add_argument("--coverage", action="store_true",
+                        help="Also report how many blocks of the range are indexed")
+
+    compact = subparsers.add_parser("compact", help="Merge each range's segments into one")
+    compact.add_argument("--range", type=int, nargs=2, default=None, metavar=("MIN", "MAX"),
+                         help="Only ranges overlapping these blocks (default: all)")
+
+    build_parser = subparsers.add_parser("build", help="Index raw blocks of a range without decoding")
+    build_parser.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    build_parser.add_argument("--sync-first", action="store_true",
+                              help="Sync gcs_objects before listing raw blocks")
+    build_parser.add_argument("--workers", type=int, default=8,
+                              help="Concurrent raw block downloads (default: 8)")
+
+    args = parser.parse_args()
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+    logger = setup_logger()
+
+    if args.storage == "local":
+        index_storage = LocalStorageHandler(args.local_dir or env.get_path('data_dir'))
+    else:
+        index_storage = ComponentFactory.get_gcs_handler()
+    index = BlockIndex(index_storage)
+
+    if args.command == "lookup":
+        min_block, max_block = args.range
+        if args.address:
+            blocks = index.lookup_address(args.address, min_block, max_block)
+        else:
+            blocks = index.lookup_topic(args.topic, min_block, max_block)
+        result = {"key": args.address or args.topic, "count": len(blocks), "blocks": blocks}
+        if args.coverage:
+            result["indexed_blocks"] = len(index.indexed_blocks(min_block, max_block))
+        print(json.dumps(result))
+
+    elif args.command == "compact":
+        starts = index.list_ranges()
+        if args.range:
+            starts = [s for s in starts if s + index.range_size > args.range[0] and s <= args.range[1]]
+        merged = 0
+        for range_start in starts:
+            count = index.compact(range_start)
+            if count:
+                logger.info(f"Range {range_start}: merged {count} segments")
+            merged += count
+        print(f"Merged {merged} segments in {len(starts)} ranges")
+
+    elif args.command == "build":
+        if not env.verify_database():
+            logger.error("Database verification failed. Cannot proceed.")
+            sys.exit(1)
+        print(json.dumps(build(args, index_storage, logger), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+from indexer.indexer.database.operations.failures import STAGES
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Inspect, retry and release failed blocks (dead-letter queue)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("summary", help="Failed, quarantined and due counts, and the top stages/errors/contracts")
+
+    list_parser = subparsers.add_parser("list", help="Failures, most recent first")
+    list_parser.add_argument("--quarantined", action="store_true", help="Only quarantined blocks")
+    list_parser.add_argument("--stage", choices=STAGES, default=None)
+    list_parser.add_argument("--contract", type=str, default=None)
+    list_parser.add_argument("--limit", type=int, default=100)
+
+    retry = subparsers.add_parser("retry", help="Retry due failed blocks on the parallel batch pipeline")
+    retry.add_argument("--limit", type=int, default=1000, help="Most blocks to retry (default: 1000)")
+    retry.add_argument("--blocks", type=int, nargs="+", default=None,
+                       help="Retry these blocks now, whatever their backoff")
+    retry.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                       help="Where to store decoded blocks (default: gcs)")
+    retry.add_argument("--local-dir", type=str, default=None,
+                       help="Local directory for storage (default: data_dir from env)")
+    retry.add_argument("--max-workers", type=int, default=None,
+                       help="Max blocks in flight (default: env BATCH_MAX_WORKERS)")
+    retry.add_argument("--output", type=str, default=None,
+                       help="Output file for results (default: auto-generated)")
+
+    release = subparsers.add_parser("release", help="Take blocks out of quarantine, due for retry now")
+    group = release.add_mutually_exclusive_group(required=True)
+    group.add_argument("--blocks", type=int, nargs="+")
+    group.add_argument("--all", action="store_true", help="Every quarantined block")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.processing.factory import ComponentFactory
+    failures = ComponentFactory.get_failure_manager()
+
+    if args.command == "summary":
+        result = failures.summary()
+    elif args.command == "list":
+        result = failures.get_failures(quarantined=True if args.quarantined else None,
+                                       stage=args.stage, contract=args.contract, limit=args.limit)
+    elif args.command == "release":
+        db_manager = ComponentFactory.get_database_manager()
+        with db_manager.unit_of_work(write=True):
+            released = failures.release(None if args.all else args.blocks)
+            db_manager.mark_for_redecode(released, "released from quarantine")
+        result = {"released": released}
+    else:
+        from indexer.indexer.processing.batch import BatchProcessor
+        batch_processor = BatchProcessor(
+            storage_type=args.storage,
+            local_dir=args.local_dir,
+            use_local_db=args.local_db,
+            max_workers=args.max_workers
+        )
+        results = batch_processor.retry_failed(limit=args.limit, block_numbers=args.blocks)
+        output_file = batch_processor.save_results(results, args.output)
+        result = {"retried": results["total"], "success": results["success"],
+                  "failure": results["failure"], "results": output_file, **results["dead_letter"]}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
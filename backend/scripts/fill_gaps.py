@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Fetch raw blocks missing from GCS over JSON-RPC")
+    parser.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"),
+                        help="Block range to check for gaps (inclusive)")
+    parser.add_argument("--sync-first", action="store_true",
+                        help="Sync gcs_objects from the bucket before looking for gaps")
+    parser.add_argument("--rpc-url", type=str, default=None,
+                        help="JSON-RPC endpoint (default: env AVAX_RPC)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent RPC requests (default: env RPC_MAX_CONCURRENCY)")
+    parser.add_argument("--blocks-per-request", type=int, default=None,
+                        help="Blocks per HTTP POST (default: half of env RPC_BATCH_SIZE)")
+    parser.add_argument("--bucket-dir", type=str, default=None,
+                        help="Write raw blocks to this local directory instead of the GCS bucket")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="List gaps and fetch blocks without writing them")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.processing.gaps import GapFiller
+    from indexer.indexer.rpc.client import RpcClient
+    from indexer.indexer.storage.handler import BlockHandler
+    from indexer.indexer.storage.local import LocalStorageHandler
+
+    if args.bucket_dir:
+        gcs_handler = LocalStorageHandler(args.bucket_dir)
+        env.register_component('gcs_handler', gcs_handler)
+    else:
+        gcs_handler = ComponentFactory.get_gcs_handler()
+    db_manager = ComponentFactory.get_database_manager()
+
+    if args.sync_first:
+        count = db_manager.sync_gcs_objects(prefix=env.get_rpc_prefix())
+        logger.info(f"Synced {count} objects")
+
+    workers = args.workers or env.get_rpc_max_concurrency()
+    filler = GapFiller(
+        gcs_handler,
+        BlockHandler(gcs_handler=gcs_handler),
+        db_manager,
+        client=RpcClient(args.rpc_url, pool_size=workers),
+        max_workers=workers,
+        blocks_per_request=args.blocks_per_request
+    )
+
+    min_block, max_block = args.range
+    gaps = filler.find_gaps(min_block, max_block)
+    logger.info(f"{len(gaps)} of {max_block - min_block + 1} blocks have no raw object")
+    if not gaps:
+        return
+
+    stats = filler.fill(gaps, dry_run=args.dry_run)
+    print(json.dumps(stats, indent=2))
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import signal
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Follow the chain tip over JSON-RPC and decode new blocks")
+    parser.add_argument("--rpc-url", type=str, default=None,
+                        help="JSON-RPC endpoint (default: env AVAX_RPC)")
+    parser.add_argument("--from-block", type=int, default=None,
+                        help="First block (default: after the last ingested block, else the tip)")
+    parser.add_argument("--max-blocks", type=int, default=None,
+                        help="Stop after this many blocks")
+    parser.add_argument("--confirmations", type=int, default=None,
+                        help="Blocks to stay behind the tip (default: env FOLLOWER_CONFIRMATIONS)")
+    parser.add_argument("--poll-seconds", type=float, default=None,
+                        help="Poll interval once caught up (default: env FOLLOWER_POLL_SECONDS)")
+    parser.add_argument("--archive-raw", action="store_true",
+                        help="Also write raw blocks to GCS in the QuickNode layout")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where to store decoded blocks (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local directory for storage (default: data_dir from env)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    parser.add_argument("--ownership", action="store_true",
+                        help="Keep NFT ownership state, checkpointed next to the decoded blocks (default: env OWNERSHIP_ENABLED)")
+    parser.add_argument("--decode-filter", choices=["all", "registry", "topics"], default=None,
+                        help="Decode filter mode (default: env DECODE_FILTER_MODE)")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.processing.batch import BatchProcessor
+    from indexer.indexer.processing.follower import TipFollower
+    from indexer.indexer.rpc.client import RpcClient
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.storage.local import LocalStorageHandler
+
+    batch_processor = BatchProcessor(
+        storage_type=args.storage,
+        local_dir=args.local_dir,
+        use_local_db=args.local_db,
+        decode_filter=args.decode_filter
+    )
+    ownership = None
+    if args.ownership or env.get_ownership_enabled():
+        storage = LocalStorageHandler(args.local_dir or env.get_path('data_dir')) if args.storage == "local" else None
+        ownership = ComponentFactory.get_ownership_tracker(storage)
+
+    follower = TipFollower(
+        batch_processor.processor,
+        client=RpcClient(args.rpc_url),
+        poll_seconds=args.poll_seconds,
+        confirmations=args.confirmations,
+        archive_raw=args.archive_raw,
+        ownership=ownership
+    )
+    follower.start_from(args.from_block)
+
+    if env.get_registry_reload_seconds() > 0:
+        registry_watcher = ComponentFactory.get_registry_watcher()
+        registry_watcher.subscribe(batch_processor.decoder.swap_registry)
+        registry_watcher.check()
+        registry_watcher.start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: follower.stop())
+    try:
+        stats = follower.run(max_blocks=args.max_blocks)
+    except KeyboardInterrupt:
+        follower.stop()
+        stats = follower.stats
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
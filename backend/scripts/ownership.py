@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def build(args, tracker, logger):
+    """Replay the valid decoded blocks of a range into the state, checkpointing as it goes."""
+    from indexer.indexer.database.models.status import ProcessingStatus
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.storage.handler import BlockHandler
+    from indexer.indexer.storage.local import LocalBlockHandler
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    gcs_handler = ComponentFactory.get_gcs_handler()
+    if args.storage == "local":
+        handler = LocalBlockHandler(gcs_handler=gcs_handler, local_dir=args.local_dir)
+    else:
+        handler = BlockHandler(gcs_handler=gcs_handler)
+
+    min_block, max_block = args.range
+    if args.fresh:
+        tracker.reset()
+    elif tracker.block_number >= min_block:
+        logger.info(f"State is already at block {tracker.block_number}, continuing after it")
+
+    paths = ComponentFactory.get_database_manager().get_block_paths_by_status(
+        ProcessingStatus.VALID, max(min_block, tracker.block_number + 1), max_block
+    )
+    block_numbers = [handler.extract_block_number(path) for path in paths]
+    logger.info(f"Replaying {len(block_numbers)} decoded blocks")
+
+    chunk = env.get_ownership_checkpoint_blocks()
+    applied = 0
+    for start in range(0, len(block_numbers), chunk):
+        applied += tracker.replay(handler, block_numbers[start:start + chunk], workers=args.workers)
+        tracker.checkpoint()
+    return {"applied": applied, **tracker.stats()}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build and query the NFT ownership state")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where decoded blocks and checkpoints are stored (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local directory for storage (default: data_dir from env)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL (build)")
+    parser.add_argument("--at-block", type=int, default=None,
+                        help="Use the newest checkpoint at or below this block (default: newest)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Replay decoded blocks of a range from the newest checkpoint")
+    build_parser.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    build_parser.add_argument("--fresh", action="store_true",
+                              help="Start from an empty state instead of the newest checkpoint")
+    build_parser.add_argument("--workers", type=int, default=8,
+                              help="Concurrent decoded block downloads (default: 8)")
+
+    owner = subparsers.add_parser("owner", help="Current owner of an NFT")
+    owner.add_argument("--nft", type=str, required=True, help="Collection address")
+    owner.add_argument("--id", type=int, required=True, help="Token id")
+
+    tokens = subparsers.add_parser("tokens", help="NFTs held by an address")
+    tokens.add_argument("--owner", type=str, required=True)
+    tokens.add_argument("--nft", type=str, default=None, help="Only this collection")
+
+    holders = subparsers.add_parser("holders", help="Tokens held per owner in a collection")
+    holders.add_argument("--nft", type=str, required=True, help="Collection address")
+    holders.add_argument("--limit", type=int, default=100)
+
+    balance = subparsers.add_parser("balance", help="Tracked ERC-20 balance of an address")
+    balance.add_argument("--token", type=str, required=True)
+    balance.add_argument("--holder", type=str, required=True)
+
+    subparsers.add_parser("checkpoints", help="Stored checkpoints")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+    logger = setup_logger()
+
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.storage.local import LocalStorageHandler
+
+    storage = LocalStorageHandler(args.local_dir or env.get_path('data_dir')) if args.storage == "local" else None
+    tracker = ComponentFactory.get_ownership_tracker(storage)
+    if args.command == "checkpoints":
+        print(json.dumps({"checkpoints": tracker.list_checkpoints()}))
+        return
+    tracker.restore_latest(max_block=args.at_block)
+
+    if args.command == "build":
+        result = build(args, tracker, logger)
+    elif args.command == "owner":
+        result = {"nft": args.nft, "id": args.id, "owner": tracker.owner_of(args.nft, args.id)}
+    elif args.command == "tokens":
+        result = tracker.tokens_of(args.owner, args.nft)
+    elif args.command == "holders":
+        counts = sorted(tracker.holders(args.nft).items(), key=lambda item: -item[1])
+        result = {"holders": len(counts), "top": dict(counts[:args.limit])}
+    else:
+        result = {"token": args.token, "holder": args.holder, "balance": str(tracker.balance_of(args.token, args.holder))}
+    result = {"block_number": tracker.block_number, "result": result}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
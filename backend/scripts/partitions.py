@@ -0,0 +1,51 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.processing.factory import ComponentFactory
+from indexer.indexer.utils.logging import setup_logger
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Manage block_processing range partitions (PostgreSQL)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List partitions with bounds and approximate row counts")
+
+    ensure = subparsers.add_parser("ensure", help="Create missing partitions up to a block")
+    ensure.add_argument("--up-to", type=int, required=True,
+                        help="Highest block to cover (e.g. chain tip plus headroom)")
+    ensure.add_argument("--from", dest="from_block", type=int, default=None,
+                        help="Lowest block to cover (default: end of the last partition)")
+
+    args = parser.parse_args()
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    partitions = ComponentFactory.get_block_partition_manager()
+    if not partitions.is_partitioned():
+        logger.error("block_processing is not partitioned (see migration 005_partition_block_processing.sql)")
+        sys.exit(1)
+
+    if args.command == "list":
+        print(json.dumps(partitions.list_partitions(), indent=2))
+
+    elif args.command == "ensure":
+        created = partitions.ensure_partitions(args.up_to, from_block=args.from_block)
+        print(f"Created {created} partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def find_added_blocks(index, db_manager, addresses, min_block, max_block):
+    """
+    Blocks of registered contracts that were decoded before the contract was added.
+
+    contract_usage only records registered addresses, so these blocks have no row for
+    the contract; the block index still lists every address a decoded block touched.
+
+    Returns:
+        Unrecorded blocks per address (addresses without any are left out)
+    """
+    if min_block is None or max_block is None:
+        starts = index.list_ranges()
+        if not starts:
+            return {}
+        min_block = starts[0] if min_block is None else min_block
+        max_block = starts[-1] + index.range_size - 1 if max_block is None else max_block
+
+    added = {}
+    for address in addresses:
+        candidates = index.lookup_address(address, min_block, max_block)
+        blocks = db_manager.get_unrecorded_blocks(address, candidates) if candidates else []
+        if blocks:
+            added[address] = blocks
+    return added
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Redecode only the blocks of contracts whose registry ABI changed since they were decoded"
+    )
+    parser.add_argument("--address", type=str, nargs="+", default=None,
+                        help="Only check these addresses (default: every recorded contract)")
+    parser.add_argument("--range", type=int, nargs=2, default=None, metavar=("MIN", "MAX"),
+                        help="Only redecode blocks in this range")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report affected contracts and block counts without changing anything")
+    parser.add_argument("--mark-only", action="store_true",
+                        help="Mark affected blocks pending instead of redecoding them now")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where decoded blocks are stored (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local directory for storage (default: data_dir from env)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Blocks per batch (default: 1000)")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Blocks in flight (default: env BATCH_MAX_WORKERS)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Don't look up blocks of newly added contracts in the block index")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.processing.factory import ComponentFactory
+
+    registry = ComponentFactory.get_contract_registry()
+    db_manager = ComponentFactory.get_database_manager()
+    min_block, max_block = args.range if args.range else (None, None)
+
+    stale = db_manager.find_stale_contracts(registry.abi_versions, addresses=args.address)
+    affected = set()
+    report = {}
+    for address, recorded in sorted(stale.items()):
+        current = registry.get_abi_version(address)
+        blocks = db_manager.get_blocks_with_stale_contract(address, current, min_block, max_block)
+        affected.update(blocks)
+        report[address] = {
+            "change": "added" if recorded == [None] else "removed" if current is None else "changed",
+            "recorded_versions": recorded,
+            "current_version": current,
+            "blocks": len(blocks)
+        }
+        logger.info(f"{address}: {report[address]['change']}, {len(blocks)} blocks")
+
+    if env.get_block_index_enabled() and not args.no_index:
+        from indexer.indexer.storage.block_index import BlockIndex
+        from indexer.indexer.storage.local import LocalStorageHandler
+
+        if args.storage == "local":
+            index_storage = LocalStorageHandler(args.local_dir or env.get_path('data_dir'))
+        else:
+            index_storage = ComponentFactory.get_gcs_handler()
+        addresses = [a.lower() for a in args.address] if args.address else sorted(registry.abi_versions)
+        added = find_added_blocks(BlockIndex(index_storage), db_manager,
+                                  [a for a in addresses if registry.get_abi_version(a)], min_block, max_block)
+        for address, blocks in added.items():
+            affected.update(blocks)
+            entry = report.setdefault(address, {
+                "change": "added",
+                "recorded_versions": [],
+                "current_version": registry.get_abi_version(address),
+                "blocks": 0
+            })
+            entry["blocks"] += len(blocks)
+            logger.info(f"{address}: added, {len(blocks)} blocks decoded before it was registered")
+
+    affected = sorted(affected)
+    print(json.dumps({"contracts": report, "affected_blocks": len(affected)}, indent=2))
+    if not affected or args.dry_run:
+        return
+
+    reason = "abi change: " + ", ".join(sorted(report))[:500]
+    marked = 0
+    for start in range(0, len(affected), args.batch_size):
+        marked += db_manager.mark_for_redecode(affected[start:start + args.batch_size], reason)
+    logger.info(f"Marked {marked} blocks pending for redecode")
+    if args.mark_only:
+        return
+
+    from indexer.indexer.processing.batch import BatchProcessor
+
+    batch_processor = BatchProcessor(
+        storage_type=args.storage,
+        local_dir=args.local_dir,
+        use_local_db=args.local_db,
+        max_workers=args.max_workers
+    )
+    results = batch_processor.process_blocks(
+        db_manager.get_block_paths(affected),
+        batch_size=args.batch_size,
+        force=True,
+        sync_first=False
+    )
+    print(json.dumps({key: results[key] for key in ("total", "success", "failure")}, indent=2))
+    if results["failure"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def rebuild(args, rollups, logger):
+    """Reapply the stored decoded blocks of a range, and drop blocks of the range that are no longer valid."""
+    from indexer.indexer.database.models.status import ProcessingStatus
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.storage.handler import BlockHandler
+    from indexer.indexer.storage.local import LocalBlockHandler
+
+    db_manager = ComponentFactory.get_database_manager()
+    gcs_handler = ComponentFactory.get_gcs_handler()
+    if args.storage == "local":
+        handler = LocalBlockHandler(gcs_handler=gcs_handler, local_dir=args.local_dir)
+    else:
+        handler = BlockHandler(gcs_handler=gcs_handler)
+
+    min_block, max_block = args.range
+    paths = db_manager.get_block_paths_by_status(ProcessingStatus.VALID, min_block, max_block)
+    valid = [handler.extract_block_number(path) for path in paths]
+    stale = sorted(set(rollups.get_block_numbers(min_block, max_block)) - set(valid))
+    removed = rollups.remove_blocks(stale)
+    logger.info(f"Rebuilding rollups of {len(valid)} valid blocks, removed {removed} blocks no longer valid")
+
+    applied = missing = 0
+    # Downloads run concurrently; each block is applied in its own transaction
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for block_number, block in zip(valid, executor.map(handler.get_decoded_block, valid)):
+            if block is None:
+                missing += 1
+                continue
+            rollups.apply_block(block_number, block)
+            applied += 1
+    return {"applied": applied, "missing": missing, "removed": removed}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Query and rebuild the per-collection hourly/daily rollups")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    show = subparsers.add_parser("show", help="Rollup rows of a period, newest first")
+    show.add_argument("--period", choices=["hour", "day"], default="day")
+    show.add_argument("--collection", type=str, default=None, help="Only this NFT contract")
+    show.add_argument("--token", type=str, default=None, help="Only this payment token")
+    show.add_argument("--start", type=int, default=None, help="First bucket (unix seconds)")
+    show.add_argument("--end", type=int, default=None, help="Last bucket (unix seconds)")
+    show.add_argument("--limit", type=int, default=100)
+
+    top = subparsers.add_parser("top", help="Collections by volume over a time range")
+    top.add_argument("--period", choices=["hour", "day"], default="day")
+    top.add_argument("--start", type=int, required=True, help="First bucket (unix seconds)")
+    top.add_argument("--end", type=int, required=True, help="Last bucket (unix seconds)")
+    top.add_argument("--token", type=str, default=None, help="Only this payment token")
+    top.add_argument("--limit", type=int, default=50)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Recompute the contributions of a block range")
+    rebuild_parser.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    rebuild_parser.add_argument("--workers", type=int, default=8,
+                                help="Concurrent decoded block downloads (default: 8)")
+    rebuild_parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                                help="Where decoded blocks are stored (default: gcs)")
+    rebuild_parser.add_argument("--local-dir", type=str, default=None,
+                                help="Local directory for storage (default: data_dir from env)")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.processing.factory import ComponentFactory
+    rollups = ComponentFactory.get_rollup_manager()
+
+    if args.command == "show":
+        result = rollups.get_rollups(args.period, args.start, args.end, args.collection, args.token, args.limit)
+    elif args.command == "top":
+        result = rollups.top_collections(args.period, args.start, args.end, args.limit, args.token)
+    else:
+        result = rebuild(args, rollups, logger)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.utils.logging import setup_logger
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Trade and mint statistics over the decoded blocks of a range")
+    parser.add_argument("report", choices=["collections", "volume", "last-sales"],
+                        help="Per-collection stats, rolling volume/VWAP, or the last sale of every NFT")
+    parser.add_argument("--range", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    parser.add_argument("--collection", type=str, default=None,
+                        help="Only this NFT contract")
+    parser.add_argument("--bucket-seconds", type=int, default=3600,
+                        help="Volume bucket size (default: 3600)")
+    parser.add_argument("--window-seconds", type=int, default=86400,
+                        help="Rolling volume window (default: 86400)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Print at most this many rows")
+    parser.add_argument("--arrow-out", type=str, default=None,
+                        help="Also write the loaded columns to this Arrow IPC file (needs pyarrow)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent decoded block reads (default: env ANALYTICS_WORKERS)")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where decoded blocks are stored (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local directory for storage (default: data_dir from env)")
+    parser.add_argument("--local-db", action="store_true",
+                        help="Use local SQLite database instead of PostgreSQL")
+    args = parser.parse_args()
+
+    if args.local_db:
+        os.environ["DB_USE_SQLITE"] = "True"
+
+    logger = setup_logger()
+
+    if not env.verify_database():
+        logger.error("Database verification failed. Cannot proceed.")
+        sys.exit(1)
+
+    from indexer.indexer.analytics import TradeLoader, collection_stats, last_sales, rolling_volume
+    from indexer.indexer.processing.factory import ComponentFactory
+    from indexer.indexer.storage.handler import BlockHandler
+    from indexer.indexer.storage.local import LocalBlockHandler
+
+    gcs_handler = ComponentFactory.get_gcs_handler()
+    if args.storage == "local":
+        handler = LocalBlockHandler(gcs_handler=gcs_handler, local_dir=args.local_dir)
+    else:
+        handler = BlockHandler(gcs_handler=gcs_handler)
+
+    loader = TradeLoader(handler, workers=args.workers or env.get_analytics_workers())
+    columns = loader.load_range(ComponentFactory.get_database_manager(), *args.range)
+    if args.collection:
+        columns = columns.for_collection(args.collection)
+    logger.info(f"Loaded {len(columns)} trades and mints")
+
+    if args.arrow_out:
+        table = columns.to_arrow()
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, args.arrow_out)
+
+    if args.report == "collections":
+        result = collection_stats(columns)[:args.limit]
+    elif args.report == "volume":
+        result = rolling_volume(columns, args.bucket_seconds, args.window_seconds)
+        result["buckets"] = result["buckets"][:args.limit]
+    else:
+        result = last_sales(columns)[:args.limit]
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
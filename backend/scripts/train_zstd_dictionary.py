@@ -0,0 +1,95 @@
+import sys
+import random
+import argparse
+from pathlib import Path
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.processing.factory import ComponentFactory
+from indexer.indexer.storage.compression import BlockCompressor, train_dictionary, DICTIONARY_SUFFIX
+from indexer.indexer.utils.logging import setup_logger
+
+
+def load_samples(args, compressor: BlockCompressor, logger):
+    """Sample stored decoded blocks, decompressed to plain JSON."""
+    rng = random.Random(args.seed)
+
+    if args.storage == "local":
+        decoded_dir = Path(args.local_dir or env.get_path('data_dir')) / "decoded"
+        paths = sorted(p for p in decoded_dir.glob("*.json*") if p.is_file())
+        paths = rng.sample(paths, min(args.sample, len(paths)))
+        return [compressor.decompress(p.read_bytes()) for p in paths]
+
+    gcs_handler = ComponentFactory.get_gcs_handler()
+    names = [blob.name for blob in gcs_handler.list_blobs(prefix=env.get_decoded_prefix())]
+    names = rng.sample(names, min(args.sample, len(names)))
+    samples = []
+    for index, name in enumerate(names, 1):
+        data = gcs_handler.download_blob_as_bytes(name)
+        if data:
+            samples.append(compressor.decompress(data))
+        if index % 100 == 0:
+            logger.info(f"Downloaded {index}/{len(names)} samples")
+    return samples
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Train a zstd dictionary on stored decoded blocks")
+    parser.add_argument("--storage", choices=["gcs", "local"], default="gcs",
+                        help="Where decoded blocks are stored (default: gcs)")
+    parser.add_argument("--local-dir", type=str, default=None,
+                        help="Local storage directory (default: data_dir from env)")
+    parser.add_argument("--sample", type=int, default=2000,
+                        help="Number of decoded blocks to train on (default: 2000)")
+    parser.add_argument("--dict-size", type=int, default=112640,
+                        help="Dictionary size in bytes (default: 110 KiB)")
+    parser.add_argument("--level", type=int, default=None,
+                        help="zstd level to tune for (default: env DECODED_COMPRESSION_LEVEL or 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--output", type=str, default=None,
+                        help=f"Dictionary file (default: <data_dir>/zstd/decoded-<dict_id>{DICTIONARY_SUFFIX})")
+    args = parser.parse_args()
+
+    logger = setup_logger()
+    level = args.level or env.get_decoded_compression_level() or 3
+
+    # Reads any codec, including blocks written with a previous dictionary
+    reader = BlockCompressor("none", dictionary_path=env.get_zstd_dictionary_path())
+    samples = load_samples(args, reader, logger)
+    if len(samples) < 10:
+        logger.error(f"Found only {len(samples)} decoded blocks, need at least 10 to train")
+        sys.exit(1)
+
+    # Hold out a tenth of the sample to measure the gain on blocks the dictionary hasn't seen
+    held_out = samples[:max(1, len(samples) // 10)]
+    dictionary = train_dictionary(samples[len(held_out):], dict_size=args.dict_size, level=level)
+
+    output = Path(args.output) if args.output else None
+    if output is None:
+        from zstandard import ZstdCompressionDict
+        dict_id = ZstdCompressionDict(dictionary).dict_id()
+        output = env.get_path('data_dir') / "zstd" / f"decoded-{dict_id}{DICTIONARY_SUFFIX}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(dictionary)
+
+    raw = sum(len(sample) for sample in held_out)
+    plain = BlockCompressor("zstd", level=level)
+    trained = BlockCompressor("zstd", level=level, dictionary_path=output)
+    without_dict = sum(len(plain.compress(sample)) for sample in held_out)
+    with_dict = sum(len(trained.compress(sample)) for sample in held_out)
+
+    print(f"Trained on {len(samples) - len(held_out)} blocks, wrote {len(dictionary)} bytes to {output}")
+    print(f"Held-out {len(held_out)} blocks: {raw} bytes raw, "
+          f"zstd {without_dict} ({raw / without_dict:.1f}x), "
+          f"zstd+dict {with_dict} ({raw / with_dict:.1f}x)")
+    print(f"Use it with DECODED_COMPRESSION=zstd ZSTD_DICTIONARY_PATH={output}")
+
+
+if __name__ == "__main__":
+    main()
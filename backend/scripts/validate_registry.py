@@ -0,0 +1,45 @@
+import sys
+import argparse
+from pathlib import Path
+
+import msgspec
+
+# Add project root to path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.append(str(project_root))
+
+# Import from indexer package
+from indexer.indexer.env import env
+from indexer.indexer.contracts.registry import ContractRegistry
+from indexer.indexer.utils.logging import setup_logger
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load the contract registry and report every problem in one pass")
+    parser.add_argument("--contracts-file", type=str, default=None,
+                        help="contracts.json (default: config_dir/contracts.json)")
+    parser.add_argument("--abi-dir", type=str, default=None,
+                        help="ABI directory (default: config_dir/abis)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Threads reading ABI files (default: 8)")
+    parser.add_argument("--strict", action="store_true",
+                        help="Also fail on warnings")
+    args = parser.parse_args()
+
+    logger = setup_logger()
+
+    contracts_file = args.contracts_file or env.get_path('config_dir') / 'contracts.json'
+    abi_directory = args.abi_dir or env.get_path('config_dir') / 'abis'
+    registry = ContractRegistry(contracts_file, abi_directory, max_workers=args.workers)
+    report = registry.report
+
+    print(msgspec.json.format(msgspec.json.encode(report), indent=2).decode())
+    if not report.ok or (args.strict and report.warnings):
+        logger.error(f"Registry has {len(report.errors)} errors and {len(report.warnings)} warnings")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,10 @@ import functions_framework
 load_dotenv()
 from indexer.indexer.env import env
 
+from indexer.indexer.analytics import TradeLoader, collection_stats, last_sales, rolling_volume
 from indexer.indexer.processing.processor import BlockProcessor
 from indexer.indexer.processing.factory import ComponentFactory
+from indexer.indexer.storage.block_index import BlockIndexWriter
 from indexer.indexer.database.models.status import ProcessingStatus, BlockProcess
 from indexer.indexer.utils.logging import setup_logger
 
@@ -18,7 +20,18 @@ logger = setup_logger("processor_service")
 app = Flask(__name__)
 
 # Initialize block processor with factory defaults
-block_processor = BlockProcessor()
+# Instances can be stopped between pushes, so index postings are written per block; the
+# writer merges a range's segments every BLOCK_INDEX_COMPACT_SEGMENTS writes so lookups
+# don't list and download one segment per block
+block_index = BlockIndexWriter(ComponentFactory.get_gcs_handler(), flush_blocks=1) if env.get_block_index_enabled() else None
+block_processor = BlockProcessor(block_index=block_index)
+
+# New contracts and ABIs are swapped into the decoder without a restart
+if env.get_registry_reload_seconds() > 0:
+    registry_watcher = ComponentFactory.get_registry_watcher()
+    registry_watcher.subscribe(block_processor.decoder.swap_registry)
+    registry_watcher.check()
+    registry_watcher.start()
 db_manager = ComponentFactory.get_database_manager()
 
 @app.route("/", methods=["GET"])
@@ -57,16 +70,22 @@ def handle_pubsub():
     try:
         # Process the block
         logger.info(f"Processing block from path: {gcs_path}")
+        # Quarantined blocks are skipped by the processor: redeliveries don't retry them
         success, result_info = block_processor.process_block(gcs_path)
 
-        if success:
+        if result_info.get("reason") == "quarantined":
+            logger.warning(f"Skipped quarantined block {gcs_path}; release it with POST /failures/release")
+            status = "quarantined"
+        elif success:
             logger.info(f"Successfully processed {gcs_path}")
+            status = "success"
         else:
             logger.warning(f"Failed to process {gcs_path}: {result_info['errors']}")
+            status = "failure"
         
         # Return detailed result info
         response = {
-            "status": "success" if success else "failure",
+            "status": status,
             "path": gcs_path,
             "details": result_info
         }
@@ -127,16 +146,142 @@ def reprocess_blocks():
         results = block_processor.reprocess_blocks(data["block_numbers"])
         return jsonify(results)
     
-    # Otherwise, reprocess invalid blocks
+    # Otherwise, retry failed blocks whose backoff has elapsed (quarantined ones are left alone)
     else:
         limit = data.get("limit", 100)
-        status_tracker = block_processor.status_tracker
-        invalid_blocks = status_tracker.get_blocks_by_status(ProcessingStatus.INVALID, limit=limit)
-        block_numbers = [block.block_number for block in invalid_blocks]
+        block_numbers = block_processor.failures.due(limit)
         
-        results = block_processor.reprocess_blocks(block_numbers)
+        results = block_processor.reprocess_blocks(block_numbers, max_workers=env.get_batch_max_workers())
         return jsonify(results)
 
+@app.route("/failures", methods=["GET"])
+def get_failures():
+    """Dead-letter summary and failures, filtered by ?quarantined=, stage= and contract=."""
+    quarantined = request.args.get("quarantined")
+    if quarantined is not None:
+        quarantined = quarantined.lower() in ("true", "1", "yes")
+    failures = block_processor.failures
+    return jsonify({
+        "summary": failures.summary(),
+        "failures": failures.get_failures(
+            quarantined=quarantined,
+            stage=request.args.get("stage"),
+            contract=request.args.get("contract"),
+            limit=request.args.get("limit", 100, type=int)
+        )
+    })
+
+@app.route("/failures/release", methods=["POST"])
+def release_failures():
+    """Take quarantined blocks ("block_numbers", or all of them) out of quarantine."""
+    data = request.get_json(silent=True) or {}
+    with block_processor.status_tracker.unit_of_work(write=True):
+        released = block_processor.failures.release(data.get("block_numbers"))
+        block_processor.status_tracker.mark_for_redecode(released, "released from quarantine")
+    return jsonify({"released": released})
+
+@app.route("/index/lookup", methods=["GET"])
+def index_lookup():
+    """Blocks that touched a contract address or emitted an event topic0."""
+    address = request.args.get("address")
+    topic = request.args.get("topic")
+    if bool(address) == bool(topic):
+        return jsonify({"error": "Pass exactly one of address or topic"}), 400
+    try:
+        from_block = int(request.args["from_block"])
+        to_block = int(request.args["to_block"])
+    except (KeyError, ValueError):
+        return jsonify({"error": "from_block and to_block are required integers"}), 400
+
+    index = ComponentFactory.get_block_index()
+    if address:
+        blocks = index.lookup_address(address, from_block, to_block)
+    else:
+        blocks = index.lookup_topic(topic, from_block, to_block)
+    return jsonify({
+        "key": address or topic,
+        "from_block": from_block,
+        "to_block": to_block,
+        "blocks": blocks
+    })
+
+@app.route("/rollups", methods=["GET"])
+def get_rollups():
+    """Per-collection rollup rows of a period, or the top collections of a time range."""
+    period = request.args.get("period", "day")
+    if period not in ("hour", "day"):
+        return jsonify({"error": "period must be hour or day"}), 400
+    try:
+        start = int(request.args["start"]) if "start" in request.args else None
+        end = int(request.args["end"]) if "end" in request.args else None
+        limit = int(request.args.get("limit", 100))
+    except ValueError:
+        return jsonify({"error": "start, end and limit must be integers"}), 400
+
+    rollups = ComponentFactory.get_rollup_manager()
+    if request.args.get("top"):
+        if start is None or end is None:
+            return jsonify({"error": "top needs start and end"}), 400
+        rows = rollups.top_collections(period, start, end, limit, request.args.get("token"))
+    else:
+        rows = rollups.get_rollups(period, start, end, request.args.get("collection"),
+                                   request.args.get("token"), limit)
+    return jsonify({"period": period, "rows": rows})
+
+@app.route("/ownership/owner", methods=["GET"])
+def ownership_owner():
+    """Current owner of an NFT, from the newest ownership checkpoint."""
+    nft = request.args.get("nft")
+    try:
+        nft_id = int(request.args["id"])
+    except (KeyError, ValueError):
+        return jsonify({"error": "id is a required integer"}), 400
+    if not nft:
+        return jsonify({"error": "nft is required"}), 400
+
+    # Written by the tip follower; this instance only reads its checkpoints
+    tracker = ComponentFactory.get_ownership_tracker()
+    tracker.refresh()
+    return jsonify({
+        "nft": nft,
+        "id": nft_id,
+        "owner": tracker.owner_of(nft, nft_id),
+        "block_number": tracker.block_number
+    })
+
+@app.route("/analytics/<report>", methods=["GET"])
+def trade_analytics(report):
+    """Trade statistics over the valid blocks of a range: collections, volume or last-sales."""
+    if report not in ("collections", "volume", "last-sales"):
+        return jsonify({"error": f"Unknown report {report}"}), 404
+    try:
+        from_block = int(request.args["from_block"])
+        to_block = int(request.args["to_block"])
+        bucket_seconds = int(request.args.get("bucket_seconds", 3600))
+        window_seconds = int(request.args.get("window_seconds", 86400))
+    except (KeyError, ValueError):
+        return jsonify({"error": "from_block and to_block are required integers"}), 400
+    if to_block - from_block + 1 > env.get_analytics_max_blocks():
+        return jsonify({"error": f"Range larger than {env.get_analytics_max_blocks()} blocks"}), 400
+
+    loader = TradeLoader(block_processor.handler, workers=env.get_analytics_workers())
+    columns = loader.load_range(db_manager, from_block, to_block)
+    if request.args.get("collection"):
+        columns = columns.for_collection(request.args["collection"])
+
+    if report == "collections":
+        result = collection_stats(columns)
+    elif report == "volume":
+        result = rolling_volume(columns, bucket_seconds, window_seconds)
+    else:
+        result = last_sales(columns)
+    return jsonify({
+        "from_block": from_block,
+        "to_block": to_block,
+        "missing_blocks": loader.missing,
+        "result": result
+    })
+
 if __name__ == "__main__":
     # For local development
     port = int(os.getenv("PORT", 8080))